@@ -0,0 +1,6 @@
+import sys
+
+collect_ignore = []
+if sys.version_info[0] < 3:
+    # async def is a syntax error on Python 2
+    collect_ignore.extend(["mathAsync.py", "test/test_mathAsync.py"])
@@ -0,0 +1,182 @@
+from __future__ import division, absolute_import
+import asyncio
+from fontMath.mathCache import MathCache
+from fontMath.mathModel import _locationKey, _unitSize
+
+"""
+An asyncio interface for instancing.
+
+Glyph math is CPU bound and blocks the event loop. AsyncInstancer
+runs it in an executor instead and makes sure that concurrent
+requests for the same glyph and location share one computation:
+the first request starts it and later ones wait for the same
+result. Results are kept in a MathCache.
+
+Cancelling a request only cancels the waiting of that request.
+The computation is cancelled when nobody waits for it anymore and
+it has not started yet; computations that are already running in
+the executor can't be interrupted and finish in the background,
+with their results going to the cache.
+
+This module needs Python 3.
+"""
+
+__all__ = [
+    "AsyncInstancer"
+]
+
+# get_running_loop is new in Python 3.7, get_event_loop returns
+# the running loop in a coroutine before that
+_getRunningLoop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+
+class AsyncInstancer(object):
+
+    """
+    Asynchronous instancing of the masters of a MathVariationModel.
+
+    masters is a list of mappings of glyph names to MathGlyph
+    objects (dicts or MathFont objects), one per model location.
+    kerning and info are optional lists with the MathKerning and
+    MathInfo objects of the masters. executor is passed to
+    loop.run_in_executor; None uses the default executor of the
+    event loop.
+
+    The returned objects are shared with the cache and with other
+    callers and must be treated as read only.
+    """
+
+    def __init__(self, model, masters, kerning=None, info=None, executor=None,
+                 cacheSize=1000000, deltasCacheSize=1000):
+        self.model = model
+        self.masters = list(masters)
+        self._kerning = kerning
+        self._info = info
+        self.executor = executor
+        self.cache = MathCache(maxSize=cacheSize)
+        self._deltasCache = MathCache(maxSize=deltasCacheSize, sizeFunction=_unitSize)
+        self._pending = {}
+
+    # ----------
+    # Public API
+    # ----------
+
+    async def glyph(self, glyphName, location):
+        """
+        Return the MathGlyph instance of glyphName at location.
+        """
+        key = ("glyph", glyphName, _locationKey(location))
+        return await self._get(key, self._instanceGlyph, glyphName, location)
+
+    async def glyphs(self, glyphNames, location):
+        """
+        Return a dict of glyph name to MathGlyph instance at location.
+        """
+        glyphNames = list(glyphNames)
+        results = await asyncio.gather(
+            *[self.glyph(glyphName, location) for glyphName in glyphNames]
+        )
+        return dict(zip(glyphNames, results))
+
+    async def glyphInstances(self, glyphName, locations):
+        """
+        Return a list with the MathGlyph instances of glyphName at
+        each of locations, computed in one batch. The results are
+        not coalesced with other requests but they are cached.
+        """
+        locations = list(locations)
+        keys = [("glyph", glyphName, _locationKey(location)) for location in locations]
+        cached = [self.cache.get(key) for key in keys]
+        missing = [location for location, result in zip(locations, cached) if result is None]
+        if missing:
+            loop = _getRunningLoop()
+            computed = await loop.run_in_executor(
+                self.executor, self._instanceGlyphs, glyphName, missing)
+            computed = iter(computed)
+            for index, (key, result) in enumerate(zip(keys, cached)):
+                if result is None:
+                    result = cached[index] = next(computed)
+                    self.cache.set(key, result)
+        return cached
+
+    async def kerning(self, location):
+        """
+        Return the MathKerning instance at location.
+        """
+        if self._kerning is None:
+            raise ValueError("No kerning masters were given.")
+        key = ("kerning", None, _locationKey(location))
+        return await self._get(key, self._instance, "kerning", self._kerning, location)
+
+    async def info(self, location):
+        """
+        Return the MathInfo instance at location.
+        """
+        if self._info is None:
+            raise ValueError("No info masters were given.")
+        key = ("info", None, _locationKey(location))
+        return await self._get(key, self._instance, "info", self._info, location)
+
+    # -----------
+    # Coalescing
+    # -----------
+
+    async def _get(self, key, function, *args):
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        entry = self._pending.get(key)
+        if entry is None:
+            loop = _getRunningLoop()
+            future = loop.run_in_executor(self.executor, function, *args)
+            # [future, number of waiting requests]
+            entry = self._pending[key] = [future, 0]
+            future.add_done_callback(lambda future, key=key: self._computed(key, future))
+        future = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if entry[1] == 1 and not future.done():
+                # nobody else is waiting for the result
+                future.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    def _computed(self, key, future):
+        entry = self._pending.get(key)
+        if entry is not None and entry[0] is future:
+            del self._pending[key]
+        if not future.cancelled() and future.exception() is None:
+            self.cache.set(key, future.result())
+
+    # -----------
+    # Computation
+    # -----------
+
+    def _glyphDeltas(self, glyphName):
+        deltas = self._deltasCache.get(("glyph", glyphName))
+        if deltas is None:
+            deltas = self.model.getDeltas([master.get(glyphName) for master in self.masters])
+            self._deltasCache.set(("glyph", glyphName), deltas)
+        return deltas
+
+    def _instanceGlyph(self, glyphName, location):
+        return self._glyphDeltas(glyphName).instance(location)
+
+    def _instanceGlyphs(self, glyphName, locations):
+        return self._glyphDeltas(glyphName).instances(locations)
+
+    def _instance(self, name, masters, location):
+        deltas = self._deltasCache.get((name, None))
+        if deltas is None:
+            deltas = self.model.getDeltas(masters)
+            self._deltasCache.set((name, None), deltas)
+        return deltas.instance(location)
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
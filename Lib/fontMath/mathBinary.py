@@ -0,0 +1,460 @@
+from __future__ import division, absolute_import
+from array import array
+from fontTools.cffLib.specializer import commandsToProgram, specializeCommands
+from fontTools.cu2qu import curves_to_quadratic
+from fontTools.misc.fixedTools import floatToFixedToFloat, otRound
+from fontTools.misc.psCharStrings import T2CharString
+from fontTools.pens.basePen import decomposeQuadraticSegment, decomposeSuperBezierSegment
+from fontTools.ttLib.tables import ttProgram
+from fontTools.ttLib.tables._g_l_y_f import Glyph, GlyphComponent, GlyphCoordinates
+from fontMath.mathComponents import MathGlyphDecomposer
+from fontMath.mathGlyph import MathGlyph
+
+"""
+Conversion between MathGlyph objects and compiled font data.
+
+Building a MathGlyph from a fontTools glyf glyph through
+MathGlyph(glyph) replays every point through drawPoints and
+MathGlyphPen.addPoint. The functions here read the coordinate
+array, the flags and the contour end points of the glyph directly
+and build the normalized MathGlyph contours in one pass. The
+result is identical to the pen based path.
+
+The other direction works the same way: glyphToGlyf, glyphsToGlyf
+and glyphToCharString build fontTools glyf glyphs and
+T2CharString objects straight from the normalized contours
+instead of drawing through PointToSegmentPen, Cu2QuPen and
+TTGlyphPen or T2CharStringPen. Cubic curves are converted to
+quadratic curves per segment for all glyphs given to
+glyphsToGlyf at once, so compatible masters stay compatible.
+"""
+
+__all__ = [
+    "glyphFromGlyf",
+    "glyphsFromTTFont",
+    "glyphToGlyf",
+    "glyphsToGlyf",
+    "glyphToCharString"
+]
+
+# glyf point flags
+_flagOnCurve = 0x01
+_flagCubic = 0x80
+# glyf component flags
+_flagRoundXYToGrid = 0x04
+# the largest value that fits in a F2Dot14
+_maxF2Dot14 = 0x7FFF / (1 << 14)
+
+
+# ------------
+# Construction
+# ------------
+
+def glyphFromGlyf(glyfGlyph, glyfTable, name=None, width=0, height=0, unicodes=None):
+    """
+    Return a MathGlyph built from glyfGlyph, a
+    fontTools.ttLib.tables._g_l_y_f.Glyph that is part of glyfTable.
+    The glyf table does not contain the name, metrics or unicodes
+    of the glyph, so they need to be given.
+    """
+    glyph = MathGlyph(None)
+    glyph.name = name
+    glyph.width = width
+    glyph.height = height
+    glyph.unicodes = [] if unicodes is None else list(unicodes)
+    if glyfGlyph.isComposite():
+        glyph.components = [
+            dict(baseGlyph=baseGlyph, transformation=transformation, identifier=None)
+            for baseGlyph, transformation in (
+                component.getComponentInfo() for component in glyfGlyph.components
+            )
+        ]
+    elif glyfGlyph.numberOfContours:
+        coordinates, endPts, flags = glyfGlyph.getCoordinates(glyfTable)
+        # slicing converts the whole array in one call
+        coordinates = coordinates[:]
+        contours = []
+        start = 0
+        for end in endPts:
+            end += 1
+            contours.append(_normalizedContour(coordinates[start:end], flags[start:end]))
+            start = end
+        glyph.contours = contours
+    return glyph
+
+
+def glyphsFromTTFont(font, glyphNames=None):
+    """
+    Return a dict of glyph name to MathGlyph for the glyphs in
+    glyphNames, or all glyphs, of font, a fontTools TTFont with
+    a glyf table. The widths, heights and unicodes are read from
+    the hmtx, vmtx and cmap tables.
+    """
+    if glyphNames is None:
+        glyphNames = font.getGlyphOrder()
+    glyfTable = font["glyf"]
+    hmtx = font["hmtx"].metrics
+    vmtx = font["vmtx"].metrics if "vmtx" in font else {}
+    unicodes = {}
+    cmap = font.getBestCmap() if "cmap" in font else None
+    if cmap:
+        for unicode, glyphName in sorted(cmap.items()):
+            unicodes.setdefault(glyphName, []).append(unicode)
+    glyphs = {}
+    for glyphName in glyphNames:
+        glyphs[glyphName] = glyphFromGlyf(
+            glyfTable[glyphName],
+            glyfTable,
+            name=glyphName,
+            width=hmtx[glyphName][0],
+            height=vmtx[glyphName][0] if glyphName in vmtx else 0,
+            unicodes=unicodes.get(glyphName)
+        )
+    return glyphs
+
+
+# ----------
+# Extraction
+# ----------
+
+def glyphToGlyf(glyph, glyphSet=None, maxErr=1.0, reverseDirection=False):
+    """
+    Return a fontTools.ttLib.tables._g_l_y_f.Glyph built from
+    glyph. See glyphsToGlyf for the arguments.
+    """
+    return glyphsToGlyf([glyph], glyphSet=glyphSet, maxErr=maxErr, reverseDirection=reverseDirection)[0]
+
+
+def glyphsToGlyf(glyphs, glyphSet=None, maxErr=1.0, reverseDirection=False):
+    """
+    Return a list of fontTools.ttLib.tables._g_l_y_f.Glyph objects,
+    one for each MathGlyph in glyphs.
+
+    The glyphs must be compatible (ie the masters or instances of
+    one glyph). Cubic curves are converted to quadratic curves
+    with at most maxErr units of error and the same number of
+    points in every glyph. If reverseDirection is True, the
+    contour direction is reversed, which is needed to go from
+    PostScript to TrueType conventions.
+
+    glyf glyphs can not mix contours and components and can not
+    hold component scales of 2 or more. The components of such
+    glyphs are decomposed through glyphSet, a dict of glyph
+    names to MathGlyph objects. A ValueError is raised if
+    decomposition is needed without a glyphSet.
+    """
+    decomposer = None
+    glyphContours = []
+    glyphComponents = []
+    for glyph in glyphs:
+        contours = glyph.contours
+        components = glyph.components
+        if components and (contours or _componentsOverflow(components)):
+            if glyphSet is None:
+                raise ValueError("A glyph set is needed to decompose the components of %s." % glyph.name)
+            if decomposer is None:
+                decomposer = MathGlyphDecomposer(glyphSet)
+            contours = contours + decomposer.componentContours(components)
+            components = []
+        glyphContours.append(contours)
+        glyphComponents.append(components)
+    if len(set(len(contours) for contours in glyphContours)) > 1 \
+            or len(set(len(components) for components in glyphComponents)) > 1:
+        raise ValueError("The glyphs are not compatible.")
+    results = []
+    if glyphComponents and glyphComponents[0]:
+        for components in glyphComponents:
+            ttGlyph = Glyph()
+            ttGlyph.components = [_glyfComponent(component) for component in components]
+            ttGlyph.numberOfContours = -1
+            results.append(ttGlyph)
+        return results
+    glyphPoints = [[] for glyph in glyphs]
+    flags = []
+    endPts = []
+    for contours in zip(*glyphContours):
+        contourPoints, contourFlags = _glyfContour(
+            [contour["points"] for contour in contours], maxErr
+        )
+        if reverseDirection:
+            # the start point stays in place
+            contourPoints = [points[:1] + points[:0:-1] for points in contourPoints]
+            contourFlags = contourFlags[:1] + contourFlags[:0:-1]
+        for points, newPoints in zip(glyphPoints, contourPoints):
+            points.extend(newPoints)
+        flags.extend(contourFlags)
+        endPts.append(len(flags) - 1)
+    for points in glyphPoints:
+        ttGlyph = Glyph()
+        ttGlyph.coordinates = GlyphCoordinates([(otRound(x), otRound(y)) for x, y in points])
+        ttGlyph.flags = array("B", flags)
+        ttGlyph.endPtsOfContours = list(endPts)
+        ttGlyph.numberOfContours = len(endPts)
+        ttGlyph.program = ttProgram.Program()
+        ttGlyph.program.fromBytecode(b"")
+        results.append(ttGlyph)
+    return results
+
+
+def glyphToCharString(glyph, private=None, globalSubrs=None, glyphSet=None, CFF2=False, optimize=True):
+    """
+    Return a fontTools T2CharString built from glyph.
+
+    private and globalSubrs are passed to the T2CharString. The
+    advance width is encoded relative to the nominalWidthX of
+    private, and left out if it equals the defaultWidthX. CFF2
+    charstrings have no width and no endchar operator. If
+    optimize is True, the operators are specialized to the
+    shortest form. Components are decomposed through glyphSet,
+    a dict of glyph names to MathGlyph objects.
+    """
+    contours = glyph.contours
+    if glyph.components:
+        if glyphSet is None:
+            raise ValueError("A glyph set is needed to decompose the components of %s." % glyph.name)
+        contours = contours + MathGlyphDecomposer(glyphSet).componentContours(glyph.components)
+    commands = []
+    current = (0, 0)
+    for contour in contours:
+        points = contour["points"]
+        if not points:
+            continue
+        segments, closed = _contourSegments(points)
+        if points[0][0] is None:
+            # start on the implied on curve
+            start = _roundPoint(segments[0][1])
+        else:
+            start = _roundPoint(points[0][1])
+        commands.append(("rmoveto", [start[0] - current[0], start[1] - current[1]]))
+        current = start
+        for index, (segmentType, previous, offCurves, onCurve) in enumerate(segments):
+            if _isLine(previous, offCurves, onCurve):
+                if closed and index == len(segments) - 1:
+                    # the closing line is implied
+                    continue
+                curves = None
+            elif segmentType == "qcurve" or len(offCurves) == 1:
+                curves = [
+                    _quadraticToCubic(pt0, pt1, pt2)
+                    for pt0, (pt1, pt2) in _chainedSegments(
+                        previous, decomposeQuadraticSegment(offCurves + [onCurve]))
+                ]
+            else:
+                curves = _cubicSegments(offCurves, onCurve)
+            if curves is None:
+                pt = _roundPoint(onCurve)
+                commands.append(("rlineto", [pt[0] - current[0], pt[1] - current[1]]))
+                current = pt
+                continue
+            for curve in curves:
+                args = []
+                for pt in curve:
+                    pt = _roundPoint(pt)
+                    args.extend((pt[0] - current[0], pt[1] - current[1]))
+                    current = pt
+                commands.append(("rrcurveto", args))
+    if optimize:
+        commands = specializeCommands(commands, generalizeFirst=False, maxstack=513 if CFF2 else 48)
+    program = commandsToProgram(commands)
+    if not CFF2:
+        defaultWidthX = getattr(private, "defaultWidthX", 0)
+        nominalWidthX = getattr(private, "nominalWidthX", 0)
+        if glyph.width != defaultWidthX:
+            program.insert(0, otRound(glyph.width - nominalWidthX))
+        program.append("endchar")
+    return T2CharString(program=program, private=private, globalSubrs=globalSubrs)
+
+
+def _componentsOverflow(components):
+    return any(
+        value >= 2 or value < -2
+        for component in components
+        for value in component["transformation"][:4]
+    )
+
+
+def _glyfComponent(component):
+    ttComponent = GlyphComponent()
+    ttComponent.glyphName = component["baseGlyph"]
+    transformation = component["transformation"]
+    ttComponent.x = otRound(transformation[4])
+    ttComponent.y = otRound(transformation[5])
+    # quantize to the values a compiled glyf table would hold
+    transformation = tuple(
+        min(floatToFixedToFloat(value, 14), _maxF2Dot14) for value in transformation[:4]
+    )
+    if transformation != (1, 0, 0, 1):
+        ttComponent.transform = [list(transformation[:2]), list(transformation[2:])]
+    ttComponent.flags = _flagRoundXYToGrid
+    return ttComponent
+
+
+def _glyfContour(glyphContourPoints, maxErr):
+    """
+    Return the points of one contour for each glyph and the
+    shared flags in glyf order.
+    """
+    glyphSegments = [_contourSegments(points) for points in glyphContourPoints]
+    count = len(glyphSegments[0][0])
+    if any(len(segments) != count for segments, closed in glyphSegments):
+        raise ValueError("The glyphs are not compatible.")
+    if glyphContourPoints[0][0][0] is None:
+        # quadratic contour without on curves
+        glyphPoints = [[point[1] for point in points] for points in glyphContourPoints]
+        return glyphPoints, [0] * len(glyphPoints[0])
+    glyphPoints = [[points[0][1]] for points in glyphContourPoints]
+    flags = [_flagOnCurve]
+    for index in range(count):
+        segments = [segments[index] for segments, closed in glyphSegments]
+        segmentType, previous, offCurves, onCurve = segments[0]
+        if any(len(segment[2]) != len(offCurves) for segment in segments):
+            raise ValueError("The glyphs are not compatible.")
+        if all(_isLine(*segment[1:]) for segment in segments):
+            glyphOffCurves = [[] for segment in segments]
+        elif segmentType == "qcurve" or len(offCurves) == 1:
+            glyphOffCurves = [segment[2] for segment in segments]
+        else:
+            glyphOffCurves = [[] for segment in segments]
+            glyphCurves = [_cubicSegments(segment[2], segment[3]) for segment in segments]
+            glyphStarts = [segment[1] for segment in segments]
+            for curves in zip(*glyphCurves):
+                cubics = [[start] + list(curve) for start, curve in zip(glyphStarts, curves)]
+                quadratics = curves_to_quadratic(cubics, [maxErr] * len(cubics))
+                for offCurves, quadratic in zip(glyphOffCurves, quadratics):
+                    offCurves.extend(quadratic[1:-1])
+                glyphStarts = [curve[-1] for curve in curves]
+        for points, segment, offCurves in zip(glyphPoints, segments, glyphOffCurves):
+            points.extend(offCurves)
+            points.append(segment[3])
+        flags.extend([0] * len(glyphOffCurves[0]))
+        flags.append(_flagOnCurve)
+    if glyphSegments[0][1]:
+        # the closing segment ends on the start point
+        for points in glyphPoints:
+            del points[-1]
+        del flags[-1]
+    return glyphPoints, flags
+
+
+def _contourSegments(points):
+    """
+    Return a list of (segmentType, previousOnCurve, offCurves, onCurve)
+    for the segments of a normalized contour in drawing order and
+    whether the contour is closed. The segment types of lines are
+    kept from the normalized contour. The closing segment of a
+    closed contour ends on the start point.
+    """
+    if points[0][0] is None:
+        # quadratic contour without on curves
+        offCurves = [point[1] for point in points]
+        implied = (
+            (offCurves[-1][0] + offCurves[0][0]) * 0.5,
+            (offCurves[-1][1] + offCurves[0][1]) * 0.5
+        )
+        return [("qcurve", implied, offCurves, implied)], True
+    closed = points[0][0] != "move"
+    segments = []
+    previous = points[0][1]
+    offCurves = []
+    for segmentType, pt, smooth, name, identifier in points[1:]:
+        if segmentType is None:
+            offCurves.append(pt)
+        else:
+            segments.append((segmentType, previous, offCurves, pt))
+            previous = pt
+            offCurves = []
+    if closed:
+        segments.append((points[0][0], previous, offCurves, points[0][1]))
+    return segments, closed
+
+
+def _isLine(previous, offCurves, onCurve):
+    if not offCurves:
+        return True
+    return len(offCurves) == 2 and offCurves[0] == previous and offCurves[1] == onCurve
+
+
+def _cubicSegments(offCurves, onCurve):
+    if len(offCurves) == 2:
+        return [(offCurves[0], offCurves[1], onCurve)]
+    return decomposeSuperBezierSegment(offCurves + [onCurve])
+
+
+def _chainedSegments(start, segments):
+    for segment in segments:
+        yield start, segment
+        start = segment[-1]
+
+
+def _quadraticToCubic(pt0, pt1, pt2):
+    return (
+        (pt0[0] + (pt1[0] - pt0[0]) * 2 / 3, pt0[1] + (pt1[1] - pt0[1]) * 2 / 3),
+        (pt2[0] + (pt1[0] - pt2[0]) * 2 / 3, pt2[1] + (pt1[1] - pt2[1]) * 2 / 3),
+        pt2
+    )
+
+
+def _roundPoint(pt):
+    return otRound(pt[0]), otRound(pt[1])
+
+
+# -------
+# Helpers
+# -------
+
+def _normalizedContour(points, flags):
+    """
+    Return a contour dict with the same structure MathGlyphPen
+    builds from the drawPoints output of a glyf contour: lines
+    are converted to curves and the contour starts with an
+    on curve.
+
+    >>> contour = _normalizedContour([(0, 0), (100, 0), (100, 100)], [1, 1, 0])
+    >>> for point in contour["points"]:
+    ...     print(point[:2])
+    ('qcurve', (0, 0))
+    (None, (0, 0))
+    (None, (100, 0))
+    ('curve', (100, 0))
+    (None, (100, 100))
+    """
+    count = len(points)
+    flags = [flag & (_flagOnCurve | _flagCubic) for flag in flags]
+    onCurves = [flag & _flagOnCurve for flag in flags]
+    if any(onCurves):
+        first = onCurves.index(_flagOnCurve)
+        if first:
+            points = points[first:] + points[:first]
+            flags = flags[first:] + flags[:first]
+    elif any(flags):
+        raise ValueError("All off curve cubic contours are not supported.")
+    contourPoints = []
+    holdingOffCurves = []
+    for index in range(count):
+        pt = points[index]
+        if flags[index] & _flagOnCurve:
+            previousFlag = flags[index - 1]
+            if previousFlag & _flagOnCurve:
+                offCurves = [
+                    (None, points[index - 1], False, None, None),
+                    (None, pt, False, None, None)
+                ]
+                if index == 0:
+                    holdingOffCurves = offCurves
+                else:
+                    contourPoints.extend(offCurves)
+                contourPoints.append(("curve", pt, False, None, None))
+            elif previousFlag & _flagCubic:
+                contourPoints.append(("curve", pt, False, None, None))
+            else:
+                contourPoints.append(("qcurve", pt, False, None, None))
+        else:
+            contourPoints.append((None, pt, False, None, None))
+    contourPoints.extend(holdingOffCurves)
+    return dict(identifier=None, points=contourPoints)
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
@@ -0,0 +1,213 @@
+from __future__ import division, absolute_import
+import threading
+from collections import OrderedDict
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathInfo import MathInfo, _infoAttrs
+from fontMath.mathKerning import MathKerning
+
+"""
+Bounded caches for the results of math operations.
+
+The size of a cache is not measured in objects but in the
+amount of data the objects hold: points (plus components,
+anchors and guidelines) for glyphs, pairs for kerning and
+attributes for info. A cache holding a few huge CJK glyphs
+and one holding thousands of small Latin glyphs will use
+roughly the same amount of memory for the same maxSize.
+"""
+
+__all__ = [
+    "MathCache",
+    "MathInstanceCache",
+    "_objectSize",
+    "_weightedSum"
+]
+
+# weights are rounded to this many digits before they are
+# used in a cache key so that locations computed through
+# slightly different float paths still share results.
+_weightPrecision = 10
+
+
+class MathCache(object):
+
+    """
+    A least recently used cache with size accounting.
+
+    Values are stored as is: they are shared by everyone
+    that gets them from the cache and must be treated as
+    read only.
+    """
+
+    def __init__(self, maxSize=1000000, sizeFunction=None):
+        if sizeFunction is None:
+            sizeFunction = _objectSize
+        self.maxSize = maxSize
+        self._sizeFunction = sizeFunction
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            # move to the most recently used end
+            item = self._data.pop(key)
+            self._data[key] = item
+            return item[0]
+
+    def set(self, key, value):
+        size = self._sizeFunction(value)
+        with self._lock:
+            if key in self._data:
+                self.size -= self._data.pop(key)[1]
+            if size > self.maxSize:
+                return
+            self._data[key] = (value, size)
+            self.size += size
+            while self.size > self.maxSize:
+                oldKey, (oldValue, oldSize) = self._data.popitem(last=False)
+                self.size -= oldSize
+                self.evictions += 1
+
+    def remove(self, key):
+        with self._lock:
+            if key in self._data:
+                self.size -= self._data.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        Return a dict of hit, miss and size statistics.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                hitRate=self.hits / lookups if lookups else 0.0,
+                evictions=self.evictions,
+                items=len(self._data),
+                size=self.size,
+                maxSize=self.maxSize
+            )
+
+    def resetStats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+class MathInstanceCache(MathCache):
+
+    """
+    A cache for instances of MathGlyph, MathKerning and
+    MathInfo objects.
+
+    Instances are weighted sums of masters and are keyed
+    by the content hashes of the masters and the weights,
+    so editing a master automatically misses the stale
+    results which then age out of the cache.
+
+    >>> from fontMath.mathKerning import MathKerning
+    >>> cache = MathInstanceCache()
+    >>> light = MathKerning({("A", "V"): -10})
+    >>> bold = MathKerning({("A", "V"): -30})
+    >>> sorted(cache.instance([light, bold], [0.5, 0.5]).items())
+    [(('A', 'V'), -20)]
+    >>> result = cache.instance([light, bold], [0.5, 0.5])
+    >>> cache.hits, cache.misses
+    (1, 1)
+    """
+
+    def instanceKey(self, masters, weights):
+        """
+        Return the cache key for masters and weights.
+        """
+        if len(masters) != len(weights):
+            raise ValueError("The number of masters and weights must be the same.")
+        return (
+            tuple((type(master).__name__, master.contentHash()) for master in masters),
+            tuple(_normalizeWeight(weight) for weight in weights)
+        )
+
+    def instance(self, masters, weights):
+        """
+        Return the sum of each master multiplied by its weight.
+
+        The result is computed once and then served from the cache.
+        """
+        key = self.instanceKey(masters, weights)
+        result = self.get(key)
+        if result is None:
+            result = _weightedSum(masters, weights)
+            self.set(key, result)
+        return result
+
+
+def _normalizeWeight(weight):
+    if isinstance(weight, tuple):
+        return tuple(_normalizeWeight(w) for w in weight)
+    # adding 0.0 turns -0.0 into 0.0
+    return round(float(weight), _weightPrecision) + 0.0
+
+
+def _weightedSum(masters, weights):
+    """
+    Return the sum of each master multiplied by its weight.
+
+    All masters take part, even when their weight is zero, so
+    the pairing of components, anchors and guidelines and the
+    non-math data of the result do not depend on the location.
+    """
+    result = None
+    for master, weight in zip(masters, weights):
+        term = master * weight
+        if result is None:
+            result = term
+        else:
+            result = result + term
+    return result
+
+
+def _objectSize(obj):
+    """
+    Return the amount of data held by a math object.
+
+    >>> from fontMath.mathKerning import MathKerning
+    >>> _objectSize(MathKerning({("A", "V"): -10, ("T", "o"): -20}))
+    3
+    """
+    if isinstance(obj, MathGlyph):
+        size = 1 + len(obj.components) + len(obj.anchors) + len(obj.guidelines)
+        for contour in obj.contours:
+            size += len(contour["points"])
+        return size
+    elif isinstance(obj, MathKerning):
+        return 1 + len(obj._kerning)
+    elif isinstance(obj, MathInfo):
+        return 1 + len(_infoAttrs) + len(obj.guidelines)
+    return 1
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
@@ -0,0 +1,218 @@
+from __future__ import division, absolute_import
+from fontMath.mathGlyph import MathGlyph
+
+"""
+Component resolution for sets of MathGlyph objects.
+
+MathGlyph components only reference their base glyphs by name.
+The functions here build the component dependency graph of a
+glyph set and MathGlyphDecomposer flattens composites into plain
+contours. Every glyph is decomposed once and the transformed
+outlines of a base glyph are cached per transformation, so an
+accent that is placed at the same position in many composites is
+only transformed once. Composites can be decomposed level by level
+in dependency order, optionally spreading each level over an
+executor.
+"""
+
+__all__ = [
+    "componentGraph",
+    "dependencyLevels",
+    "MathGlyphDecomposer"
+]
+
+
+def componentGraph(glyphs):
+    """
+    Return a dict of glyph name to the list of base glyph names
+    referenced by the components of the glyph. Base glyphs that
+    are not in glyphs are left out.
+
+    >>> glyphs = dict(a=MathGlyph(None), acute=MathGlyph(None), aacute=MathGlyph(None))
+    >>> glyphs["aacute"].components = [
+    ...     dict(baseGlyph="a", transformation=(1, 0, 0, 1, 0, 0), identifier=None),
+    ...     dict(baseGlyph="acute", transformation=(1, 0, 0, 1, 100, 0), identifier=None),
+    ...     dict(baseGlyph="missing", transformation=(1, 0, 0, 1, 0, 0), identifier=None)]
+    >>> sorted(componentGraph(glyphs).items())
+    [('a', []), ('aacute', ['a', 'acute']), ('acute', [])]
+    """
+    graph = {}
+    for glyphName, glyph in glyphs.items():
+        baseGlyphs = []
+        for component in glyph.components:
+            baseGlyph = component["baseGlyph"]
+            if baseGlyph in glyphs and baseGlyph not in baseGlyphs:
+                baseGlyphs.append(baseGlyph)
+        graph[glyphName] = baseGlyphs
+    return graph
+
+
+def dependencyLevels(glyphs, glyphNames=None):
+    """
+    Return a list of lists of glyph names ordered so that the
+    base glyphs of every glyph are in an earlier level. The first
+    level contains the glyphs without (known) components. Glyphs
+    in the same level do not depend on each other.
+
+    glyphNames limits the result to those glyphs and the glyphs
+    they depend on. A ValueError is raised for circular component
+    references.
+
+    >>> glyphs = dict(a=MathGlyph(None), acute=MathGlyph(None), aacute=MathGlyph(None))
+    >>> glyphs["aacute"].components = [
+    ...     dict(baseGlyph="a", transformation=(1, 0, 0, 1, 0, 0), identifier=None),
+    ...     dict(baseGlyph="acute", transformation=(1, 0, 0, 1, 100, 0), identifier=None)]
+    >>> dependencyLevels(glyphs)
+    [['a', 'acute'], ['aacute']]
+    """
+    graph = componentGraph(glyphs)
+    if glyphNames is None:
+        glyphNames = graph.keys()
+    levels = {}
+    for glyphName in sorted(glyphNames):
+        _glyphLevel(glyphName, graph, levels, set())
+    result = [[] for i in range(max(levels.values()) + 1)] if levels else []
+    for glyphName in sorted(levels):
+        result[levels[glyphName]].append(glyphName)
+    return result
+
+
+def _glyphLevel(glyphName, graph, levels, stack):
+    if glyphName in levels:
+        return levels[glyphName]
+    if glyphName in stack:
+        raise ValueError("Circular component reference in glyph %s." % glyphName)
+    stack.add(glyphName)
+    level = 0
+    for baseGlyph in graph[glyphName]:
+        level = max(level, _glyphLevel(baseGlyph, graph, levels, stack) + 1)
+    stack.discard(glyphName)
+    levels[glyphName] = level
+    return level
+
+
+class MathGlyphDecomposer(object):
+
+    """
+    Decomposes the components of the MathGlyph objects in glyphSet,
+    a dict of glyph names to MathGlyph objects.
+
+    Components referencing glyphs that are not in glyphSet are
+    dropped. The results are cached, so the glyphs in glyphSet
+    should not be modified while the decomposer is in use.
+    """
+
+    def __init__(self, glyphSet):
+        self.glyphSet = glyphSet
+        self._decomposedCache = {}
+        self._transformedCache = {}
+
+    def decomposedContours(self, glyphName):
+        """
+        Return a list of contour dicts holding the contours of the
+        glyph followed by the decomposed contours of its components.
+
+        The returned data is shared with the cache and must be
+        treated as read only. Use decompose to get a new glyph.
+        """
+        contours = self._decomposedCache.get(glyphName)
+        if contours is None:
+            contours = self._decompose(glyphName, set())
+        return contours
+
+    def componentContours(self, components):
+        """
+        Return a list of contour dicts holding the decomposed
+        contours of components, a list of component dicts that
+        reference glyphs in the glyph set. This is used for
+        glyphs that are not part of the glyph set.
+
+        The returned contours are shared with the cache and must
+        be treated as read only.
+        """
+        return self._componentContours(components, set())
+
+    def _componentContours(self, components, stack):
+        contours = []
+        for component in components:
+            baseGlyph = component["baseGlyph"]
+            if baseGlyph not in self.glyphSet:
+                continue
+            if baseGlyph not in self._decomposedCache:
+                self._decompose(baseGlyph, stack)
+            contours.extend(self._transformedContours(baseGlyph, tuple(component["transformation"])))
+        return contours
+
+    def _decompose(self, glyphName, stack):
+        if glyphName in stack:
+            raise ValueError("Circular component reference in glyph %s." % glyphName)
+        glyph = self.glyphSet[glyphName]
+        contours = list(glyph.contours)
+        if glyph.components:
+            stack.add(glyphName)
+            contours.extend(self._componentContours(glyph.components, stack))
+            stack.discard(glyphName)
+        self._decomposedCache[glyphName] = contours
+        return contours
+
+    def _transformedContours(self, baseGlyph, transformation):
+        key = (baseGlyph, transformation)
+        contours = self._transformedCache.get(key)
+        if contours is None:
+            xx, xy, yx, yy, dx, dy = transformation
+            contours = [
+                dict(identifier=None, points=[
+                    (segmentType, (xx * x + yx * y + dx, xy * x + yy * y + dy), smooth, name, None)
+                    for segmentType, (x, y), smooth, name, identifier in contour["points"]
+                ])
+                for contour in self._decomposedCache[baseGlyph]
+            ]
+            self._transformedCache[key] = contours
+        return contours
+
+    def decompose(self, glyphName):
+        """
+        Return a copy of the glyph with its components replaced
+        by their decomposed contours.
+        """
+        glyph = self.glyphSet[glyphName]
+        decomposed = glyph.copyWithoutMathSubObjects()
+        decomposed.contours = [
+            dict(identifier=contour["identifier"], points=list(contour["points"]))
+            for contour in self.decomposedContours(glyphName)
+        ]
+        decomposed.anchors = [dict(anchor) for anchor in glyph.anchors]
+        if not glyph.onlyGeometry:
+            decomposed.guidelines = [dict(guideline) for guideline in glyph.guidelines]
+            decomposed.image = dict(glyph.image)
+        return decomposed
+
+    def decomposeAll(self, glyphNames=None, executor=None):
+        """
+        Return a dict of glyph name to decomposed glyph for
+        glyphNames, or all glyphs in the glyph set.
+
+        The glyphs are decomposed level by level in dependency
+        order. If executor (any object with a map method, ie a
+        concurrent.futures.ThreadPoolExecutor or a
+        multiprocessing.pool.ThreadPool) is given, the glyphs of
+        each level are decomposed in parallel through its map method.
+        """
+        if glyphNames is None:
+            glyphNames = list(self.glyphSet.keys())
+        for level in dependencyLevels(self.glyphSet, glyphNames):
+            if executor is None:
+                for glyphName in level:
+                    self.decomposedContours(glyphName)
+            else:
+                # the base glyphs are all in earlier levels and already
+                # decomposed, so the work items only add to the caches
+                for contours in executor.map(self.decomposedContours, level):
+                    pass
+        return dict((glyphName, self.decompose(glyphName)) for glyphName in glyphNames)
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
@@ -0,0 +1,515 @@
+from __future__ import division, absolute_import
+from array import array
+from collections import OrderedDict
+from fontMath.mathGlyph import (
+    MathGlyph, _anchorPairs, _componentPairs, _contoursBounds, _expandImage,
+    _pairImages)
+from fontMath.mathGuideline import _guidelinePairs
+from fontMath.mathFunctions import factorAngle, mul
+from fontMath.mathInfo import MathInfo, _infoAttrs
+from fontMath.mathKerning import MathKerning
+
+"""
+Precomputed master deltas for repeated instancing.
+
+Instancing many locations from the same masters with the
+operators (a + (b - a) * t) pairs the components, anchors and
+guidelines and computes b - a again for every location. These
+objects resolve the pairing and compute the deltas of every
+master against the default master once, storing them in flat
+arrays. An instance is then default + sum(scalar * delta) over
+those arrays followed by a rebuild of the result object.
+
+Pairing follows the operators: contours must be compatible,
+components, anchors and guidelines are paired with the same
+rules as the operators and only those that can be paired with
+every master are kept. Non-math data comes from the default
+master. italicAngle and postscriptSlantAngle are multiplied with
+factorAngle, as in the MathInfo operators. Guideline angles are
+interpolated linearly.
+"""
+
+__all__ = [
+    "MathGlyphDeltas",
+    "MathKerningDeltas",
+    "MathInfoDeltas",
+    "batchInstances",
+    "_deltasForMasters"
+]
+
+
+class _MathDeltas(object):
+
+    """
+    Base class holding the default values and the delta arrays.
+
+    Subclasses set _defaultValues and _deltas and implement _build(values) to turn a list of flat values
+    into a math object.
+    """
+
+    def __len__(self):
+        return len(self._deltas)
+
+    def instance(self, scalars):
+        """
+        Return a new math object at default + sum(scalar * delta).
+
+        scalars is a list with one value per master, or a
+        single number when there is only one master.
+        """
+        return self._build(self._interpolate(scalars))
+
+    def instances(self, scalarRows):
+        """
+        Return a list with one math object per row of scalarRows.
+
+        This is the batch version of instance, it validates the
+        rows up front and skips the deltas with a zero scalar.
+        """
+        scalarRows = [self._coerceScalars(scalars) for scalars in scalarRows]
+        return [self._build(values) for values in self._interpolateMany(scalarRows)]
+
+    def weightedInstances(self, weightRows):
+        """
+        Return a list with one math object per row of weightRows.
+
+        Each row has one weight for the default master followed by
+        one weight per master and the result is the sum of each
+        master multiplied by its weight, so a K x N weight matrix
+        gives K instances of N masters.
+        """
+        scalarRows = []
+        defaultWeights = []
+        for weights in weightRows:
+            if len(weights) != len(self._deltas) + 1:
+                raise ValueError("Expected %d weights, got %d." % (len(self._deltas) + 1, len(weights)))
+            defaultWeights.append(weights[0])
+            scalarRows.append(list(weights[1:]))
+        return [
+            self._build(values)
+            for values in self._interpolateMany(scalarRows, defaultWeights)
+        ]
+
+    def _coerceScalars(self, scalars):
+        if not isinstance(scalars, (list, tuple)):
+            scalars = [scalars]
+        if len(scalars) != len(self._deltas):
+            raise ValueError("Expected %d scalars, got %d." % (len(self._deltas), len(scalars)))
+        return scalars
+
+    def _interpolate(self, scalars):
+        return self._combine(1, self._coerceScalars(scalars))
+
+    def _interpolateMany(self, scalarRows, defaultWeights=None):
+        # sum(w_i * m_i) == sum(w) * m_0 + sum(w_i * (m_i - m_0))
+        if defaultWeights is None:
+            return [self._combine(1, scalars) for scalars in scalarRows]
+        return [
+            self._combine(defaultWeight + sum(scalars), scalars)
+            for defaultWeight, scalars in zip(defaultWeights, scalarRows)
+        ]
+
+    def _combine(self, defaultScalar, scalars):
+        """
+        Return defaultScalar * default + sum(scalar * delta) as a list.
+        Deltas with a zero scalar are skipped and every remaining
+        delta is added in one pass over its array.
+        """
+        active = [(scalar, deltas) for scalar, deltas in zip(scalars, self._deltas) if scalar]
+        defaultValues = self._defaultValues
+        if not active:
+            if defaultScalar == 1:
+                return list(defaultValues)
+            return [defaultScalar * v for v in defaultValues]
+        scalar, deltas = active[0]
+        if defaultScalar == 1:
+            values = [v + scalar * d for v, d in zip(defaultValues, deltas)]
+        else:
+            values = [defaultScalar * v + scalar * d for v, d in zip(defaultValues, deltas)]
+        for scalar, deltas in active[1:]:
+            values = [v + scalar * d for v, d in zip(values, deltas)]
+        return values
+
+
+def _deltaArrays(defaultValues, masterValues):
+    deltas = []
+    for values in masterValues:
+        if len(values) != len(defaultValues):
+            raise ValueError("The masters are not compatible.")
+        deltas.append(array("d", [m - d for m, d in zip(values, defaultValues)]))
+    return deltas
+
+
+def _matchAll(items, pairsPerMaster):
+    """
+    Return a list of (item, [partner in each master]) for
+    the items that have a partner in every master. pairs
+    are dicts of id(item) to partner.
+    """
+    matched = []
+    for item in items:
+        partners = []
+        for pairs in pairsPerMaster:
+            partner = pairs.get(id(item))
+            if partner is None:
+                break
+            partners.append(partner)
+        else:
+            matched.append((item, partners))
+    return matched
+
+
+# ------
+# Glyphs
+# ------
+
+class _MathGlyphLayout(object):
+
+    """
+    The flat value layout of a MathGlyph and the pairing of its
+    components, anchors, guidelines and image with other masters.
+    """
+
+    def __init__(self, default, masters):
+        self.default = default
+        self._contourStructure = [
+            (contour["identifier"], [(point[0], point[2], point[3], point[4]) for point in contour["points"]])
+            for contour in default.contours
+        ]
+        self._components = _matchAll(
+            default.components,
+            [_componentPairs(default.components, master.components) for master in masters]
+        )
+        self._anchors = _matchAll(
+            default.anchors,
+            [_anchorPairs(default.anchors, master.anchors) for master in masters]
+        )
+        self._guidelines = _matchAll(
+            default.guidelines,
+            [_guidelinePairs(default.guidelines, master.guidelines) for master in masters]
+        )
+        self._pairImage = not default.onlyGeometry and all(
+            _pairImages(default.image, master.image) for master in masters)
+
+    def _values(self, glyph, masterIndex):
+        """
+        Flatten the data of glyph in the order of the structure.
+        masterIndex is None for the default master.
+        """
+        values = [glyph.width, glyph.height]
+        for contour in glyph.contours:
+            for point in contour["points"]:
+                values.extend(point[1])
+        for component, partners in self._components:
+            if masterIndex is not None:
+                component = partners[masterIndex]
+            values.extend(component["transformation"])
+        for anchor, partners in self._anchors:
+            if masterIndex is not None:
+                anchor = partners[masterIndex]
+            values.append(anchor["x"])
+            values.append(anchor["y"])
+        for guideline, partners in self._guidelines:
+            if masterIndex is not None:
+                guideline = partners[masterIndex]
+            values.append(guideline["x"])
+            values.append(guideline["y"])
+            values.append(guideline["angle"])
+        if self._pairImage:
+            values.extend(glyph.image["transformation"])
+        return values
+
+    def _buildContours(self, values):
+        index = 2
+        contours = []
+        for contourIdentifier, points in self._contourStructure:
+            resultPoints = []
+            for segmentType, smooth, name, identifier in points:
+                resultPoints.append((segmentType, (values[index], values[index + 1]), smooth, name, identifier))
+                index += 2
+            contours.append(dict(identifier=contourIdentifier, points=resultPoints))
+        return contours, index
+
+    def _build(self, values):
+        glyph = self.default.copyWithoutMathSubObjects()
+        glyph.scaleComponentTransform = self.default.scaleComponentTransform
+        glyph.width = values[0]
+        glyph.height = values[1]
+        glyph.contours, index = self._buildContours(values)
+        components = []
+        for component, partners in self._components:
+            component = dict(component)
+            component["transformation"] = tuple(values[index:index + 6])
+            components.append(component)
+            index += 6
+        glyph.components = components
+        anchors = []
+        for anchor, partners in self._anchors:
+            anchor = dict(anchor)
+            anchor["x"] = values[index]
+            anchor["y"] = values[index + 1]
+            anchors.append(anchor)
+            index += 2
+        glyph.anchors = anchors
+        guidelines = []
+        for guideline, partners in self._guidelines:
+            guideline = dict(guideline)
+            guideline["x"] = values[index]
+            guideline["y"] = values[index + 1]
+            guideline["angle"] = values[index + 2] % 360
+            guidelines.append(guideline)
+            index += 3
+        glyph.guidelines = guidelines
+        if self._pairImage:
+            image = dict(self.default.image)
+            image["transformation"] = tuple(values[index:index + 6])
+            glyph.image = image
+        else:
+            glyph.image = _expandImage(None)
+        return glyph
+
+
+class MathGlyphDeltas(_MathGlyphLayout, _MathDeltas):
+
+    """
+    Deltas of MathGlyph masters against a default MathGlyph.
+
+    >>> from fontMath.mathGlyph import MathGlyph
+    >>> light = MathGlyph(None)
+    >>> light.width, light.height = 100, 0
+    >>> bold = MathGlyph(None)
+    >>> bold.width, bold.height = 200, 0
+    >>> deltas = MathGlyphDeltas(light, [bold])
+    >>> deltas.instance([0.25]).width
+    125.0
+    """
+
+    def __init__(self, default, masters):
+        masters = list(masters)
+        _MathGlyphLayout.__init__(self, default, masters)
+        defaultValues = self._values(default, None)
+        self._defaultValues = array("d", defaultValues)
+        self._deltas = _deltaArrays(
+            defaultValues,
+            [self._values(master, index) for index, master in enumerate(masters)]
+        )
+
+    def bounds(self, scalars):
+        """
+        Return the bounds of the contours of instance(scalars)
+        without building the glyph.
+        """
+        contours, index = self._buildContours(self._interpolate(scalars))
+        return _contoursBounds(contours)
+
+
+# -------
+# Kerning
+# -------
+
+class MathKerningDeltas(_MathDeltas):
+
+    """
+    Deltas of MathKerning masters against a default MathKerning.
+
+    Every pair defined in any master takes part. Values for pairs
+    that are not defined in a master are looked up through the
+    groups of that master, as in the operators.
+
+    >>> light = MathKerning({("A", "V"): -10})
+    >>> bold = MathKerning({("A", "V"): -30, ("T", "o"): -20})
+    >>> deltas = MathKerningDeltas(light, [bold])
+    >>> sorted(deltas.instance([0.5]).items())
+    [(('A', 'V'), -20), (('T', 'o'), -10)]
+    """
+
+    def __init__(self, default, masters):
+        self.default = default
+        masters = list(masters)
+        pairs = OrderedDict.fromkeys(default.keys())
+        for master in masters:
+            for pair in master.keys():
+                pairs[pair] = None
+        self._pairs = list(pairs.keys())
+        groups = default.groups()
+        for master in masters:
+            otherGroups = master.groups()
+            if groups == otherGroups or not groups or not otherGroups:
+                groups = groups or otherGroups
+            else:
+                comboGroups = set(groups.keys()) | set(otherGroups.keys())
+                groups = dict(
+                    (groupName, sorted(set(groups.get(groupName, [])) | set(otherGroups.get(groupName, []))))
+                    for groupName in comboGroups
+                )
+        self._groups = groups
+        defaultValues = [default.get(pair) for pair in self._pairs]
+        self._defaultValues = array("d", defaultValues)
+        self._deltas = _deltaArrays(
+            defaultValues,
+            [[master.get(pair) for pair in self._pairs] for master in masters]
+        )
+
+    def _build(self, values):
+        kerning = MathKerning(dict(zip(self._pairs, values)), self._groups)
+        kerning.cleanup()
+        return kerning
+
+
+# ----
+# Info
+# ----
+
+class MathInfoDeltas(_MathDeltas):
+
+    """
+    Deltas of MathInfo masters against a default MathInfo.
+
+    Attributes that are not defined in the default master are
+    not defined in the instances. Attributes that are not
+    defined in another master (or are number lists of a
+    different length) do not vary with that master.
+    """
+
+    def __init__(self, default, masters):
+        self.default = default
+        masters = list(masters)
+        structure = []
+        for attr in _infoAttrs.keys():
+            value = getattr(default, attr, None)
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple)):
+                structure.append((attr, len(value)))
+            else:
+                structure.append((attr, None))
+        self._structure = structure
+        self._guidelines = _matchAll(
+            default.guidelines,
+            [_guidelinePairs(default.guidelines, master.guidelines) for master in masters]
+        )
+        defaultValues = self._values(default, default, None)
+        masterValues = [self._values(master, default, index) for index, master in enumerate(masters)]
+        self._defaultValues = array("d", defaultValues)
+        self._deltas = _deltaArrays(defaultValues, masterValues)
+        # (value index, default angle, angle in each master)
+        self._angles = []
+        index = 0
+        for attr, length in structure:
+            if length is None:
+                if _infoAttrs[attr][1] == 3:
+                    self._angles.append((index, defaultValues[index], [values[index] for values in masterValues]))
+                index += 1
+            else:
+                index += length
+
+    def _interpolate(self, scalars):
+        scalars = self._coerceScalars(scalars)
+        values = _MathDeltas._interpolate(self, scalars)
+        self._interpolateAngles(values, scalars, None)
+        return values
+
+    def _interpolateMany(self, scalarRows, defaultWeights=None):
+        results = _MathDeltas._interpolateMany(self, scalarRows, defaultWeights)
+        if self._angles:
+            if defaultWeights is None:
+                defaultWeights = [None] * len(scalarRows)
+            for values, scalars, defaultWeight in zip(results, scalarRows, defaultWeights):
+                self._interpolateAngles(values, scalars, defaultWeight)
+        return results
+
+    def _interpolateAngles(self, values, scalars, defaultWeight):
+        for index, defaultAngle, masterAngles in self._angles:
+            if defaultWeight is None:
+                # default + (master - default) * scalar
+                angle = defaultAngle
+                for scalar, masterAngle in zip(scalars, masterAngles):
+                    if scalar:
+                        angle += factorAngle(masterAngle - defaultAngle, (scalar, scalar), mul)
+            else:
+                # sum(master * weight)
+                angle = factorAngle(defaultAngle, (defaultWeight, defaultWeight), mul)
+                for scalar, masterAngle in zip(scalars, masterAngles):
+                    angle += factorAngle(masterAngle, (scalar, scalar), mul)
+            values[index] = angle
+
+    def _values(self, info, default, masterIndex):
+        values = []
+        for attr, length in self._structure:
+            value = getattr(info, attr, None)
+            if length is None:
+                if value is None:
+                    value = getattr(default, attr)
+                values.append(value)
+            else:
+                if value is None or len(value) != length:
+                    value = getattr(default, attr)
+                values.extend(value)
+        for guideline, partners in self._guidelines:
+            if masterIndex is not None:
+                guideline = partners[masterIndex]
+            values.append(guideline["x"])
+            values.append(guideline["y"])
+            values.append(guideline["angle"])
+        return values
+
+    def _build(self, values):
+        info = self.default.copy()
+        index = 0
+        for attr, length in self._structure:
+            if length is None:
+                setattr(info, attr, values[index])
+                index += 1
+            else:
+                setattr(info, attr, values[index:index + length])
+                index += length
+        guidelines = []
+        for guideline, partners in self._guidelines:
+            guideline = dict(guideline)
+            guideline["x"] = values[index]
+            guideline["y"] = values[index + 1]
+            guideline["angle"] = values[index + 2] % 360
+            guidelines.append(guideline)
+            index += 3
+        info.guidelines = guidelines
+        info._processPostscriptWeightName(info)
+        return info
+
+
+def batchInstances(masters, weightMatrix):
+    """
+    Return one instance per row of weightMatrix.
+
+    masters is a list of N MathGlyph, MathKerning or MathInfo
+    objects of the same type and weightMatrix is a list of K rows
+    of N weights. Each instance is the sum of each master
+    multiplied by its weight. The first master is used for the
+    pairing and the non-math data.
+
+    >>> light = MathKerning({("A", "V"): -10})
+    >>> bold = MathKerning({("A", "V"): -30})
+    >>> steps = batchInstances([light, bold], [[1 - t / 4, t / 4] for t in range(5)])
+    >>> [kerning[("A", "V")] for kerning in steps]
+    [-10, -15, -20, -25, -30]
+    """
+    masters = list(masters)
+    return _deltasForMasters(masters[0], masters[1:]).weightedInstances(weightMatrix)
+
+
+def _deltasForMasters(default, masters):
+    """
+    Return the deltas object matching the type of default.
+    """
+    if isinstance(default, MathGlyph):
+        return MathGlyphDeltas(default, masters)
+    elif isinstance(default, MathKerning):
+        return MathKerningDeltas(default, masters)
+    elif isinstance(default, MathInfo):
+        return MathInfoDeltas(default, masters)
+    raise TypeError("Unsupported master type: %s" % type(default).__name__)
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
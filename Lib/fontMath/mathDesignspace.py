@@ -0,0 +1,75 @@
+from __future__ import division, absolute_import
+from fontTools.designspaceLib import DesignSpaceDocument
+from fontTools.varLib.models import normalizeLocation
+
+"""
+Designspace documents as input for the instancing tools.
+
+fontMath works with normalized locations, as used by
+MathVariationModel. readDesignspace reads the master and instance
+paths of a .designspace file and normalizes their locations, so
+the command line tools don't have to know about axis mappings.
+"""
+
+__all__ = [
+    "readDesignspace"
+]
+
+
+def readDesignspace(path):
+    """
+    Read the designspace document at path and return a tuple of
+    two lists of dicts:
+
+    - sources: path and location of each master
+    - instances: name, path, location, familyName and styleName
+      of each instance
+
+    The locations are normalized and keyed by axis name. Sources
+    that refer to a layer other than the default layer of the UFO
+    are not supported and raise a ValueError.
+    """
+    document = DesignSpaceDocument.fromfile(path)
+    if not document.axes:
+        raise ValueError("The designspace has no axes.")
+    axes = {}
+    for axis in document.axes:
+        axes[axis.name] = (
+            axis.map_forward(axis.minimum),
+            axis.map_forward(axis.default),
+            axis.map_forward(axis.maximum)
+        )
+    sources = []
+    for source in document.sources:
+        if source.layerName is not None:
+            raise ValueError("Source layers are not supported: %s." % source.name)
+        sources.append(dict(
+            path=source.path,
+            location=_normalizedLocation(source.location, axes)
+        ))
+    instances = []
+    for index, instance in enumerate(document.instances):
+        name = instance.name or instance.styleName or "instance%d" % index
+        instances.append(dict(
+            name=name,
+            path=instance.path,
+            location=_normalizedLocation(instance.location, axes),
+            familyName=instance.familyName,
+            styleName=instance.styleName
+        ))
+    return sources, instances
+
+
+def _normalizedLocation(location, axes):
+    location = dict(
+        (axisName, value) for axisName, value in location.items()
+        if axisName in axes
+    )
+    location = normalizeLocation(location, axes)
+    return dict((axisName, value) for axisName, value in location.items() if value)
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
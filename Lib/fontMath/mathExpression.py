@@ -0,0 +1,213 @@
+from __future__ import division, absolute_import
+from collections import OrderedDict
+from fontMath.mathKerning import MathKerning
+
+"""
+Lazy expressions for chained math.
+
+An expression like (a * 0.3 + b * 0.5 + c * 0.2).round() builds
+a complete MathGlyph at every operator. Wrapping the operands with
+lazy() makes the operators record an expression tree instead:
+
+    >>> from fontMath.mathKerning import MathKerning
+    >>> a = MathKerning({("A", "V"): -10})
+    >>> b = MathKerning({("A", "V"): -30})
+    >>> expression = lazy(a) * 0.25 + lazy(b) * 0.75
+    >>> expression[("A", "V")]
+    -25
+
+The tree is evaluated the first time the result is needed (an
+attribute is accessed, it is extracted, drawn or evaluate() is
+called). Additions, subtractions and scalar multiplications and
+divisions are flattened into one weighted sum over the distinct
+operands, which is computed with the regular operators: one
+multiplication per operand and one addition per term. Operands
+that appear more than once are only visited once and
+sub-expressions shared between trees are only evaluated once.
+Rounding and (x, y) factors can't be flattened; they evaluate
+their operand and then apply the regular operator.
+
+Results are cached on the expression nodes, so the operands
+should not be modified after an expression has been evaluated.
+"""
+
+__all__ = [
+    "MathExpression",
+    "lazy"
+]
+
+
+def lazy(obj):
+    """
+    Return a MathExpression wrapping a MathGlyph, MathKerning or
+    MathInfo object. Expressions are returned unchanged.
+    """
+    if isinstance(obj, MathExpression):
+        return obj
+    return MathExpression("value", (obj,))
+
+
+class MathExpression(object):
+
+    """
+    A node in a lazy math expression tree.
+
+    operator is one of "value", "add", "sub", "mul", "div" or
+    "round". Use lazy() to create value nodes and the regular
+    operators to combine them.
+    """
+
+    def __init__(self, operator, operands):
+        self.__dict__["operator"] = operator
+        self.__dict__["operands"] = operands
+        self.__dict__["_result"] = None
+        self.__dict__["_terms"] = None
+
+    def __repr__(self):
+        if self.operator == "value":
+            return "<MathExpression %s>" % type(self.operands[0]).__name__
+        return "<MathExpression %s>" % self.operator
+
+    # ---------
+    # Operators
+    # ---------
+
+    def __add__(self, other):
+        return MathExpression("add", (self, lazy(other)))
+
+    def __radd__(self, other):
+        # support sum()
+        if isinstance(other, (int, float)) and other == 0:
+            return self
+        return MathExpression("add", (lazy(other), self))
+
+    def __sub__(self, other):
+        return MathExpression("sub", (self, lazy(other)))
+
+    def __rsub__(self, other):
+        return MathExpression("sub", (lazy(other), self))
+
+    def __neg__(self):
+        return MathExpression("mul", (self, -1))
+
+    def __mul__(self, factor):
+        return MathExpression("mul", (self, factor))
+
+    __rmul__ = __mul__
+
+    def __div__(self, factor):
+        return MathExpression("div", (self, factor))
+
+    __truediv__ = __div__
+
+    def round(self, digits=None):
+        return MathExpression("round", (self, digits))
+
+    # ----------
+    # Evaluation
+    # ----------
+
+    def evaluate(self):
+        """
+        Return the math object described by the expression.
+        """
+        result = self._result
+        if result is None:
+            operator = self.operator
+            if operator == "value":
+                result = self.operands[0]
+            elif operator == "round":
+                operand, digits = self.operands
+                value = operand.evaluate()
+                if isinstance(value, MathKerning):
+                    # MathKerning rounds in place
+                    result = value.copy()
+                    if digits is None:
+                        result.round()
+                    else:
+                        result.round(digits)
+                elif digits is None:
+                    result = value.round()
+                else:
+                    result = value.round(digits)
+            elif operator in ("mul", "div") and isinstance(self.operands[1], tuple):
+                operand, factor = self.operands
+                if operator == "mul":
+                    result = operand.evaluate() * factor
+                else:
+                    result = operand.evaluate() / factor
+            else:
+                result = _weightedSum(list(self._linearTerms().values()))
+            self.__dict__["_result"] = result
+        return result
+
+    def _linearTerms(self):
+        """
+        Return an ordered dict of id(obj) to [obj, weight] for the
+        weighted sum described by this node.
+        """
+        terms = self._terms
+        if terms is not None:
+            return terms
+        operator = self.operator
+        terms = OrderedDict()
+        if operator in ("add", "sub"):
+            first, second = self.operands
+            _mergeTerms(terms, first._linearTerms(), 1)
+            _mergeTerms(terms, second._linearTerms(), 1 if operator == "add" else -1)
+        elif operator in ("mul", "div") and not isinstance(self.operands[1], tuple):
+            operand, factor = self.operands
+            if operator == "div":
+                factor = 1 / factor
+            _mergeTerms(terms, operand._linearTerms(), factor)
+        else:
+            # values and nodes that can't be flattened are terms of their own
+            value = self.evaluate()
+            terms[id(value)] = [value, 1]
+        self.__dict__["_terms"] = terms
+        return terms
+
+    # ------------------
+    # Result Passthrough
+    # ------------------
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.evaluate(), attr)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("MathExpression objects are read only.")
+
+    def __getitem__(self, key):
+        return self.evaluate()[key]
+
+    def __eq__(self, other):
+        if isinstance(other, MathExpression):
+            other = other.evaluate()
+        return self.evaluate() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+
+def _weightedSum(terms):
+    obj, weight = terms[0]
+    result = obj * weight
+    for obj, weight in terms[1:]:
+        result = result + obj * weight
+    return result
+
+
+def _mergeTerms(terms, otherTerms, factor):
+    for key, (obj, weight) in otherTerms.items():
+        if key in terms:
+            terms[key][1] += weight * factor
+        else:
+            terms[key] = [obj, weight * factor]
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
@@ -0,0 +1,278 @@
+from __future__ import division, absolute_import
+from fontTools.pens.recordingPen import RecordingPointPen
+from fontTools.ttLib import TTFont
+from fontTools.ufoLib import UFOReader
+from fontMath.mathBinary import glyphFromGlyf
+from fontMath.mathCache import MathCache
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathInfo import MathInfo
+from fontMath.mathKerning import MathKerning
+from fontMath.mathUFO import _InfoObject
+
+"""
+Lazy font level access to MathGlyph, MathInfo and MathKerning objects.
+
+A MathFont wraps a master and only builds the math objects that
+are asked for. This keeps subset builds and previews of a few
+glyphs from paying for the conversion of the whole master.
+"""
+
+__all__ = [
+    "MathFont"
+]
+
+
+class MathFont(object):
+
+    """
+    A lazy, read only view of a font as math objects.
+
+    source can be:
+
+    - a font object like a defcon or ufoLib2 font
+    - a fontTools.ufoLib UFOReader
+    - a fontTools TTFont with a glyf table
+
+    MathGlyph objects are built on first access and kept in a
+    MathCache of cacheSize points, so a big master is never held
+    in memory as a whole. The cached glyphs are shared with all
+    callers and must not be modified in place; the math operators
+    always return new objects.
+
+    The info and kerning are built the first time they are
+    accessed. The kerning of a TTFont is not read and is None,
+    the ascender and descender of its info are the OS/2 typo
+    ascender and descender.
+
+    >>> glyph = MathGlyph(None)
+    >>> glyph.name, glyph.unicodes, glyph.width, glyph.height = "A", [65], 500, 0
+    >>> font = MathFont({"A": glyph, "B": glyph})
+    >>> len(font)
+    2
+    >>> font["A"].width
+    500
+    >>> font["A"] is font["A"]
+    True
+    >>> font.cache.stats()["hits"], font.cache.stats()["misses"]
+    (2, 1)
+    """
+
+    def __init__(self, source, cacheSize=1000000, onlyGeometry=False):
+        if isinstance(source, TTFont):
+            self._source = _TTFontSource(source)
+        elif isinstance(source, UFOReader):
+            self._source = _UFOReaderSource(source)
+        else:
+            self._source = _FontSource(source)
+        self.onlyGeometry = onlyGeometry
+        self.cache = MathCache(maxSize=cacheSize)
+        self._glyphNames = None
+        self._info = None
+        self._kerning = None
+        self._kerningLoaded = False
+
+    # ------
+    # Glyphs
+    # ------
+
+    def keys(self):
+        if self._glyphNames is None:
+            self._glyphNames = list(self._source.glyphNames())
+        return list(self._glyphNames)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __contains__(self, glyphName):
+        if self._glyphNames is None:
+            return self._source.hasGlyph(glyphName)
+        return glyphName in self._glyphNames
+
+    def __getitem__(self, glyphName):
+        glyph = self.cache.get(glyphName)
+        if glyph is None:
+            if glyphName not in self:
+                raise KeyError(glyphName)
+            glyph = self._source.mathGlyph(glyphName, self.onlyGeometry)
+            self.cache.set(glyphName, glyph)
+        return glyph
+
+    def get(self, glyphName, default=None):
+        if glyphName not in self:
+            return default
+        return self[glyphName]
+
+    # ----------------
+    # Info and Kerning
+    # ----------------
+
+    @property
+    def info(self):
+        """
+        The MathInfo of the font.
+        """
+        if self._info is None:
+            self._info = self._source.mathInfo()
+        return self._info
+
+    @property
+    def kerning(self):
+        """
+        The MathKerning of the font, including the groups.
+        """
+        if not self._kerningLoaded:
+            self._kerning = self._source.mathKerning()
+            self._kerningLoaded = True
+        return self._kerning
+
+
+# -------
+# Sources
+# -------
+
+class _FontSource(object):
+
+    def __init__(self, font):
+        self.font = font
+
+    def glyphNames(self):
+        return self.font.keys()
+
+    def hasGlyph(self, glyphName):
+        return glyphName in self.font
+
+    def mathGlyph(self, glyphName, onlyGeometry):
+        return MathGlyph(self.font[glyphName], onlyGeometry=onlyGeometry)
+
+    def mathInfo(self):
+        return MathInfo(self.font.info)
+
+    def mathKerning(self):
+        return MathKerning(self.font.kerning, self.font.groups)
+
+
+class _UFOReaderSource(object):
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.glyphSet = reader.getGlyphSet()
+
+    def glyphNames(self):
+        return self.glyphSet.keys()
+
+    def hasGlyph(self, glyphName):
+        return glyphName in self.glyphSet
+
+    def mathGlyph(self, glyphName, onlyGeometry):
+        glyph = _ReaderGlyph(glyphName)
+        self.glyphSet.readGlyph(glyphName, glyph, glyph.recording)
+        return MathGlyph(glyph, onlyGeometry=onlyGeometry)
+
+    def mathInfo(self):
+        info = _InfoObject()
+        self.reader.readInfo(info)
+        return MathInfo(info)
+
+    def mathKerning(self):
+        return MathKerning(self.reader.readKerning(), self.reader.readGroups())
+
+
+class _ReaderGlyph(object):
+
+    """
+    Holds the data of a glyph read from a glif file.
+    """
+
+    def __init__(self, glyphName):
+        self.name = glyphName
+        self.width = 0
+        self.height = 0
+        self.unicodes = []
+        self.note = None
+        self.lib = {}
+        self.anchors = []
+        self.guidelines = []
+        self.image = None
+        self.recording = RecordingPointPen()
+
+    def drawPoints(self, pointPen):
+        self.recording.replay(pointPen)
+
+
+class _TTFontSource(object):
+
+    def __init__(self, font):
+        self.font = font
+        self.glyfTable = font["glyf"]
+        self.hmtx = font["hmtx"].metrics
+        self.vmtx = font["vmtx"].metrics if "vmtx" in font else {}
+        self._unicodes = None
+
+    def glyphNames(self):
+        return self.font.getGlyphOrder()
+
+    def hasGlyph(self, glyphName):
+        return glyphName in self.hmtx
+
+    def mathGlyph(self, glyphName, onlyGeometry):
+        if self._unicodes is None:
+            self._unicodes = {}
+            cmap = self.font.getBestCmap() if "cmap" in self.font else None
+            if cmap:
+                for unicode, name in sorted(cmap.items()):
+                    self._unicodes.setdefault(name, []).append(unicode)
+        glyph = glyphFromGlyf(
+            self.glyfTable[glyphName],
+            self.glyfTable,
+            name=glyphName,
+            width=self.hmtx[glyphName][0],
+            height=self.vmtx[glyphName][0] if glyphName in self.vmtx else 0,
+            unicodes=self._unicodes.get(glyphName)
+        )
+        glyph.onlyGeometry = onlyGeometry
+        return glyph
+
+    def mathInfo(self):
+        # ascender and descender come from the OS/2 typo metrics,
+        # which are the values a UFO compiler writes them to
+        font = self.font
+        info = _InfoObject()
+        info.unitsPerEm = font["head"].unitsPerEm
+        info.openTypeHeadLowestRecPPEM = font["head"].lowestRecPPEM
+        if "hhea" in font:
+            hhea = font["hhea"]
+            info.openTypeHheaAscender = hhea.ascent
+            info.openTypeHheaDescender = hhea.descent
+            info.openTypeHheaLineGap = hhea.lineGap
+        if "OS/2" in font:
+            os2 = font["OS/2"]
+            info.openTypeOS2TypoAscender = os2.sTypoAscender
+            info.openTypeOS2TypoDescender = os2.sTypoDescender
+            info.openTypeOS2TypoLineGap = os2.sTypoLineGap
+            info.openTypeOS2WinAscent = os2.usWinAscent
+            info.openTypeOS2WinDescent = os2.usWinDescent
+            info.openTypeOS2WeightClass = os2.usWeightClass
+            info.openTypeOS2WidthClass = os2.usWidthClass
+            info.ascender = os2.sTypoAscender
+            info.descender = os2.sTypoDescender
+            if os2.version >= 2:
+                info.xHeight = os2.sxHeight
+                info.capHeight = os2.sCapHeight
+        if "post" in font:
+            post = font["post"]
+            info.italicAngle = post.italicAngle
+            info.postscriptUnderlinePosition = post.underlinePosition
+            info.postscriptUnderlineThickness = post.underlineThickness
+        return MathInfo(info)
+
+    def mathKerning(self):
+        return None
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
@@ -2,11 +2,14 @@ from __future__ import print_function, absolute_import
 from copy import deepcopy
 from collections import OrderedDict
 from fontMath.mathFunctions import (
-    add, addPt, div, divPt, mul, mulPt, _roundNumber, sub, subPt)
+    add, addPt, div, divPt, factorAngle, mul, mulPt, _roundNumber, sub, subPt)
 from fontMath.mathGuideline import (
-    _compressGuideline, _expandGuideline, _pairGuidelines,
+    _compressGuideline, _expandGuideline, _guidelinePairs, _pairGuidelines,
     _processMathOneGuidelines, _processMathTwoGuidelines, _roundGuidelines)
-from fontTools.pens.pointPen import AbstractPointPen
+from fontMath.mathHash import _contentHash
+from fontTools.misc.bezierTools import calcCubicBounds, calcQuadraticBounds
+from fontTools.pens.basePen import decomposeQuadraticSegment, decomposeSuperBezierSegment
+from fontTools.pens.pointPen import AbstractPointPen, PointToSegmentPen
 
 # ------------------
 # UFO 3 branch notes
@@ -49,6 +52,7 @@ from fontTools.pens.pointPen import AbstractPointPen
 # - __cmp__ is dubious but harmless i suppose.
 # X is generationCount needed?
 # X can box become bounds? have both?
+#   bounds and controlBounds are cached properties.
 
 try:
     basestring, xrange
@@ -68,9 +72,12 @@ class MathGlyph(object):
         in cases of incompatibility in this data, only compatible data is processed and
         returned. becuase of this, anchors and components may not be returned in the
         same order as the original.
+    -   the in-place operators (+=, -=, *=, /=) and round_ modify the existing contour,
+        component, anchor, guideline and image containers, so those must not be shared
+        with other glyphs.
     """
 
-    def __init__(self, glyph, scaleComponentTransform=True):
+    def __init__(self, glyph, scaleComponentTransform=True, onlyGeometry=False):
         """Initialize a new MathGlyph object.
 
         Args:
@@ -81,32 +88,39 @@ class MathGlyph(object):
                 multiplied by the given scalar. If scaleComponentTransform is False, then
                 only the component's xOffset and yOffset attributes are scaled, whereas the
                 xScale, xyScale, yxScale and yScale attributes are kept unchanged.
+            onlyGeometry (bool): if True, the lib, note, guidelines and image are not
+                copied from glyph and are skipped by all math operations, which also
+                return geometry only glyphs. This is useful when only the outlines are
+                needed, for example for previews, bounds or collision checks.
         """
+        self.__dict__["_cache"] = {}
         self.scaleComponentTransform = scaleComponentTransform
+        self.onlyGeometry = onlyGeometry
         self.contours = []
         self.components = []
+        self.guidelines = []
+        self.image = _expandImage(None)
+        self.lib = {}
+        self.note = None
         if glyph is None:
             self.anchors = []
-            self.guidelines = []
-            self.image = _expandImage(None)
-            self.lib = {}
             self.name = None
             self.unicodes = None
             self.width = None
             self.height = None
-            self.note = None
         else:
             p = MathGlyphPen(self)
             glyph.drawPoints(p)
             self.anchors = [dict(anchor) for anchor in glyph.anchors]
-            self.guidelines = [_expandGuideline(guideline) for guideline in glyph.guidelines]
-            self.image = _expandImage(glyph.image)
-            self.lib = deepcopy(dict(glyph.lib))
+            if not onlyGeometry:
+                self.guidelines = [_expandGuideline(guideline) for guideline in glyph.guidelines]
+                self.image = _expandImage(glyph.image)
+                self.lib = deepcopy(dict(glyph.lib))
+                self.note = glyph.note
             self.name = glyph.name
             self.unicodes = list(glyph.unicodes)
             self.width = glyph.width
             self.height = glyph.height
-            self.note = glyph.note
 
     def __eq__(self, other):
         try:
@@ -120,13 +134,103 @@ class MathGlyph(object):
     def __ne__(self, other):
         return not self == other
 
+    def __setattr__(self, attr, value):
+        object.__setattr__(self, attr, value)
+        # reassigning any public attribute discards data derived from it
+        if attr[0] != "_" and self.__dict__.get("_cache"):
+            self.__dict__["_cache"] = {}
+
+    # ------------
+    # Content Hash
+    # ------------
+
+    def contentHash(self, onlyGeometry=False):
+        """
+        return a hex digest of the glyph data.
+
+        the digest is deterministic across processes and machines.
+        if onlyGeometry is True, only the width, height, contours,
+        components and anchors are hashed and point, contour and
+        component identifiers, names and colors are ignored.
+
+        the digest is cached until an attribute of the glyph is
+        reassigned. changes made inside the existing containers
+        (ie appending to glyph.contours) are not tracked.
+        """
+        key = ("contentHash", onlyGeometry)
+        cache = self._cache
+        if key not in cache:
+            if onlyGeometry:
+                data = (
+                    self.width,
+                    self.height,
+                    [
+                        [point[:3] for point in contour["points"]]
+                        for contour in self.contours
+                    ],
+                    [
+                        (component["baseGlyph"], component["transformation"])
+                        for component in self.components
+                    ],
+                    [
+                        (anchor.get("name"), anchor["x"], anchor["y"])
+                        for anchor in self.anchors
+                    ]
+                )
+            else:
+                data = (
+                    self.name,
+                    self.unicodes,
+                    self.width,
+                    self.height,
+                    self.note,
+                    self.lib,
+                    self.contours,
+                    self.components,
+                    self.anchors,
+                    self.guidelines,
+                    self.image
+                )
+            cache[key] = _contentHash(data)
+        return cache[key]
+
+    # ------
+    # Bounds
+    # ------
+
+    @property
+    def bounds(self):
+        """
+        the (xMin, yMin, xMax, yMax) bounds of the contours or
+        None if there are no contours. components are not
+        included since their base glyphs are not available.
+
+        the value is cached until an attribute is reassigned
+        or the glyph is modified through one of its methods.
+        """
+        cache = self._cache
+        if "bounds" not in cache:
+            cache["bounds"] = _contoursBounds(self.contours)
+        return cache["bounds"]
+
+    @property
+    def controlBounds(self):
+        """
+        the (xMin, yMin, xMax, yMax) bounds of all contour points,
+        including the off curves, or None if there are no contours.
+        """
+        cache = self._cache
+        if "controlBounds" not in cache:
+            cache["controlBounds"] = _contoursControlBounds(self.contours)
+        return cache["controlBounds"]
+
     # ----
     # Copy
     # ----
 
     def copy(self):
         """return a new MathGlyph containing all data in self"""
-        return MathGlyph(self)
+        return MathGlyph(self, onlyGeometry=self.onlyGeometry)
 
     def copyWithoutMathSubObjects(self):
         """
@@ -138,14 +242,15 @@ class MathGlyph(object):
 
         this is used mainly for internal glyph math.
         """
-        n = MathGlyph(None)
+        n = MathGlyph(None, onlyGeometry=self.onlyGeometry)
         n.name = self.name
         if self.unicodes is not None:
             n.unicodes = list(self.unicodes)
         n.width = self.width
         n.height = self.height
-        n.note = self.note
-        n.lib = deepcopy(dict(self.lib))
+        if not self.onlyGeometry:
+            n.note = self.note
+            n.lib = deepcopy(dict(self.lib))
         return n
 
     # ----
@@ -185,6 +290,8 @@ class MathGlyph(object):
             anchorTree2 = _anchorTree(otherGlyph.anchors)
             anchorPairs = _pairAnchors(anchorTree1, anchorTree2)
             copiedGlyph.anchors = _processMathOneAnchors(anchorPairs, ptFunc)
+        if self.onlyGeometry:
+            return
         # guidelines
         copiedGlyph.guidelines = []
         if self.guidelines:
@@ -239,6 +346,8 @@ class MathGlyph(object):
         copiedGlyph.anchors = []
         if self.anchors:
             copiedGlyph.anchors = _processMathTwoAnchors(self.anchors, factor, ptFunc)
+        if self.onlyGeometry:
+            return
         # guidelines
         copiedGlyph.guidelines = []
         if self.guidelines:
@@ -247,6 +356,127 @@ class MathGlyph(object):
         if self.image:
             copiedGlyph.image = _processMathTwoImage(self.image, factor, ptFunc)
 
+    # in-place math
+
+    def __iadd__(self, otherGlyph):
+        self._processMathOneInPlace(otherGlyph, addPt, add)
+        return self
+
+    def __isub__(self, otherGlyph):
+        self._processMathOneInPlace(otherGlyph, subPt, sub)
+        return self
+
+    def _processMathOneInPlace(self, otherGlyph, ptFunc, func):
+        """
+        the in-place version of _processMathOne. the coordinates
+        are replaced inside the existing contour, component,
+        anchor, guideline and image containers. data that can't
+        be paired with otherGlyph is removed.
+        """
+        self.__dict__["_cache"] = {}
+        # width
+        self.width = func(self.width, otherGlyph.width)
+        # height
+        self.height = func(self.height, otherGlyph.height)
+        # contours
+        for index, contour1 in enumerate(self.contours):
+            points1 = contour1["points"]
+            points2 = otherGlyph.contours[index]["points"]
+            for pointIndex, point in enumerate(points1):
+                segmentType, pt1, smooth, name, identifier = point
+                pt = ptFunc(pt1, points2[pointIndex][1])
+                points1[pointIndex] = (segmentType, pt, smooth, name, identifier)
+        # components
+        if self.components:
+            componentPairs = _componentPairs(self.components, otherGlyph.components)
+            components = []
+            for component in self.components:
+                component2 = componentPairs.get(id(component))
+                if component2 is not None:
+                    component["transformation"] = _processMathOneTransformation(
+                        component["transformation"], component2["transformation"], ptFunc)
+                    components.append(component)
+            self.components[:] = components
+        # anchors
+        if self.anchors:
+            anchorPairs = _anchorPairs(self.anchors, otherGlyph.anchors)
+            anchors = []
+            for anchor in self.anchors:
+                anchor2 = anchorPairs.get(id(anchor))
+                if anchor2 is not None:
+                    anchor["x"], anchor["y"] = ptFunc((anchor["x"], anchor["y"]), (anchor2["x"], anchor2["y"]))
+                    anchors.append(anchor)
+            self.anchors[:] = anchors
+        if self.onlyGeometry:
+            return
+        # guidelines
+        if self.guidelines:
+            guidelinePairs = _guidelinePairs(self.guidelines, otherGlyph.guidelines)
+            guidelines = []
+            for guideline in self.guidelines:
+                guideline2 = guidelinePairs.get(id(guideline))
+                if guideline2 is not None:
+                    guideline["x"], guideline["y"] = ptFunc(
+                        (guideline["x"], guideline["y"]), (guideline2["x"], guideline2["y"]))
+                    guideline["angle"] = func(guideline["angle"], guideline2["angle"]) % 360
+                    guidelines.append(guideline)
+            self.guidelines[:] = guidelines
+        # image
+        if _pairImages(self.image, otherGlyph.image):
+            self.image["transformation"] = _processMathOneTransformation(
+                self.image["transformation"], otherGlyph.image["transformation"], ptFunc)
+        else:
+            self.image.update(_expandImage(None))
+
+    def __imul__(self, factor):
+        if not isinstance(factor, tuple):
+            factor = (factor, factor)
+        self._processMathTwoInPlace(factor, mulPt, mul)
+        return self
+
+    def __idiv__(self, factor):
+        if not isinstance(factor, tuple):
+            factor = (factor, factor)
+        self._processMathTwoInPlace(factor, divPt, div)
+        return self
+
+    __itruediv__ = __idiv__
+
+    def _processMathTwoInPlace(self, factor, ptFunc, func):
+        """
+        the in-place version of _processMathTwo.
+        """
+        self.__dict__["_cache"] = {}
+        # width
+        self.width = func(self.width, factor[0])
+        # height
+        self.height = func(self.height, factor[1])
+        # contours
+        for contour in self.contours:
+            points = contour["points"]
+            for index, point in enumerate(points):
+                segmentType, pt, smooth, name, identifier = point
+                points[index] = (segmentType, ptFunc(pt, factor), smooth, name, identifier)
+        # components
+        for component in self.components:
+            component["transformation"] = _processMathTwoTransformation(
+                component["transformation"], factor, ptFunc, doScale=self.scaleComponentTransform
+            )
+        # anchors
+        for anchor in self.anchors:
+            anchor["x"], anchor["y"] = ptFunc((anchor["x"], anchor["y"]), factor)
+        if self.onlyGeometry:
+            return
+        # guidelines
+        for guideline in self.guidelines:
+            guideline["x"] = func(guideline["x"], factor[0])
+            guideline["y"] = func(guideline["y"], factor[1])
+            guideline["angle"] = factorAngle(guideline["angle"], factor, func) % 360
+        # image
+        if self.image:
+            self.image["transformation"] = _processMathTwoTransformation(
+                self.image["transformation"], factor, ptFunc)
+
     # -------
     # Additional math
     # -------
@@ -264,20 +494,51 @@ class MathGlyph(object):
         copiedGlyph.components = []
         if self.components:
             copiedGlyph.components = _roundComponents(self.components, digits)
-        # guidelines
-        copiedGlyph.guidelines = []
-        if self.guidelines:
-            copiedGlyph.guidelines = _roundGuidelines(self.guidelines, digits)
         # anchors
         copiedGlyph.anchors = []
         if self.anchors:
             copiedGlyph.anchors = _roundAnchors(self.anchors, digits)
+        if self.onlyGeometry:
+            return copiedGlyph
+        # guidelines
+        copiedGlyph.guidelines = []
+        if self.guidelines:
+            copiedGlyph.guidelines = _roundGuidelines(self.guidelines, digits)
         # image
         copiedGlyph.image = None
         if self.image:
             copiedGlyph.image = _roundImage(self.image, digits)
         return copiedGlyph
 
+    def round_(self, digits=None):
+        """round the geometry in place and return self."""
+        self.__dict__["_cache"] = {}
+        # misc
+        self.width = _roundNumber(self.width, digits)
+        self.height = _roundNumber(self.height, digits)
+        # contours
+        for contour in self.contours:
+            points = contour["points"]
+            for index, (segmentType, pt, smooth, name, identifier) in enumerate(points):
+                roundedPt = (_roundNumber(pt[0], digits), _roundNumber(pt[1], digits))
+                points[index] = (segmentType, roundedPt, smooth, name, identifier)
+        # components
+        for component in self.components:
+            component["transformation"] = _roundTransformation(component["transformation"], digits)
+        # anchors
+        for anchor in self.anchors:
+            anchor["x"], anchor["y"] = _roundNumber(anchor["x"], digits), _roundNumber(anchor["y"], digits)
+        if self.onlyGeometry:
+            return self
+        # guidelines
+        for guideline in self.guidelines:
+            guideline["x"] = _roundNumber(guideline["x"], digits)
+            guideline["y"] = _roundNumber(guideline["y"], digits)
+        # image
+        if self.image:
+            self.image["transformation"] = _roundTransformation(self.image["transformation"], digits)
+        return self
+
 
     # -------
     # Pen API
@@ -285,6 +546,7 @@ class MathGlyph(object):
 
     def getPointPen(self):
         """get a point pen for drawing to this object"""
+        self.__dict__["_cache"] = {}
         return MathGlyphPen(self)
 
     def drawPoints(self, pointPen, filterRedundantPoints=False):
@@ -301,7 +563,6 @@ class MathGlyph(object):
 
     def draw(self, pen, filterRedundantPoints=False):
         """draw self using pen"""
-        from fontTools.pens.pointPen import PointToSegmentPen
         pointPen = PointToSegmentPen(pen)
         self.drawPoints(pointPen, filterRedundantPoints=filterRedundantPoints)
 
@@ -315,27 +576,46 @@ class MathGlyph(object):
         a glyph as an argument. if a point pen other
         than the type of pen returned by glyph.getPointPen()
         is required for drawing, send this the needed point pen.
+
+        if this is a geometry only MathGlyph, the lib, note,
+        guidelines and image of glyph are left untouched.
+
+        if glyph supports holding notifications (like defcon
+        glyphs), they are held until the extraction is finished
+        so observers are notified once instead of once per point.
         """
+        holdNotifications = hasattr(glyph, "holdNotifications")
+        if holdNotifications:
+            glyph.holdNotifications()
+        try:
+            self._extractGlyph(glyph, pointPen, onlyGeometry)
+        finally:
+            if holdNotifications:
+                glyph.releaseHeldNotifications()
+        return glyph
+
+    def _extractGlyph(self, glyph, pointPen, onlyGeometry):
         if pointPen is None:
             pointPen = glyph.getPointPen()
         glyph.clearContours()
         glyph.clearComponents()
         glyph.clearAnchors()
-        glyph.clearGuidelines()
-        glyph.lib.clear()
+        if not self.onlyGeometry:
+            glyph.clearGuidelines()
+            glyph.lib.clear()
         cleanerPen = FilterRedundantPointPen(pointPen)
         self.drawPoints(cleanerPen)
         glyph.anchors = [dict(anchor) for anchor in self.anchors]
-        glyph.guidelines = [_compressGuideline(guideline) for guideline in self.guidelines]
-        glyph.image = _compressImage(self.image)
-        glyph.lib = deepcopy(dict(self.lib))
+        if not self.onlyGeometry:
+            glyph.guidelines = [_compressGuideline(guideline) for guideline in self.guidelines]
+            glyph.image = _compressImage(self.image)
+            glyph.lib = deepcopy(dict(self.lib))
+            glyph.note = self.note
         glyph.width = self.width
         glyph.height = self.height
-        glyph.note = self.note
         if not onlyGeometry:
             glyph.name = self.name
             glyph.unicodes = list(self.unicodes)
-        return glyph
 
 
 # ----------
@@ -662,6 +942,28 @@ def _processMathTwoAnchors(anchors, factor, func):
         result.append(anchor)
     return result
 
+def _anchorPairs(anchors1, anchors2):
+    """
+    Pair anchors with the rules used by _pairAnchors and return
+    a dict of id(anchor1) to anchor2. _pairAnchors only looks
+    at names and identifiers, so the trees are built with the
+    anchor indexes in place of the coordinates to be able to
+    find the original anchors again.
+    """
+    pairs = {}
+    for anchor1, anchor2 in _pairAnchors(_anchorIndexTree(anchors1), _anchorIndexTree(anchors2)):
+        pairs[id(anchors1[anchor1["x"]])] = anchors2[anchor2["x"]]
+    return pairs
+
+def _anchorIndexTree(anchors):
+    tree = OrderedDict()
+    for index, anchor in enumerate(anchors):
+        name = anchor.get("name")
+        if name not in tree:
+            tree[name] = []
+        tree[name].append((anchor.get("identifier"), index, index, None))
+    return tree
+
 # components
 
 def _pairComponents(components1, components2):
@@ -695,6 +997,16 @@ def _pairComponents(components1, components2):
                 break
     return pairs
 
+def _componentPairs(components1, components2):
+    """
+    Pair components with _pairComponents and return a dict
+    of id(component1) to component2.
+    """
+    return dict(
+        (id(component1), component2)
+        for component1, component2 in _pairComponents(components1, components2)
+    )
+
 def _processMathOneComponents(componentPairs, func):
     result = []
     for component1, component2 in componentPairs:
@@ -786,6 +1098,118 @@ def _processMathTwoTransformation(transformation, factor, func, doScale=True):
     return (xScale, xyScale, yxScale, yScale, xOffset, yOffset)
 
 
+# bounds
+
+def _contoursControlBounds(contours):
+    xMin = yMin = xMax = yMax = None
+    for contour in contours:
+        points = contour["points"]
+        if not points:
+            continue
+        xs = [point[1][0] for point in points]
+        ys = [point[1][1] for point in points]
+        if xMin is None:
+            xMin, yMin, xMax, yMax = min(xs), min(ys), max(xs), max(ys)
+        else:
+            xMin = min(xMin, min(xs))
+            yMin = min(yMin, min(ys))
+            xMax = max(xMax, max(xs))
+            yMax = max(yMax, max(ys))
+    if xMin is None:
+        return None
+    return xMin, yMin, xMax, yMax
+
+def _contoursBounds(contours):
+    """
+    >>> contours = [dict(identifier=None, points=[
+    ...     ("curve", (0, 0), False, None, None),
+    ...     (None, (0, 100), False, None, None),
+    ...     (None, (100, 100), False, None, None),
+    ...     ("curve", (100, 0), False, None, None),
+    ...     (None, (100, 0), False, None, None),
+    ...     (None, (0, 0), False, None, None),
+    ... ])]
+    >>> _contoursBounds(contours)
+    (0, 0, 100, 75.0)
+    """
+    # start with the on curves. the extrema of a segment only
+    # need to be computed when one of its off curves is outside
+    # the bounds, which is never the case for converted lines.
+    onCurves = [
+        point[1]
+        for contour in contours
+        for point in contour["points"]
+        if point[0] is not None
+    ]
+    if onCurves:
+        xs = [pt[0] for pt in onCurves]
+        ys = [pt[1] for pt in onCurves]
+        bounds = [min(xs), min(ys), max(xs), max(ys)]
+    else:
+        bounds = None
+    for contour in contours:
+        for segmentType, points in _contourSegments(contour["points"]):
+            if bounds is None:
+                bounds = [points[0][0], points[0][1], points[0][0], points[0][1]]
+            xMin, yMin, xMax, yMax = bounds
+            for x, y in points[1:-1]:
+                if x < xMin or x > xMax or y < yMin or y > yMax:
+                    break
+            else:
+                continue
+            if segmentType == "curve":
+                if len(points) == 4:
+                    segmentBounds = [calcCubicBounds(*points)]
+                else:
+                    segmentBounds = []
+                    pt0 = points[0]
+                    for pt1, pt2, pt3 in decomposeSuperBezierSegment(points[1:]):
+                        segmentBounds.append(calcCubicBounds(pt0, pt1, pt2, pt3))
+                        pt0 = pt3
+            else:
+                segmentBounds = []
+                pt0 = points[0]
+                for pt1, pt2 in decomposeQuadraticSegment(points[1:]):
+                    segmentBounds.append(calcQuadraticBounds(pt0, pt1, pt2))
+                    pt0 = pt2
+            for sxMin, syMin, sxMax, syMax in segmentBounds:
+                bounds[0] = min(bounds[0], sxMin)
+                bounds[1] = min(bounds[1], syMin)
+                bounds[2] = max(bounds[2], sxMax)
+                bounds[3] = max(bounds[3], syMax)
+    if bounds is None:
+        return None
+    return tuple(bounds)
+
+def _contourSegments(points):
+    """
+    yield (segmentType, [pt, ..., pt]) for the curve and qcurve
+    segments of a normalized contour. the list starts with the
+    previous on curve and ends with the segment's on curve.
+    """
+    onCurveIndexes = [index for index, point in enumerate(points) if point[0] is not None]
+    if not onCurveIndexes:
+        # a quadratic contour without on curves
+        if points:
+            offCurves = [point[1] for point in points]
+            first = offCurves[-1]
+            last = offCurves[0]
+            implied = ((first[0] + last[0]) * 0.5, (first[1] + last[1]) * 0.5)
+            yield "qcurve", [implied] + offCurves + [implied]
+        return
+    previous = None
+    for index in onCurveIndexes:
+        if previous is not None and index - previous > 1:
+            segmentType = points[index][0]
+            yield segmentType, [point[1] for point in points[previous:index + 1]]
+        previous = index
+    # closing segment
+    first = onCurveIndexes[0]
+    if points[first][0] != "move" and (previous < len(points) - 1 or first > 0):
+        segmentType = points[first][0]
+        segmentPoints = [point[1] for point in points[previous:] + points[:first + 1]]
+        yield segmentType, segmentPoints
+
 # rounding
 
 def _roundContours(contours, digits=None):
@@ -4,6 +4,7 @@ __all__ = [
     "_expandGuideline",
     "_compressGuideline",
     "_pairGuidelines",
+    "_guidelinePairs",
     "_processMathOneGuidelines",
     "_processMathTwoGuidelines",
     "_roundGuidelines"
@@ -59,6 +60,16 @@ def _pairGuidelines(guidelines1, guidelines2):
     # done
     return pairs
 
+def _guidelinePairs(guidelines1, guidelines2):
+    """
+    Pair guidelines with _pairGuidelines and return a dict
+    of id(guideline1) to guideline2.
+    """
+    return dict(
+        (id(guideline1), guideline2)
+        for guideline1, guideline2 in _pairGuidelines(guidelines1, guidelines2)
+    )
+
 def _findPair(guidelines1, guidelines2, pairs, attrs):
     removeFromGuidelines1 = []
     for guideline1 in guidelines1:
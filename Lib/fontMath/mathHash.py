@@ -0,0 +1,102 @@
+from __future__ import absolute_import
+import hashlib
+
+"""
+Deterministic content digests for the math objects.
+
+The data is serialized into a canonical byte stream before it
+is hashed so that the digest does not depend on dict ordering,
+the process hash seed or the machine it is computed on. Numbers
+that compare equal (1 and 1.0, 0.0 and -0.0) serialize identically
+and lists and tuples are treated as the same kind of sequence.
+"""
+
+try:
+    unicode
+except NameError:
+    unicode = str
+
+__all__ = [
+    "_contentHash",
+    "_serialize"
+]
+
+
+def _contentHash(data):
+    """
+    Return a hex digest of data.
+
+    >>> _contentHash({"b": [1, 2.0], "a": None}) == _contentHash({"a": None, "b": (1.0, 2)})
+    True
+    >>> _contentHash([1, 2]) == _contentHash([2, 1])
+    False
+    """
+    parts = []
+    _serialize(data, parts)
+    return hashlib.sha256(b"".join(parts)).hexdigest()
+
+
+def _serialize(obj, parts):
+    """
+    Append the canonical serialization of obj to parts.
+    """
+    if obj is None:
+        parts.append(b"N")
+    elif obj is True:
+        parts.append(b"T")
+    elif obj is False:
+        parts.append(b"F")
+    elif isinstance(obj, float):
+        if obj.is_integer():
+            parts.append(b"i%d;" % int(obj))
+        else:
+            parts.append(b"f" + repr(obj).encode("ascii") + b";")
+    elif isinstance(obj, int):
+        parts.append(b"i%d;" % obj)
+    elif isinstance(obj, unicode):
+        data = obj.encode("utf-8")
+        parts.append(b"s%d:" % len(data))
+        parts.append(data)
+    elif isinstance(obj, bytes):
+        parts.append(b"b%d:" % len(obj))
+        parts.append(obj)
+    elif isinstance(obj, (list, tuple)):
+        parts.append(b"l%d:" % len(obj))
+        for item in obj:
+            _serialize(item, parts)
+    elif isinstance(obj, dict) or hasattr(obj, "items"):
+        items = []
+        for key, value in obj.items():
+            keyParts = []
+            _serialize(key, keyParts)
+            valueParts = []
+            _serialize(value, valueParts)
+            items.append((b"".join(keyParts), b"".join(valueParts)))
+        items.sort()
+        parts.append(b"d%d:" % len(items))
+        for key, value in items:
+            parts.append(key)
+            parts.append(value)
+    elif isinstance(obj, (set, frozenset)):
+        items = []
+        for item in obj:
+            itemParts = []
+            _serialize(item, itemParts)
+            items.append(b"".join(itemParts))
+        items.sort()
+        parts.append(b"e%d:" % len(items))
+        parts.extend(items)
+    else:
+        # anything else (dates, custom lib values) falls
+        # back to its repr. this is only process independent
+        # if the repr is, which is the case for the value
+        # types that can be stored in a UFO lib.
+        data = ("%s:%r" % (type(obj).__name__, obj)).encode("utf-8")
+        parts.append(b"r%d:" % len(data))
+        parts.append(data)
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
@@ -0,0 +1,210 @@
+from __future__ import division, absolute_import
+from fontMath.mathComponents import MathGlyphDecomposer
+from fontMath.mathInfo import _infoAttrs
+
+"""
+Incremental instancing.
+
+Rebuilding every instance after a small edit in one master
+repeats almost all of the work. IncrementalInstancer remembers
+the content hashes of the master data it instanced last time and
+on the next update only recomputes the glyphs, kerning and info
+whose master data changed. Editors that track their own dirty
+state can pass the names of the edited glyphs to skip hashing
+the unchanged ones.
+
+Composite glyphs only reference their base glyphs, so their
+instances don't change when a base glyph is edited. They are
+reported as dependent glyphs since their decomposed outlines and
+metrics do change; with decompose=True the instances are stored
+decomposed and the dependent composites are decomposed again.
+"""
+
+__all__ = [
+    "IncrementalInstancer"
+]
+
+
+class IncrementalInstancer(object):
+
+    """
+    Keeps the instances of masters at a set of locations up
+    to date.
+
+    model is a MathVariationModel and locations a dict of
+    instance names to normalized locations. After update, the
+    instance data is available in:
+
+    - glyphs: instance name to a dict of glyph names to MathGlyph
+    - kerning: instance name to MathKerning
+    - info: instance name to MathInfo
+
+    The instance objects are replaced, never modified, so they can
+    be handed out to other code.
+    """
+
+    def __init__(self, model, locations, onlyGeometry=False, decompose=False):
+        self.model = model
+        self.locations = dict(locations)
+        self.onlyGeometry = onlyGeometry
+        self.decompose = decompose
+        self._instanceNames = sorted(self.locations)
+        self._instanceLocations = [self.locations[name] for name in self._instanceNames]
+        self.glyphs = dict((name, {}) for name in self._instanceNames)
+        self.kerning = dict.fromkeys(self._instanceNames)
+        self.info = dict.fromkeys(self._instanceNames)
+        # undecomposed instances, the same dicts as glyphs unless decompose is True
+        self._glyphs = self.glyphs if not decompose else dict((name, {}) for name in self._instanceNames)
+        self._glyphHashes = {}
+        self._baseGlyphs = {}
+        self._kerningHash = None
+        self._infoHash = None
+
+    def update(self, masters, glyphNames=None):
+        """
+        Bring the instances up to date with masters, a list with one
+        mapping of glyph names to MathGlyph objects per model
+        location, like MathFont objects. Masters that have info and
+        kerning attributes are used for the info and kerning
+        instances. Changes are found through the content hashes
+        of the math objects, so edited glyphs must be new MathGlyph
+        objects (the glyph cache of a MathFont must be cleared for
+        edited glyphs).
+
+        glyphNames limits the check for changed glyphs to those
+        glyphs, all glyphs of the default master are checked if it
+        is None. Glyphs that are not in the default master anymore
+        are removed.
+
+        Return a dict describing what changed:
+
+        - glyphs: the sorted names of the recomputed glyphs
+        - dependentGlyphs: the sorted names of the composites using
+          the changed glyphs as (nested) components
+        - removedGlyphs: the sorted names of the removed glyphs
+        - kerning: the sorted pairs whose value changed
+        - info: the sorted names of the changed info attributes
+        """
+        masters = list(masters)
+        default = masters[self.model.defaultIndex]
+        if glyphNames is None:
+            glyphNames = set(default.keys()) | set(self._glyphHashes)
+        changed = set()
+        removed = set()
+        for glyphName in glyphNames:
+            if glyphName not in default:
+                if glyphName in self._glyphHashes:
+                    removed.add(glyphName)
+                continue
+            glyphs = [master.get(glyphName) for master in masters]
+            glyphHash = tuple(
+                None if glyph is None else glyph.contentHash(onlyGeometry=self.onlyGeometry)
+                for glyph in glyphs
+            )
+            if self._glyphHashes.get(glyphName) == glyphHash:
+                continue
+            self._glyphHashes[glyphName] = glyphHash
+            self._baseGlyphs[glyphName] = set(
+                component["baseGlyph"] for component in glyphs[self.model.defaultIndex].components
+            )
+            self._instanceGlyph(glyphName, glyphs)
+            changed.add(glyphName)
+        for glyphName in removed:
+            del self._glyphHashes[glyphName]
+            del self._baseGlyphs[glyphName]
+            for instanceName in self._instanceNames:
+                self._glyphs[instanceName].pop(glyphName, None)
+                self.glyphs[instanceName].pop(glyphName, None)
+        dependents = self._dependentGlyphs(changed | removed) - changed
+        if self.decompose:
+            self._decomposeGlyphs(changed | dependents)
+        return dict(
+            glyphs=sorted(changed),
+            dependentGlyphs=sorted(dependents),
+            removedGlyphs=sorted(removed),
+            kerning=self._updateKerning(masters),
+            info=self._updateInfo(masters)
+        )
+
+    # ------
+    # Glyphs
+    # ------
+
+    def _instanceGlyph(self, glyphName, glyphs):
+        instances = self.model.getDeltas(glyphs).instances(self._instanceLocations)
+        for instanceName, glyph in zip(self._instanceNames, instances):
+            self._glyphs[instanceName][glyphName] = glyph
+
+    def _dependentGlyphs(self, glyphNames):
+        users = {}
+        for glyphName, baseGlyphs in self._baseGlyphs.items():
+            for baseGlyph in baseGlyphs:
+                users.setdefault(baseGlyph, set()).add(glyphName)
+        dependents = set()
+        stack = list(glyphNames)
+        while stack:
+            for glyphName in users.get(stack.pop(), ()):
+                if glyphName not in dependents:
+                    dependents.add(glyphName)
+                    stack.append(glyphName)
+        return dependents
+
+    def _decomposeGlyphs(self, glyphNames):
+        for instanceName in self._instanceNames:
+            decomposer = MathGlyphDecomposer(self._glyphs[instanceName])
+            decomposed = self.glyphs[instanceName]
+            for glyphName in glyphNames:
+                decomposed[glyphName] = decomposer.decompose(glyphName)
+
+    # ----------------
+    # Kerning and Info
+    # ----------------
+
+    def _updateKerning(self, masters):
+        kerning = [getattr(master, "kerning", None) for master in masters]
+        if kerning[self.model.defaultIndex] is None:
+            return []
+        kerningHash = tuple(None if k is None else k.contentHash() for k in kerning)
+        if kerningHash == self._kerningHash:
+            return []
+        self._kerningHash = kerningHash
+        instances = self.model.getDeltas(kerning).instances(self._instanceLocations)
+        changed = set()
+        for instanceName, instance in zip(self._instanceNames, instances):
+            previous = self.kerning[instanceName]
+            if previous is None:
+                changed.update(instance.keys())
+            else:
+                for pair in set(previous.keys()) | set(instance.keys()):
+                    if previous[pair] != instance[pair]:
+                        changed.add(pair)
+            self.kerning[instanceName] = instance
+        return sorted(changed)
+
+    def _updateInfo(self, masters):
+        info = [getattr(master, "info", None) for master in masters]
+        if info[self.model.defaultIndex] is None:
+            return []
+        infoHash = tuple(None if i is None else i.contentHash(onlyGeometry=self.onlyGeometry) for i in info)
+        if infoHash == self._infoHash:
+            return []
+        self._infoHash = infoHash
+        instances = self.model.getDeltas(info).instances(self._instanceLocations)
+        changed = set()
+        for instanceName, instance in zip(self._instanceNames, instances):
+            previous = self.info[instanceName]
+            for attr in _infoAttrs:
+                value = getattr(instance, attr, None)
+                if previous is None:
+                    if value is not None:
+                        changed.add(attr)
+                elif getattr(previous, attr, None) != value:
+                    changed.add(attr)
+            self.info[instanceName] = instance
+        return sorted(changed)
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
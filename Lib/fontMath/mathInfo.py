@@ -5,11 +5,13 @@ from fontTools.misc.py23 import round2
 from fontMath.mathGuideline import (
     _expandGuideline, _pairGuidelines, _processMathOneGuidelines,
     _processMathTwoGuidelines, _roundGuidelines)
+from fontMath.mathHash import _contentHash
 
 
 class MathInfo(object):
 
     def __init__(self, infoObject):
+        self.__dict__["_cache"] = {}
         for attr in _infoAttrs.keys():
             if hasattr(infoObject, attr):
                 setattr(self, attr, getattr(infoObject, attr))
@@ -20,6 +22,38 @@ class MathInfo(object):
         else:
             self.guidelines = []
 
+    def __setattr__(self, attr, value):
+        object.__setattr__(self, attr, value)
+        # reassigning any public attribute discards data derived from it
+        if attr[0] != "_" and self.__dict__.get("_cache"):
+            self.__dict__["_cache"] = {}
+
+    # ------------
+    # Content Hash
+    # ------------
+
+    def contentHash(self, onlyGeometry=False):
+        """
+        Return a hex digest of the info data.
+
+        The digest is deterministic across processes and machines.
+        If onlyGeometry is True, only the numeric attributes are
+        hashed and the guidelines and postscriptWeightName are
+        ignored. The digest is cached until an attribute is reassigned.
+        """
+        key = ("contentHash", onlyGeometry)
+        cache = self._cache
+        if key not in cache:
+            data = dict(
+                (attr, getattr(self, attr))
+                for attr in _infoAttrs.keys()
+                if hasattr(self, attr)
+            )
+            if not onlyGeometry:
+                data = (data, self.guidelines, getattr(self, "postscriptWeightName", None))
+            cache[key] = _contentHash(data)
+        return cache[key]
+
     # ----
     # Copy
     # ----
@@ -244,11 +278,13 @@ class MathInfo(object):
     # -------
 
     def __lt__(self, other):
-        if set(self.__dict__.keys()) < set(other.__dict__.keys()):
+        attrs = _publicAttrs(self)
+        otherAttrs = _publicAttrs(other)
+        if set(attrs.keys()) < set(otherAttrs.keys()):
             return True
-        elif set(self.__dict__.keys()) > set(other.__dict__.keys()):
+        elif set(attrs.keys()) > set(otherAttrs.keys()):
             return False
-        for attr, value in self.__dict__.items():
+        for attr, value in attrs.items():
             other_value = getattr(other, attr)
             if value is not None and other_value is not None:
                 # guidelines is a list of dicts
@@ -271,14 +307,22 @@ class MathInfo(object):
         return False
 
     def __eq__(self, other):
-        if set(self.__dict__.keys()) != set(other.__dict__.keys()):
+        attrs = _publicAttrs(self)
+        if set(attrs.keys()) != set(_publicAttrs(other).keys()):
             return False
-        for attr, value in self.__dict__.items():
+        for attr, value in attrs.items():
             if hasattr(other, attr) and value != getattr(other, attr):
                 return False
         return True
 
 
+def _publicAttrs(obj):
+    return dict(
+        (attr, value) for attr, value in obj.__dict__.items()
+        if not attr.startswith("_")
+    )
+
+
 # ----------
 # Formatters
 # ----------
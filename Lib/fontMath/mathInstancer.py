@@ -0,0 +1,308 @@
+from __future__ import print_function, division, absolute_import
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from fontTools.ufoLib import UFOReader
+from fontMath.mathDesignspace import readDesignspace
+from fontMath.mathFont import MathFont
+from fontMath.mathModel import MathVariationModel
+from fontMath.mathStream import readMasterGlyphs, instanceGlyphs, instanceKerning, instanceInfo
+from fontMath.mathUFO import UFOInstanceWriter, _InfoObject
+
+"""
+Batch instancing from the command line.
+
+    fontmath-instance MyFamily.designspace --jobs 4
+
+The input is a designspace document or a JSON spec listing the
+master UFOs and the instances:
+
+    {
+        "masters": [
+            {"path": "Light.ufo", "location": {"wght": 0}},
+            {"path": "Bold.ufo", "location": {"wght": 1}}
+        ],
+        "instances": [
+            {"path": "instances/Regular.ufo", "location": {"wght": 0.4},
+             "familyName": "MyFamily", "styleName": "Regular"},
+            {"path": "instances/Mix.ufo", "weights": [0.25, 0.75]}
+        ]
+    }
+
+Locations in a spec are normalized locations. An instance can give
+the weight of every master instead of a location; the masters
+don't need locations if all instances do that. Relative paths are
+relative to the spec file.
+
+The masters are read lazily through MathFont objects and the glyphs
+are streamed through fontMath.mathStream: every glyph is instanced
+for all instances at once, optionally in several processes, and
+written to all instance UFOs before the next glyph is read.
+Glyphs that are missing in some masters are instanced through the
+variation model of the masters that have them; this needs locations.
+"""
+
+__all__ = [
+    "readInstanceSpec",
+    "instantiate",
+    "main"
+]
+
+
+def readInstanceSpec(path):
+    """
+    Read the JSON instance spec at path and return the sources and
+    instances in the structure returned by readDesignspace. Instances
+    have either a location or a weights item, the locations of the
+    sources may be None.
+    """
+    with open(path, "r") as f:
+        spec = json.load(f)
+    root = os.path.dirname(os.path.abspath(path))
+    masters = spec.get("masters")
+    if not masters:
+        raise ValueError("The spec has no masters.")
+    sources = []
+    for master in masters:
+        sources.append(dict(
+            path=os.path.join(root, master["path"]),
+            location=master.get("location")
+        ))
+    instances = []
+    for index, instance in enumerate(spec.get("instances", [])):
+        if ("location" in instance) == ("weights" in instance):
+            raise ValueError("Instance %d needs either a location or weights." % index)
+        weights = instance.get("weights")
+        if weights is not None and len(weights) != len(sources):
+            raise ValueError("Instance %d needs %d weights." % (index, len(sources)))
+        styleName = instance.get("styleName")
+        instances.append(dict(
+            name=instance.get("name") or styleName or "instance%d" % index,
+            path=os.path.join(root, instance["path"]),
+            location=instance.get("location"),
+            weights=weights,
+            familyName=instance.get("familyName"),
+            styleName=styleName
+        ))
+    return sources, instances
+
+
+def instantiate(sources, instances, executor=None, roundGeometry=True, cacheSize=0,
+                overwrite=False, log=None):
+    """
+    Write the instance UFOs described by instances, using the
+    master UFOs described by sources; see readInstanceSpec.
+
+    executor (ie a concurrent.futures ProcessPoolExecutor) is used
+    to instance the glyphs in parallel. If roundGeometry is True,
+    the instance data is rounded to integers. cacheSize is the
+    size of the glyph cache of each master in points; the glyphs
+    are streamed and read once, so they are not cached by default.
+    The default master comes first when the masters are combined,
+    it provides the structure and the non-math data. Existing
+    instance UFOs are replaced if overwrite is True, otherwise a
+    ValueError is raised.
+
+    Return a list of (stage name, seconds) tuples.
+    """
+    timer = _StageTimer()
+    for instance in instances:
+        if instance["path"] is None:
+            raise ValueError("The instance %s has no file name." % instance["name"])
+        if os.path.exists(instance["path"]) and not overwrite:
+            raise ValueError("The instance %s already exists: %s." % (instance["name"], instance["path"]))
+    with timer.stage("setup"):
+        fonts = [MathFont(UFOReader(source["path"], validate=False), cacheSize=cacheSize) for source in sources]
+        model = None
+        if all(source["location"] is not None for source in sources):
+            model = MathVariationModel([source["location"] for source in sources])
+        weightRows = []
+        for instance in instances:
+            weights = instance.get("weights")
+            if weights is None:
+                if model is None:
+                    raise ValueError("The instance %s has a location but the masters don't." % instance["name"])
+                weights = model.getMasterWeights(instance["location"])
+            weightRows.append(weights)
+        # the default master first, the others in source order
+        order = list(range(len(sources)))
+        if model is not None:
+            order.remove(model.defaultIndex)
+            order.insert(0, model.defaultIndex)
+        masters = [fonts[index] for index in order]
+        masterWeightRows = [[weights[index] for index in order] for weights in weightRows]
+        writers = []
+        for instance in instances:
+            if os.path.exists(instance["path"]):
+                shutil.rmtree(instance["path"])
+            directory = os.path.dirname(instance["path"])
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            writers.append(UFOInstanceWriter(instance["path"]))
+    try:
+        with timer.stage("info"):
+            infos = instanceInfo([font.info for font in masters], masterWeightRows)
+            for instance, writer, info in zip(instances, writers, infos):
+                if roundGeometry:
+                    info = info.round()
+                infoObject = _InfoObject()
+                infoObject.familyName = instance["familyName"]
+                infoObject.styleName = instance["styleName"]
+                writer.writeInfo(info, infoObject)
+        with timer.stage("kerning"):
+            kernings = instanceKerning([font.kerning for font in masters], masterWeightRows)
+            for writer, kerning in zip(writers, kernings):
+                if roundGeometry:
+                    kerning.round()
+                writer.writeKerning(kerning)
+        glyphOrder = masters[0].keys()
+        glyphNames = [glyphName for glyphName in glyphOrder if all(glyphName in font for font in fonts)]
+        sparseGlyphNames = [glyphName for glyphName in glyphOrder if not all(glyphName in font for font in fonts)]
+        glyphRows = timer.iterate("glyphs: read", readMasterGlyphs(masters, glyphNames))
+        rows = timer.iterate("glyphs: instance", instanceGlyphs(glyphRows, masterWeightRows, executor=executor))
+        for glyphName, glyphs in rows:
+            with timer.stage("glyphs: write"):
+                _writeGlyphs(writers, glyphName, glyphs, roundGeometry)
+        if sparseGlyphNames:
+            with timer.stage("glyphs: sparse"):
+                locations = [instance["location"] for instance in instances]
+                if model is None or None in locations:
+                    if log is not None:
+                        log("skipped %d glyphs that are missing in some masters" % len(sparseGlyphNames))
+                else:
+                    for glyphName in sparseGlyphNames:
+                        deltas = model.getDeltas([font.get(glyphName) for font in fonts])
+                        _writeGlyphs(writers, glyphName, deltas.instances(locations), roundGeometry)
+    finally:
+        with timer.stage("close"):
+            for writer in writers:
+                writer.close()
+    timings = timer.timings()
+    if log is not None:
+        for stage, seconds in timings:
+            log("%-18s %8.3fs" % (stage, seconds))
+    return timings
+
+
+def _writeGlyphs(writers, glyphName, glyphs, roundGeometry):
+    for writer, glyph in zip(writers, glyphs):
+        if roundGeometry:
+            glyph = glyph.round_()
+        writer.writeGlyph(glyph, glyphName=glyphName)
+
+
+class _StageTimer(object):
+
+    """
+    Adds up the time spent in named stages.
+    """
+
+    def __init__(self):
+        self._order = []
+        self._times = {}
+
+    def add(self, name, seconds):
+        if name not in self._times:
+            self._order.append(name)
+            self._times[name] = 0
+        self._times[name] += seconds
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def iterate(self, name, iterator):
+        """
+        Yield the items of iterator, adding the time spent in
+        the iterator (but not in the caller) to the stage name.
+        The time of nested iterators is only counted once.
+        """
+        iterator = iter(iterator)
+        self.add(name, 0)
+        while True:
+            start = time.time()
+            # the time of stages started by the iterator is subtracted
+            before = sum(self._times.values())
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                nested = sum(self._times.values()) - before
+                self.add(name, time.time() - start - nested)
+            yield item
+
+    def timings(self):
+        return [(name, self._times[name]) for name in self._order]
+
+
+class _Stage(object):
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.timer.add(self.name, time.time() - self.start)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="fontmath-instance",
+        description="Write instance UFOs of a designspace or a JSON instance spec."
+    )
+    parser.add_argument("input", help="a .designspace file or a .json spec")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of processes instancing glyphs (default: 1)")
+    parser.add_argument("--no-round", dest="roundGeometry", action="store_false",
+                        help="don't round the instance data to integers")
+    parser.add_argument("--cache-size", dest="cacheSize", type=int, default=0,
+                        help="size of the glyph cache of each master, in points (default: 0)")
+    parser.add_argument("-o", "--overwrite", action="store_true", help="replace existing instance UFOs")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't report the timings")
+    options = parser.parse_args(args)
+
+    def log(message):
+        print(message, file=sys.stderr)
+
+    if options.input.lower().endswith(".json"):
+        sources, instances = readInstanceSpec(options.input)
+    else:
+        sources, instances = readDesignspace(options.input)
+    executor = None
+    if options.jobs > 1:
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+        except ImportError:
+            parser.error("--jobs needs concurrent.futures (the futures package on Python 2)")
+        executor = ProcessPoolExecutor(options.jobs)
+    start = time.time()
+    try:
+        instantiate(
+            sources,
+            instances,
+            executor=executor,
+            roundGeometry=options.roundGeometry,
+            cacheSize=options.cacheSize,
+            overwrite=options.overwrite,
+            log=None if options.quiet else log
+        )
+    except ValueError as e:
+        log("error: %s" % e)
+        return 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    if not options.quiet:
+        log("wrote %d instances in %.3fs" % (len(instances), time.time() - start))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
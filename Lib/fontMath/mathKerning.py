@@ -1,6 +1,7 @@
 from __future__ import division, absolute_import
 from copy import deepcopy
 from fontMath.mathFunctions import add, sub, mul, div
+from fontMath.mathHash import _contentHash
 from fontTools.misc.py23 import round2
 
 """
@@ -33,8 +34,10 @@ class MathKerning(object):
 
     def update(self, kerning):
         self._kerning = dict(kerning)
+        self._cache = {}
 
     def updateGroups(self, groups):
+        self._cache = {}
         self._groups = {}
         self._side1GroupMap = {}
         self._side2GroupMap = {}
@@ -53,6 +56,7 @@ class MathKerning(object):
                     self._side2GroupMap[glyphName] = groupName
 
     def addTo(self, value):
+        self._cache = {}
         for k, v in self._kerning.items():
             self._kerning[k] = v + value
 
@@ -143,6 +147,28 @@ class MathKerning(object):
                 side2Type = "group"
         return side1Type, side2Type
 
+    # ------------
+    # Content Hash
+    # ------------
+
+    def contentHash(self, onlyGeometry=False):
+        """
+        Return a hex digest of the kerning data.
+
+        The digest is deterministic across processes and machines.
+        If onlyGeometry is True, only the kerning pairs are hashed
+        and the groups are ignored. The digest is cached until the
+        kerning is modified through this object.
+        """
+        key = ("contentHash", onlyGeometry)
+        if key not in self._cache:
+            if onlyGeometry:
+                data = self._kerning
+            else:
+                data = (self._kerning, self._side1Groups, self._side2Groups)
+            self._cache[key] = _contentHash(data)
+        return self._cache[key]
+
     # ----
     # Copy
     # ----
@@ -189,6 +215,40 @@ class MathKerning(object):
         ks = MathKerning(kerning, groups)
         return ks
 
+    # in-place math with other kerning
+
+    def __iadd__(self, other):
+        self._processMathOneInPlace(other, add)
+        self.cleanup()
+        return self
+
+    def __isub__(self, other):
+        self._processMathOneInPlace(other, sub)
+        self.cleanup()
+        return self
+
+    def _processMathOneInPlace(self, other, funct):
+        self._cache = {}
+        comboPairs = set(self._kerning.keys()) | set(other._kerning.keys())
+        # compute everything before writing since the lookups
+        # fall back to group pairs that may be changed below
+        values = [(k, funct(self.get(k), other.get(k))) for k in comboPairs]
+        self._kerning.update(values)
+        g1 = self.groups()
+        g2 = other.groups()
+        if g1 == g2 or not g2:
+            pass
+        elif not g1:
+            self.updateGroups(g2)
+        else:
+            comboGroups = set(g1.keys()) | set(g2.keys())
+            groups = dict.fromkeys(comboGroups, None)
+            for groupName in comboGroups:
+                s1 = set(g1.get(groupName, []))
+                s2 = set(g2.get(groupName, []))
+                groups[groupName] = sorted(list(s1 | s2))
+            self.updateGroups(groups)
+
     # math with factor
 
     def __mul__(self, factor):
@@ -222,20 +282,52 @@ class MathKerning(object):
         ks = MathKerning(kerning, self._groups)
         return ks
 
+    # in-place math with factor
+
+    def __imul__(self, factor):
+        if isinstance(factor, tuple):
+            factor = factor[0]
+        self._processMathTwoInPlace(factor, mul)
+        self.cleanup()
+        return self
+
+    def __idiv__(self, factor):
+        if isinstance(factor, tuple):
+            factor = factor[0]
+        self._processMathTwoInPlace(factor, div)
+        self.cleanup()
+        return self
+
+    __itruediv__ = __idiv__
+
+    def _processMathTwoInPlace(self, factor, funct):
+        self._cache = {}
+        kerning = self._kerning
+        for k, v in kerning.items():
+            kerning[k] = funct(v, factor)
+
     # ---------
     # More math
     # ---------
 
     def round(self, multiple=1):
         multiple = float(multiple)
+        self._cache = {}
         for k, v in self._kerning.items():
             self._kerning[k] = int(round2(int(round2(v / multiple)) * multiple))
 
+    def round_(self, multiple=1):
+        # round is already in place. this matches the
+        # MathGlyph API and returns the kerning.
+        self.round(multiple)
+        return self
+
     # -------
     # Cleanup
     # -------
 
     def cleanup(self):
+        self._cache = {}
         for (side1, side2), v in list(self._kerning.items()):
             if int(v) == v:
                 v = int(v)
@@ -0,0 +1,270 @@
+from __future__ import division, absolute_import
+import mmap
+import os
+import operator
+from array import array
+from fontMath.mathDeltas import _MathGlyphLayout
+
+"""
+Whole font glyph math on one flat array per master.
+
+Glyph math on a font is a Python loop over the glyphs, and every
+operator builds a new MathGlyph. A MathGlyphMatrix holds the
+values of all glyphs of a master (widths, heights, points,
+component transformations, anchors, guidelines and image
+transformations) in one array with an offset per glyph, so
+
+    light + (bold - light) * 0.5
+
+for a whole font is three passes over flat arrays. MathGlyph
+objects are only built when a glyph is looked up.
+
+The matrices of the masters of a font are built together with
+MathGlyphMatrix.fromMasters, which pairs the components, anchors
+and guidelines of every glyph like fontMath.mathDeltas does.
+Matrices built together share their layout and can be combined;
+the non-math data of the glyphs comes from the first master.
+
+The values can also live in files on disk. save writes them as
+native doubles and mapFile returns a matrix with the same layout
+reading them through a memory map, so only the pages that are used
+are loaded. weightedSum can write its result to a memory mapped
+file chunk by chunk instead of building it in memory. This is not
+out of core instancing: the masters are built in memory by
+fromMasters and the layout, which holds the first master's glyph
+of every glyph, is kept in memory and can't be saved. The add,
+subtract, multiply and divide operators always return matrices in
+memory. Memory maps need Python 3.
+"""
+
+__all__ = [
+    "MathGlyphMatrix"
+]
+
+
+class MathGlyphMatrix(object):
+
+    """
+    The glyphs of a master as one flat array of values.
+
+    >>> from fontMath.mathGlyph import MathGlyph
+    >>> light = MathGlyph(None)
+    >>> light.width, light.height = 100, 0
+    >>> bold = MathGlyph(None)
+    >>> bold.width, bold.height = 300, 0
+    >>> lightMatrix, boldMatrix = MathGlyphMatrix.fromMasters([dict(a=light), dict(a=bold)])
+    >>> instance = lightMatrix + (boldMatrix - lightMatrix) * 0.25
+    >>> instance["a"].width
+    150.0
+    """
+
+    def __init__(self, layout, values, mappedFile=None):
+        self._layout = layout
+        self.values = values
+        self._mappedFile = mappedFile
+
+    @classmethod
+    def fromGlyphs(cls, glyphs, glyphNames=None):
+        """
+        Return a matrix for glyphs, a dict of glyph names to
+        MathGlyph objects, in the order of glyphNames.
+        """
+        return cls.fromMasters([glyphs], glyphNames=glyphNames)[0]
+
+    @classmethod
+    def fromMasters(cls, masters, glyphNames=None):
+        """
+        Return a list with one matrix per master in masters, a list
+        of dicts of glyph names to MathGlyph objects. The matrices
+        share their layout. glyphNames defaults to the sorted glyph
+        names of the first master and every master must contain
+        all of them. A ValueError is raised for incompatible glyphs.
+        """
+        masters = list(masters)
+        if glyphNames is None:
+            glyphNames = sorted(masters[0].keys())
+        layout = _MatrixLayout(glyphNames)
+        masterValues = [array("d") for master in masters]
+        for glyphName in glyphNames:
+            glyphs = [master[glyphName] for master in masters]
+            glyphLayout = _MathGlyphLayout(glyphs[0], glyphs[1:])
+            start = len(masterValues[0])
+            for index, (glyph, values) in enumerate(zip(glyphs, masterValues)):
+                # the first master is the default of the glyph layout
+                values.extend(glyphLayout._values(glyph, index - 1 if index else None))
+            end = len(masterValues[0])
+            if any(len(values) != end for values in masterValues):
+                raise ValueError("The glyph %s is not compatible." % glyphName)
+            layout.add(glyphName, glyphLayout, start, end)
+        return [cls(layout, values) for values in masterValues]
+
+    # ------
+    # Glyphs
+    # ------
+
+    def keys(self):
+        return list(self._layout.glyphNames)
+
+    def __iter__(self):
+        return iter(self._layout.glyphNames)
+
+    def __len__(self):
+        return len(self._layout.glyphNames)
+
+    def __contains__(self, glyphName):
+        return glyphName in self._layout.offsets
+
+    def __getitem__(self, glyphName):
+        """
+        Return a new MathGlyph built from the values of glyphName.
+        """
+        glyphLayout, start, end = self._layout.offsets[glyphName]
+        return glyphLayout._build(self.values[start:end])
+
+    def glyphValues(self, glyphName):
+        """
+        Return a copy of the flat values of glyphName.
+        """
+        glyphLayout, start, end = self._layout.offsets[glyphName]
+        return array("d", self.values[start:end])
+
+    # -----
+    # Files
+    # -----
+
+    def save(self, path):
+        """
+        Write the values to path as native doubles.
+        """
+        with open(path, "wb") as f:
+            f.write(self.values)
+
+    def mapFile(self, path, writable=False):
+        """
+        Return a matrix with the layout of this matrix and the
+        values in the file at path, written by save, read through
+        a memory map. If writable is True, changes to the values
+        are written to the file. A ValueError is raised on
+        Python 2.
+        """
+        return self.__class__._mapFile(self._layout, path, len(self.values), writable)
+
+    @classmethod
+    def _mapFile(cls, layout, path, count, writable):
+        if not _canMap:
+            raise ValueError("Memory mapped matrices are not supported by this Python.")
+        size = count * _itemSize
+        if os.path.getsize(path) != size:
+            raise ValueError("The file does not match the layout of the matrix.")
+        if not size:
+            # empty files can't be mapped
+            return cls(layout, array("d"))
+        with open(path, "r+b" if writable else "rb") as f:
+            mappedFile = mmap.mmap(
+                f.fileno(), size, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        return cls(layout, memoryview(mappedFile).cast("d"), mappedFile)
+
+    def close(self):
+        """
+        Close the memory map of a matrix returned by mapFile or
+        weightedSum. The matrix can't be used afterwards.
+        """
+        if self._mappedFile is not None:
+            self.values.release()
+            self._mappedFile.close()
+            self._mappedFile = None
+
+    @classmethod
+    def weightedSum(cls, terms, path=None, chunkSize=1 << 16):
+        """
+        Return the sum of each matrix multiplied by its weight.
+
+        terms is a list of (matrix, weight) tuples of matrices that
+        share a layout. If path is given, the result is written to
+        that file chunkSize values at a time and returned as a
+        memory mapped matrix, so the result is not held in memory.
+        Writing to a file is not supported on Python 2.
+        """
+        terms = [(matrix, float(weight)) for matrix, weight in terms]
+        layout = terms[0][0]._layout
+        if any(matrix._layout is not layout for matrix, weight in terms):
+            raise ValueError("The matrices do not share a layout.")
+        count = len(terms[0][0].values)
+        if path is None:
+            return cls(layout, _weightedChunk(terms, 0, count))
+        with open(path, "wb") as f:
+            f.truncate(count * _itemSize)
+        result = cls._mapFile(layout, path, count, True)
+        for start in range(0, count, chunkSize):
+            end = min(start + chunkSize, count)
+            result.values[start:end] = _weightedChunk(terms, start, end)
+        if result._mappedFile is not None:
+            result._mappedFile.flush()
+        return result
+
+    # ----
+    # Math
+    # ----
+
+    def __add__(self, other):
+        return self._processMathOne(other, operator.add)
+
+    def __sub__(self, other):
+        return self._processMathOne(other, operator.sub)
+
+    def _processMathOne(self, other, func):
+        if other._layout is not self._layout:
+            raise ValueError("The matrices do not share a layout.")
+        return self.__class__(self._layout, array("d", map(func, self.values, other.values)))
+
+    def __mul__(self, factor):
+        return self._processMathTwo(factor, operator.mul)
+
+    __rmul__ = __mul__
+
+    def __div__(self, factor):
+        return self._processMathTwo(factor, operator.truediv)
+
+    __truediv__ = __div__
+
+    def _processMathTwo(self, factor, func):
+        if isinstance(factor, tuple):
+            raise TypeError("Matrices can only be multiplied and divided by a number.")
+        factor = float(factor)
+        if func is operator.mul:
+            method = factor.__mul__
+        else:
+            method = factor.__rtruediv__
+        return self.__class__(self._layout, array("d", map(method, self.values)))
+
+
+_itemSize = array("d").itemsize
+# memoryview.cast is needed to read the mapped doubles
+_canMap = hasattr(memoryview, "cast")
+
+
+def _weightedChunk(terms, start, end):
+    chunk = None
+    for matrix, weight in terms:
+        values = map(weight.__mul__, matrix.values[start:end])
+        if chunk is None:
+            chunk = array("d", values)
+        else:
+            chunk = array("d", map(operator.add, chunk, values))
+    return chunk
+
+
+class _MatrixLayout(object):
+
+    def __init__(self, glyphNames):
+        self.glyphNames = list(glyphNames)
+        self.offsets = {}
+
+    def add(self, glyphName, glyphLayout, start, end):
+        self.offsets[glyphName] = (glyphLayout, start, end)
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
@@ -0,0 +1,188 @@
+from __future__ import division, absolute_import
+from fontTools.misc.transform import Transform
+from fontMath.mathGlyph import _contoursBounds
+
+"""
+Metrics for whole sets of MathGlyph objects.
+
+Spacing checks need the advance, sidebearings and vertical
+extrema of every glyph. Drawing every glyph through a BoundsPen
+to get these is slow, so the values are computed here from the
+cached MathGlyph.bounds. Components are resolved through a glyph
+set lookup: the bounds of every base glyph are computed once and
+reused by every composite that references it. Components with
+an axis aligned transformation (no skew or rotation) only need
+the transformed bounds of their base glyph, other transformations
+fall back to transforming the base glyph's points.
+"""
+
+__all__ = [
+    "glyphSetBounds",
+    "glyphSetMetrics"
+]
+
+
+def glyphSetBounds(glyphs, glyphSet=None, glyphNames=None):
+    """
+    Return a dict of glyph name to the (xMin, yMin, xMax, yMax)
+    bounds of each glyph, including its components, or None for
+    glyphs without outlines.
+
+    glyphs is a dict of glyph names to MathGlyph objects. glyphSet
+    is the dict used to look up the base glyphs of components and
+    defaults to glyphs. Components referencing glyphs that are not
+    in glyphSet are ignored. glyphNames limits the result to those
+    glyphs.
+    """
+    if glyphSet is None:
+        glyphSet = glyphs
+    if glyphNames is None:
+        glyphNames = glyphs.keys()
+    resolver = _BoundsResolver(glyphSet)
+    return dict(
+        (glyphName, resolver.bounds(glyphs[glyphName]))
+        for glyphName in glyphNames
+    )
+
+
+def glyphSetMetrics(glyphs, glyphSet=None, glyphNames=None):
+    """
+    Return a dict of glyph name to a dict of metrics:
+
+    - width: the advance width
+    - leftMargin: the left sidebearing
+    - rightMargin: the right sidebearing
+    - yMin: the bottom of the glyph
+    - yMax: the top of the glyph
+
+    The margins and extrema are None for glyphs without outlines.
+    The arguments are the same as for glyphSetBounds.
+
+    >>> from fontMath.mathGlyph import MathGlyph
+    >>> glyph = MathGlyph(None)
+    >>> glyph.width = 100
+    >>> glyph.contours = [dict(identifier=None, points=[
+    ...     ("curve", (10, 0), False, None, None),
+    ...     (None, (10, 0), False, None, None),
+    ...     (None, (80, 200), False, None, None),
+    ...     ("curve", (80, 200), False, None, None),
+    ... ])]
+    >>> composite = MathGlyph(None)
+    >>> composite.width = 200
+    >>> composite.components = [
+    ...     dict(baseGlyph="a", transformation=(1, 0, 0, 1, 50, 0), identifier=None)]
+    >>> metrics = glyphSetMetrics(dict(a=glyph, b=composite))
+    >>> sorted(metrics["b"].items())
+    [('leftMargin', 60), ('rightMargin', 70), ('width', 200), ('yMax', 200), ('yMin', 0)]
+    """
+    boundsDict = glyphSetBounds(glyphs, glyphSet=glyphSet, glyphNames=glyphNames)
+    metrics = {}
+    for glyphName, bounds in boundsDict.items():
+        width = glyphs[glyphName].width
+        if bounds is None:
+            metrics[glyphName] = dict(width=width, leftMargin=None, rightMargin=None, yMin=None, yMax=None)
+        else:
+            xMin, yMin, xMax, yMax = bounds
+            metrics[glyphName] = dict(
+                width=width,
+                leftMargin=xMin,
+                rightMargin=width - xMax,
+                yMin=yMin,
+                yMax=yMax
+            )
+    return metrics
+
+
+class _BoundsResolver(object):
+
+    """
+    Computes the bounds of glyphs including their components,
+    caching the bounds of every base glyph by name.
+    """
+
+    def __init__(self, glyphSet):
+        self.glyphSet = glyphSet
+        self._boundsCache = {}
+        self._stack = set()
+
+    def bounds(self, glyph):
+        bounds = glyph.bounds
+        for component in glyph.components:
+            bounds = _unionBounds(
+                bounds,
+                self._transformedBounds(component["baseGlyph"], component["transformation"])
+            )
+        return bounds
+
+    def baseBounds(self, glyphName):
+        if glyphName in self._boundsCache:
+            return self._boundsCache[glyphName]
+        glyph = self.glyphSet.get(glyphName)
+        if glyph is None or glyphName in self._stack:
+            # missing base glyph or circular reference
+            return None
+        self._stack.add(glyphName)
+        try:
+            bounds = self.bounds(glyph)
+        finally:
+            self._stack.discard(glyphName)
+        self._boundsCache[glyphName] = bounds
+        return bounds
+
+    def _transformedBounds(self, glyphName, transformation):
+        xx, xy, yx, yy, dx, dy = transformation
+        if not xy and not yx:
+            bounds = self.baseBounds(glyphName)
+            if bounds is None:
+                return None
+            xMin, yMin, xMax, yMax = bounds
+            x1, x2 = xMin * xx + dx, xMax * xx + dx
+            y1, y2 = yMin * yy + dy, yMax * yy + dy
+            return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+        # skewed or rotated: transform the points of the base glyph
+        return self._pointBounds(glyphName, Transform(*transformation))
+
+    def _pointBounds(self, glyphName, transform):
+        glyph = self.glyphSet.get(glyphName)
+        if glyph is None or glyphName in self._stack:
+            return None
+        self._stack.add(glyphName)
+        try:
+            bounds = None
+            if glyph.contours:
+                contours = [
+                    dict(points=[
+                        (point[0], transform.transformPoint(point[1])) for point in contour["points"]
+                    ])
+                    for contour in glyph.contours
+                ]
+                bounds = _contoursBounds(contours)
+            for component in glyph.components:
+                componentTransform = transform.transform(component["transformation"])
+                if componentTransform[1] or componentTransform[2]:
+                    componentBounds = self._pointBounds(component["baseGlyph"], componentTransform)
+                else:
+                    componentBounds = self._transformedBounds(component["baseGlyph"], tuple(componentTransform))
+                bounds = _unionBounds(bounds, componentBounds)
+        finally:
+            self._stack.discard(glyphName)
+        return bounds
+
+
+def _unionBounds(bounds1, bounds2):
+    if bounds1 is None:
+        return bounds2
+    if bounds2 is None:
+        return bounds1
+    return (
+        min(bounds1[0], bounds2[0]),
+        min(bounds1[1], bounds2[1]),
+        max(bounds1[2], bounds2[2]),
+        max(bounds1[3], bounds2[3])
+    )
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
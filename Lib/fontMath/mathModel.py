@@ -0,0 +1,177 @@
+from __future__ import division, absolute_import
+from fontTools.varLib.models import VariationModel
+from fontMath.mathCache import MathCache
+from fontMath.mathDeltas import _deltasForMasters
+
+"""
+Designspace style instancing of MathGlyph, MathKerning and
+MathInfo objects.
+
+A MathVariationModel wraps a fontTools VariationModel built
+from the normalized master locations. The model deltas
+(delta_j = master_j - sum(deltaWeight_jk * delta_k)) are linear
+combinations of the masters, so instead of materializing them as
+math objects the model folds the support scalars and the delta
+weights into one weight per master for each location. Instancing
+then runs through the precomputed master deltas in
+fontMath.mathDeltas, which already have the component, anchor,
+guideline and kerning pairing resolved.
+"""
+
+__all__ = [
+    "MathVariationModel",
+    "MathModelDeltas"
+]
+
+
+class MathVariationModel(object):
+
+    """
+    A variation model for fontMath objects.
+
+    locations is a list of normalized locations (dicts of axis
+    name to value in the -1 to 1 range), one per master. One of
+    them must be the default location (all axes at 0).
+
+    >>> model = MathVariationModel([{}, {"wght": 1}, {"wdth": 1}])
+    >>> model.getMasterWeights({"wght": 0.5, "wdth": 0.5})
+    [0.0, 0.5, 0.5]
+    """
+
+    def __init__(self, locations, axisOrder=None, cacheSize=10000):
+        self.locations = [dict(location) for location in locations]
+        self._model = VariationModel(self.locations, axisOrder or [])
+        self.axisOrder = axisOrder
+        self.defaultIndex = self._model.reverseMapping[0]
+        count = len(self.locations)
+        # express every model delta as a linear combination of the masters
+        coefficients = []
+        for index, deltaWeights in enumerate(self._model.deltaWeights):
+            coefficient = [0.0] * count
+            coefficient[self._model.reverseMapping[index]] = 1.0
+            for otherIndex, weight in deltaWeights.items():
+                otherCoefficient = coefficients[otherIndex]
+                coefficient = [c - weight * o for c, o in zip(coefficient, otherCoefficient)]
+            coefficients.append(coefficient)
+        self._coefficients = coefficients
+        self._weightCache = MathCache(maxSize=cacheSize, sizeFunction=_unitSize)
+        self._subModels = {}
+
+    def __len__(self):
+        return len(self.locations)
+
+    def getMasterWeights(self, location):
+        """
+        Return a list with the weight of each master at location.
+
+        The weights sum to 1 and an instance is the sum of each
+        master multiplied by its weight. Results are cached per
+        location.
+        """
+        key = _locationKey(location)
+        weights = self._weightCache.get(key)
+        if weights is None:
+            scalars = self._model.getScalars(location)
+            weights = [0.0] * len(self.locations)
+            for scalar, coefficient in zip(scalars, self._coefficients):
+                if not scalar:
+                    continue
+                weights = [w + scalar * c for w, c in zip(weights, coefficient)]
+            self._weightCache.set(key, weights)
+        return list(weights)
+
+    def getSubModel(self, masterIndexes):
+        """
+        Return a model for the masters at masterIndexes. This is
+        used for data that is not defined in all masters.
+        """
+        masterIndexes = tuple(masterIndexes)
+        if self.defaultIndex not in masterIndexes:
+            raise ValueError("The default master must be included.")
+        if len(masterIndexes) == len(self.locations):
+            return self
+        subModel = self._subModels.get(masterIndexes)
+        if subModel is None:
+            subModel = self._subModels[masterIndexes] = MathVariationModel(
+                [self.locations[index] for index in masterIndexes],
+                axisOrder=self.axisOrder
+            )
+        return subModel
+
+    def getDeltas(self, masters):
+        """
+        Return a MathModelDeltas for masters, a list with one
+        MathGlyph, MathKerning or MathInfo per master location.
+        Masters that do not define the data may be None, but
+        the default master is required.
+        """
+        masters = list(masters)
+        if len(masters) != len(self.locations):
+            raise ValueError("Expected %d masters, got %d." % (len(self.locations), len(masters)))
+        masterIndexes = [index for index, master in enumerate(masters) if master is not None]
+        if self.defaultIndex not in masterIndexes:
+            raise ValueError("The default master must be defined.")
+        model = self.getSubModel(masterIndexes)
+        masters = [masters[index] for index in masterIndexes]
+        return MathModelDeltas(model, masters)
+
+    def interpolateFromMasters(self, location, masters):
+        """
+        Return the instance of masters at location.
+
+        Use getDeltas when more than one location is needed
+        from the same masters.
+        """
+        return self.getDeltas(masters).instance(location)
+
+
+class MathModelDeltas(object):
+
+    """
+    Precomputed deltas of one set of masters in a MathVariationModel.
+    """
+
+    def __init__(self, model, masters):
+        self.model = model
+        defaultIndex = model.defaultIndex
+        self._otherIndexes = [index for index in range(len(masters)) if index != defaultIndex]
+        self.deltas = _deltasForMasters(
+            masters[defaultIndex],
+            [masters[index] for index in self._otherIndexes]
+        )
+
+    def getScalars(self, location):
+        """
+        Return the scalars of the deltas at location.
+        """
+        weights = self.model.getMasterWeights(location)
+        return [weights[index] for index in self._otherIndexes]
+
+    def instance(self, location):
+        """
+        Return a new math object at location.
+        """
+        return self.deltas.instance(self.getScalars(location))
+
+    def instances(self, locations):
+        """
+        Return a list of new math objects, one per location,
+        computed in one batch.
+        """
+        return self.deltas.instances([self.getScalars(location) for location in locations])
+
+
+def _locationKey(location):
+    return tuple(sorted(
+        (axis, float(value)) for axis, value in location.items() if value
+    ))
+
+
+def _unitSize(value):
+    return 1
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
@@ -0,0 +1,195 @@
+from __future__ import division, absolute_import
+import sys
+import time
+import threading
+from fontMath import mathGlyph, mathGuideline, mathInfo, mathKerning
+
+"""
+Opt-in instrumentation of the math operations.
+
+When a build is slow it helps to know whether the time goes to
+pairing, contour math, copying, rounding or extraction. While
+profiling is enabled, the operations listed in _targets are
+wrapped to record their call count, the cumulative time spent in
+them and optionally the number of memory blocks they left
+allocated (through sys.getallocatedblocks, where available).
+The times are cumulative: the time of an operation includes the
+time of the operations it calls, like _pairComponents called from
+MathGlyph._processMathOne.
+
+The wrappers are only installed while profiling is enabled and
+the original functions are put back when it is disabled, so there
+is no cost at all when profiling is off.
+"""
+
+__all__ = [
+    "enableProfiling",
+    "disableProfiling",
+    "isProfiling",
+    "resetProfiling",
+    "profilingSnapshot",
+    "MathProfiler"
+]
+
+# (owner, attribute name, operation name)
+_targets = [
+    (mathGlyph.MathGlyph, "_processMathOne", "MathGlyph._processMathOne"),
+    (mathGlyph.MathGlyph, "_processMathTwo", "MathGlyph._processMathTwo"),
+    (mathGlyph.MathGlyph, "_processMathOneInPlace", "MathGlyph._processMathOneInPlace"),
+    (mathGlyph.MathGlyph, "_processMathTwoInPlace", "MathGlyph._processMathTwoInPlace"),
+    (mathGlyph.MathGlyph, "copyWithoutMathSubObjects", "MathGlyph.copyWithoutMathSubObjects"),
+    (mathGlyph.MathGlyph, "round", "MathGlyph.round"),
+    (mathGlyph.MathGlyph, "round_", "MathGlyph.round_"),
+    (mathGlyph.MathGlyph, "extractGlyph", "MathGlyph.extractGlyph"),
+    (mathGlyph, "_pairComponents", "_pairComponents"),
+    (mathGlyph, "_pairAnchors", "_pairAnchors"),
+    (mathGlyph, "_pairGuidelines", "_pairGuidelines"),
+    (mathInfo, "_pairGuidelines", "_pairGuidelines"),
+    (mathGuideline, "_pairGuidelines", "_pairGuidelines"),
+    (mathKerning.MathKerning, "_processMathOne", "MathKerning._processMathOne"),
+    (mathKerning.MathKerning, "_processMathTwo", "MathKerning._processMathTwo"),
+    (mathKerning.MathKerning, "_processMathOneInPlace", "MathKerning._processMathOneInPlace"),
+    (mathKerning.MathKerning, "_processMathTwoInPlace", "MathKerning._processMathTwoInPlace"),
+    (mathKerning.MathKerning, "round", "MathKerning.round"),
+    (mathKerning.MathKerning, "cleanup", "MathKerning.cleanup"),
+    (mathInfo.MathInfo, "_processMathOne", "MathInfo._processMathOne"),
+    (mathInfo.MathInfo, "_processMathTwo", "MathInfo._processMathTwo"),
+    (mathInfo.MathInfo, "round", "MathInfo.round"),
+    (mathInfo.MathInfo, "extractInfo", "MathInfo.extractInfo"),
+]
+
+_lock = threading.Lock()
+_stats = {}
+_originals = []
+_getAllocatedBlocks = getattr(sys, "getallocatedblocks", None)
+
+
+def enableProfiling(trackAllocations=False):
+    """
+    Start recording the math operations. If trackAllocations is
+    True, the number of memory blocks left allocated by every
+    operation is recorded too; this is only supported by CPython 3.
+    Enabling profiling again only changes trackAllocations.
+    """
+    if trackAllocations and _getAllocatedBlocks is None:
+        raise ValueError("Tracking allocations is not supported by this Python.")
+    with _lock:
+        _uninstall()
+        for owner, attr, name in _targets:
+            original = vars(owner)[attr]
+            _originals.append((owner, attr, original))
+            setattr(owner, attr, _wrap(original, name, trackAllocations))
+
+
+def disableProfiling():
+    """
+    Stop recording the math operations. The recorded data is kept.
+    """
+    with _lock:
+        _uninstall()
+
+
+def isProfiling():
+    return bool(_originals)
+
+
+def resetProfiling():
+    """
+    Forget the recorded data.
+    """
+    with _lock:
+        _stats.clear()
+
+
+def profilingSnapshot():
+    """
+    Return a dict of operation name to a dict with the number of
+    calls, the cumulative time in seconds and, if allocations are
+    tracked, the number of memory blocks left allocated.
+    """
+    with _lock:
+        return dict((name, dict(stats)) for name, stats in _stats.items())
+
+
+def _uninstall():
+    while _originals:
+        owner, attr, original = _originals.pop()
+        setattr(owner, attr, original)
+
+
+def _wrap(function, name, trackAllocations):
+    if trackAllocations:
+        def wrapper(*args, **kwargs):
+            blocks = _getAllocatedBlocks()
+            start = time.time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _record(name, time.time() - start, _getAllocatedBlocks() - blocks)
+    else:
+        def wrapper(*args, **kwargs):
+            start = time.time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _record(name, time.time() - start, None)
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+    return wrapper
+
+
+def _record(name, seconds, allocations):
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = dict(calls=0, time=0.0)
+        stats["calls"] += 1
+        stats["time"] += seconds
+        if allocations is not None:
+            stats["allocations"] = stats.get("allocations", 0) + allocations
+
+
+class MathProfiler(object):
+
+    """
+    A context manager that records the math operations in its
+    block. The recorded data is reset on enter unless reset is
+    False. Profiling stays enabled on exit if it was enabled before.
+
+    >>> from fontMath.mathGlyph import MathGlyph
+    >>> glyph = MathGlyph(None)
+    >>> glyph.width = glyph.height = 100
+    >>> with MathProfiler() as profiler:
+    ...     result = glyph + glyph
+    >>> profiler.snapshot()["MathGlyph._processMathOne"]["calls"]
+    1
+    >>> isProfiling()
+    False
+    """
+
+    def __init__(self, trackAllocations=False, reset=True):
+        self.trackAllocations = trackAllocations
+        self.reset = reset
+        self._wasProfiling = False
+
+    def __enter__(self):
+        self._wasProfiling = isProfiling()
+        if self.reset:
+            resetProfiling()
+        enableProfiling(trackAllocations=self.trackAllocations)
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        if not self._wasProfiling:
+            disableProfiling()
+
+    def snapshot(self):
+        """
+        Return the recorded data, see profilingSnapshot.
+        """
+        return profilingSnapshot()
+
+
+if __name__ == "__main__":
+    import doctest
+    sys.exit(doctest.testmod().failed)
@@ -0,0 +1,591 @@
+from __future__ import print_function, division, absolute_import
+import sys
+import json
+import argparse
+import threading
+from fontTools.pens.recordingPen import RecordingPointPen
+from fontTools.ttLib import TTFont
+from fontTools.ufoLib import UFOReader
+from fontMath.mathCache import MathCache
+from fontMath.mathComponents import MathGlyphDecomposer
+from fontMath.mathDesignspace import readDesignspace
+from fontMath.mathFont import MathFont
+from fontMath.mathGlyph import FilterRedundantPointPen
+from fontMath.mathMetrics import glyphSetMetrics
+from fontMath.mathModel import MathVariationModel, _locationKey, _unitSize
+from fontMath.mathUFO import _InfoObject
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qsl
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qsl
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+"""
+A local instance server.
+
+MathInstanceService loads the masters once, as MathFont objects, and
+answers requests for instance data at arbitrary locations: glyph
+outlines, glyph metrics, kerning and info. Instances are kept in
+an in-memory MathCache and concurrent requests for the same data
+and location share one computation. A batch of requests computes
+all uncached locations of a glyph in one go.
+
+MathInstanceServer makes the service available over HTTP using
+only the standard library. Requests are JSON objects posted to
+the server, for example:
+
+    {"type": "glyph", "name": "a", "location": {"wght": 0.5}}
+
+A JSON list of requests is answered with a list of responses.
+Simple requests can also be made with GET, the query holds the
+glyph name and the location:
+
+    GET /glyph?name=a&wght=0.5
+
+Locations are normalized locations, as used by MathVariationModel.
+
+The server can be started from the command line with a designspace
+or with master files and their locations:
+
+    python -m fontMath.mathServer MyFamily.designspace --port 8000
+    python -m fontMath.mathServer Light.ufo Bold.ufo -l "" -l wght=1
+"""
+
+__all__ = [
+    "MathInstanceService",
+    "MathInstanceServer",
+    "serve",
+    "main"
+]
+
+
+class MathInstanceService(object):
+
+    """
+    Computes and caches the instances of a MathVariationModel.
+
+    masters is a list of MathFont objects (or any mappings of
+    glyph names to MathGlyph objects with info and kerning
+    attributes), one per location of model. The master that
+    does not define a glyph, kerning or info may return None.
+
+    This object is thread safe.
+    """
+
+    def __init__(self, model, masters, cacheSize=10000000, deltasCacheSize=10000):
+        self.model = model
+        self.masters = list(masters)
+        self.cache = MathCache(maxSize=cacheSize)
+        self._deltasCache = MathCache(maxSize=deltasCacheSize, sizeFunction=_unitSize)
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    @classmethod
+    def fromSources(cls, locations, sources, **kwargs):
+        """
+        Create a service from a list of normalized locations and
+        a list of sources, one per location. A source can be the
+        path of a UFO, a TTF or OTF file with TrueType outlines or
+        anything MathFont accepts. A ValueError is raised for fonts
+        with CFF outlines.
+        """
+        masters = []
+        for source in sources:
+            if not isinstance(source, MathFont):
+                source = MathFont(_openSource(source))
+            masters.append(source)
+        return cls(MathVariationModel(locations), masters, **kwargs)
+
+    # -------
+    # Objects
+    # -------
+
+    def glyph(self, glyphName, location):
+        """
+        Return the MathGlyph instance of glyphName at location.
+        A KeyError is raised if the default master does not
+        have the glyph.
+        """
+        key = ("glyph", glyphName, _locationKey(location))
+        return self._get(key, self._instanceGlyph, glyphName, location)
+
+    def kerning(self, location):
+        """
+        Return the MathKerning instance at location.
+        """
+        key = ("kerning", None, _locationKey(location))
+        return self._get(key, self._instance, "kerning", location)
+
+    def info(self, location):
+        """
+        Return the MathInfo instance at location.
+        """
+        key = ("info", None, _locationKey(location))
+        return self._get(key, self._instance, "info", location)
+
+    def glyphSet(self, location):
+        """
+        Return a read only mapping of glyph names to the MathGlyph
+        instances at location. Used to resolve components.
+        """
+        return _LocationGlyphSet(self, location)
+
+    def prefetchGlyphs(self, glyphName, locations):
+        """
+        Compute the instances of glyphName at all uncached
+        locations in one batch.
+        """
+        missing = []
+        keys = set()
+        for location in locations:
+            key = ("glyph", glyphName, _locationKey(location))
+            if key not in self.cache and key not in keys:
+                keys.add(key)
+                missing.append(location)
+        if not missing:
+            return
+        if len(missing) == 1:
+            self.glyph(glyphName, missing[0])
+            return
+        for location, glyph in zip(missing, self._glyphDeltas(glyphName).instances(missing)):
+            self.cache.set(("glyph", glyphName, _locationKey(location)), glyph)
+
+    # --------
+    # Requests
+    # --------
+
+    def handleRequest(self, request):
+        """
+        Answer request, a dict with a "type" key:
+
+        - "glyph": the outline of glyph "name". If "decompose"
+          is true, components are decomposed.
+        - "metrics": the metrics of the glyphs in "names".
+        - "kerning": the kerning, limited to the pairs in
+          "pairs" if given.
+        - "info": the font info.
+
+        All requests take a "location" dict. The result is a dict
+        that can be serialized to JSON. Invalid requests raise a
+        ValueError, unknown glyphs a KeyError.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("A request must be a dict.")
+        requestType = request.get("type")
+        handler = self._handlers.get(requestType)
+        if handler is None:
+            raise ValueError("Unknown request type: %r." % requestType)
+        location = request.get("location")
+        if location is None:
+            location = {}
+        elif not isinstance(location, dict):
+            raise ValueError("The location must be a dict.")
+        return handler(self, request, location)
+
+    def handleBatch(self, requests):
+        """
+        Answer a list of requests. The glyph instances needed by
+        the batch are computed first, one batch per glyph. The
+        result is a list with one response dict per request, the
+        responses of failed requests hold an "error" key.
+        """
+        locations = {}
+        for request in requests:
+            if not isinstance(request, dict):
+                continue
+            location = request.get("location") or {}
+            if not isinstance(location, dict):
+                continue
+            requestType = request.get("type")
+            if requestType == "glyph":
+                glyphNames = [request.get("name")]
+            elif requestType == "metrics":
+                glyphNames = request.get("names")
+                if not isinstance(glyphNames, list):
+                    continue
+            else:
+                continue
+            for glyphName in glyphNames:
+                if _isGlyphName(glyphName) and glyphName in self.masters[self.model.defaultIndex]:
+                    locations.setdefault(glyphName, []).append(location)
+        for glyphName, glyphLocations in locations.items():
+            self.prefetchGlyphs(glyphName, glyphLocations)
+        responses = []
+        for request in requests:
+            try:
+                responses.append(self.handleRequest(request))
+            except (_UnknownGlyphError, ValueError, TypeError) as e:
+                responses.append(_errorResponse(e))
+        return responses
+
+    def _glyphRequest(self, request, location):
+        glyphName = request.get("name")
+        glyph = self.glyph(glyphName, location)
+        if request.get("decompose") and glyph.components:
+            decomposer = MathGlyphDecomposer(self.glyphSet(location))
+            contours = decomposer.decomposedContours(glyphName)
+            components = []
+        else:
+            contours = glyph.contours
+            components = glyph.components
+        pen = RecordingPointPen()
+        filterPen = FilterRedundantPointPen(pen)
+        for contour in contours:
+            filterPen.beginPath()
+            for segmentType, pt, smooth, name, identifier in contour["points"]:
+                filterPen.addPoint(pt, segmentType=segmentType, smooth=smooth)
+            filterPen.endPath()
+        return dict(
+            name=glyphName,
+            width=glyph.width,
+            height=glyph.height,
+            unicodes=list(glyph.unicodes),
+            contours=_recordedContours(pen),
+            components=[
+                dict(baseGlyph=component["baseGlyph"], transformation=list(component["transformation"]))
+                for component in components
+            ],
+            anchors=[
+                dict(name=anchor.get("name"), x=anchor["x"], y=anchor["y"])
+                for anchor in glyph.anchors
+            ]
+        )
+
+    def _metricsRequest(self, request, location):
+        glyphNames = request.get("names")
+        if not isinstance(glyphNames, list):
+            raise ValueError("A metrics request needs a list of names.")
+        glyphSet = self.glyphSet(location)
+        glyphs = dict((glyphName, glyphSet[glyphName]) for glyphName in glyphNames)
+        return dict(metrics=glyphSetMetrics(glyphs, glyphSet=glyphSet))
+
+    def _kerningRequest(self, request, location):
+        pairs = request.get("pairs")
+        if pairs is not None and not (isinstance(pairs, list) and all(_isPair(pair) for pair in pairs)):
+            raise ValueError("The pairs must be a list of [side1, side2] lists of names.")
+        kerning = self.kerning(location)
+        if kerning is None:
+            raise ValueError("The masters have no kerning.")
+        if pairs is None:
+            pairs = sorted(kerning.keys())
+        return dict(kerning=[
+            [side1, side2, kerning[side1, side2]] for side1, side2 in pairs
+        ])
+
+    def _infoRequest(self, request, location):
+        info = self.info(location)
+        if info is None:
+            raise ValueError("The masters have no info.")
+        infoObject = _InfoObject()
+        info.extractInfo(infoObject)
+        infoDict = dict(infoObject.__dict__)
+        # the expanded guidelines are not part of the info data
+        infoDict.pop("guidelines", None)
+        return dict(info=infoDict)
+
+    _handlers = dict(
+        glyph=_glyphRequest,
+        metrics=_metricsRequest,
+        kerning=_kerningRequest,
+        info=_infoRequest
+    )
+
+    # -----------
+    # Computation
+    # -----------
+
+    def _get(self, key, function, *args):
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        with self._lock:
+            entry = self._pending.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._pending[key] = _PendingResult()
+        if not owner:
+            return entry.wait()
+        try:
+            result = function(*args)
+            if result is not None:
+                self.cache.set(key, result)
+            entry.result = result
+        except Exception as e:
+            entry.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+            entry.event.set()
+        return result
+
+    def _glyphDeltas(self, glyphName):
+        deltas = self._deltasCache.get(("glyph", glyphName))
+        if deltas is None:
+            if glyphName not in self.masters[self.model.defaultIndex]:
+                raise _UnknownGlyphError(glyphName)
+            deltas = self.model.getDeltas([master.get(glyphName) for master in self.masters])
+            self._deltasCache.set(("glyph", glyphName), deltas)
+        return deltas
+
+    def _instanceGlyph(self, glyphName, location):
+        return self._glyphDeltas(glyphName).instance(location)
+
+    def _instance(self, attr, location):
+        deltas = self._deltasCache.get((attr, None))
+        if deltas is None:
+            default = getattr(self.masters[self.model.defaultIndex], attr)
+            if default is None:
+                return None
+            deltas = self.model.getDeltas([getattr(master, attr) for master in self.masters])
+            self._deltasCache.set((attr, None), deltas)
+        return deltas.instance(location)
+
+
+class _PendingResult(object):
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class _LocationGlyphSet(object):
+
+    def __init__(self, service, location):
+        self.service = service
+        self.location = location
+
+    def __contains__(self, glyphName):
+        return glyphName in self.service.masters[self.service.model.defaultIndex]
+
+    def __getitem__(self, glyphName):
+        return self.service.glyph(glyphName, self.location)
+
+    def get(self, glyphName, default=None):
+        if glyphName not in self:
+            return default
+        return self[glyphName]
+
+
+def _openSource(source):
+    if not isinstance(source, basestring):
+        return source
+    if source.lower().endswith((".ttf", ".otf")):
+        font = TTFont(source, lazy=True)
+        if "glyf" not in font:
+            font.close()
+            raise ValueError("Only fonts with TrueType outlines are supported: %s." % source)
+        return font
+    return UFOReader(source, validate=False)
+
+
+def _isGlyphName(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return value is not None
+
+
+def _isPair(value):
+    return (
+        isinstance(value, (list, tuple))
+        and len(value) == 2
+        and all(isinstance(side, basestring) for side in value)
+    )
+
+
+def _recordedContours(pen):
+    contours = []
+    for method, args, kwargs in pen.value:
+        if method == "beginPath":
+            contours.append([])
+        elif method == "addPoint":
+            (x, y), segmentType, smooth = args[:3]
+            contours[-1].append([x, y, segmentType, bool(smooth)])
+    return contours
+
+
+class _UnknownGlyphError(KeyError):
+
+    """
+    Raised for glyphs that are not in the default master, to tell
+    them apart from other KeyErrors.
+    """
+
+
+def _errorResponse(error):
+    if isinstance(error, _UnknownGlyphError):
+        return dict(error="Unknown glyph: %s." % error.args[0])
+    return dict(error=str(error))
+
+
+# ----
+# HTTP
+# ----
+
+class MathInstanceServer(ThreadingMixIn, HTTPServer):
+
+    """
+    A threaded HTTP server answering requests with service, a
+    MathInstanceService. address is a (host, port) tuple; port 0
+    picks a free port, see server_address.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, service, address=("127.0.0.1", 0)):
+        HTTPServer.__init__(self, address, _RequestHandler)
+        self.service = service
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        request = dict(type=url.path.strip("/"))
+        location = {}
+        for key, value in parse_qsl(url.query):
+            if key == "name":
+                request["name"] = value
+            elif key == "names":
+                request["names"] = value.split(",")
+            elif key == "decompose":
+                request["decompose"] = value.lower() in ("1", "true", "yes")
+            else:
+                try:
+                    location[key] = float(value)
+                except ValueError:
+                    self._respond(400, dict(error="Invalid location value for %s." % key))
+                    return
+        request["location"] = location
+        self._answer(request)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length).decode("utf-8"))
+        except ValueError:
+            self._respond(400, dict(error="Invalid JSON."))
+            return
+        self._answer(request)
+
+    def _answer(self, request):
+        service = self.server.service
+        try:
+            if isinstance(request, list):
+                response = service.handleBatch(request)
+            else:
+                response = service.handleRequest(request)
+        except _UnknownGlyphError as e:
+            self._respond(404, _errorResponse(e))
+        except (ValueError, TypeError) as e:
+            self._respond(400, _errorResponse(e))
+        except Exception as e:
+            self._respond(500, dict(error="Internal error: %r." % e))
+        else:
+            self._respond(200, response)
+
+    def _respond(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(service, host="127.0.0.1", port=8000):
+    """
+    Serve service, a MathInstanceService, over HTTP until
+    interrupted.
+    """
+    server = MathInstanceServer(service, (host, port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m fontMath.mathServer",
+        description="Serve the instances of a designspace or of a set of masters over HTTP."
+    )
+    parser.add_argument("sources", nargs="+", help="a .designspace file or the UFO, TTF or OTF (TrueType outlines) masters")
+    parser.add_argument("-l", "--location", dest="locations", action="append", type=_parseLocation,
+                        default=[], help="the normalized location of a master, like wght=1,wdth=-0.5; "
+                        "once per master, in order, \"\" for the default")
+    parser.add_argument("--host", default="127.0.0.1", help="the host name to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="the port to listen on (default: 8000)")
+    options = parser.parse_args(args)
+
+    if len(options.sources) == 1 and options.sources[0].lower().endswith(".designspace"):
+        if options.locations:
+            parser.error("the locations of the masters are read from the designspace")
+        try:
+            sources, instances = readDesignspace(options.sources[0])
+        except ValueError as e:
+            parser.error(str(e))
+        paths = [source["path"] for source in sources]
+        locations = [source["location"] for source in sources]
+    else:
+        if len(options.locations) != len(options.sources):
+            parser.error("expected one --location per master")
+        paths = options.sources
+        locations = options.locations
+    try:
+        service = MathInstanceService.fromSources(locations, paths)
+    except ValueError as e:
+        parser.error(str(e))
+    print("serving %d masters on http://%s:%d" % (len(paths), options.host, options.port))
+    sys.stdout.flush()
+    serve(service, host=options.host, port=options.port)
+    return 0
+
+
+def _parseLocation(text):
+    """
+    >>> sorted(_parseLocation("wght=1, wdth=-0.5").items())
+    [('wdth', -0.5), ('wght', 1.0)]
+    >>> _parseLocation("")
+    {}
+    """
+    location = {}
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        axisName, sep, value = item.partition("=")
+        if not sep or not axisName.strip():
+            raise argparse.ArgumentTypeError("invalid location: %r" % text)
+        try:
+            location[axisName.strip()] = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError("invalid location: %r" % text)
+    return location
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+from __future__ import print_function, division, absolute_import
+from collections import deque
+from fontMath.mathDeltas import _deltasForMasters
+
+"""
+Streaming instancing.
+
+The functions here are generators that pass glyphs through one at
+a time, so the memory use of an instancing run depends on the
+size of the biggest glyph and not on the size of the font.
+Each glyph is instanced for all locations at once through the
+precomputed deltas in fontMath.mathDeltas. The weight rows have
+one weight per master, as returned by
+MathVariationModel.getMasterWeights. Kerning and info are
+separate stages since they are not part of the glyph stream.
+"""
+
+__all__ = [
+    "readMasterGlyphs",
+    "zipMasterGlyphs",
+    "instanceGlyphs",
+    "instanceKerning",
+    "instanceInfo"
+]
+
+
+def readMasterGlyphs(fonts, glyphNames=None):
+    """
+    Yield (glyphName, [glyph in each font]) for glyphNames, or the
+    glyphs of the first font. fonts is a list of mappings of glyph
+    names to MathGlyph objects, like MathFont objects with a small
+    cache, which only build the glyphs when they are asked for.
+    """
+    fonts = list(fonts)
+    if glyphNames is None:
+        glyphNames = fonts[0].keys()
+    for glyphName in glyphNames:
+        yield glyphName, [font[glyphName] for font in fonts]
+
+
+def zipMasterGlyphs(masterIterators):
+    """
+    Yield (glyphName, [glyph in each master]) from a list of
+    iterators, one per master, that yield (glyphName, MathGlyph)
+    in the same glyph order. A ValueError is raised when the
+    glyph names or the lengths of the iterators differ.
+    """
+    iterators = [iter(iterator) for iterator in masterIterators]
+    while True:
+        items = []
+        for iterator in iterators:
+            try:
+                items.append(next(iterator))
+            except StopIteration:
+                items.append(None)
+        if all(item is None for item in items):
+            return
+        if any(item is None for item in items):
+            raise ValueError("The masters have a different number of glyphs.")
+        glyphName = items[0][0]
+        if any(item[0] != glyphName for item in items):
+            raise ValueError("The masters are not in the same glyph order.")
+        yield glyphName, [item[1] for item in items]
+
+
+def instanceGlyphs(glyphRows, weightRows, executor=None, lookAhead=16):
+    """
+    Yield (glyphName, [instance at each location]) for every
+    (glyphName, [glyph in each master]) in glyphRows.
+
+    weightRows has one row of weights per location and one weight
+    per master in each row. If executor (ie a concurrent.futures
+    executor) is given, up to lookAhead glyphs are instanced
+    through its submit method while earlier results are consumed.
+    The results are always yielded in the order of glyphRows.
+
+    >>> from fontMath.mathGlyph import MathGlyph
+    >>> def masterGlyphs(width):
+    ...     for glyphName in ("a", "b"):
+    ...         glyph = MathGlyph(None)
+    ...         glyph.name, glyph.width, glyph.height = glyphName, width, 0
+    ...         yield glyphName, glyph
+    >>> rows = zipMasterGlyphs([masterGlyphs(100), masterGlyphs(200)])
+    >>> for glyphName, instances in instanceGlyphs(rows, [[0.5, 0.5], [0, 1]]):
+    ...     print(glyphName, [instance.width for instance in instances])
+    a [150.0, 200.0]
+    b [150.0, 200.0]
+    """
+    weightRows = [list(weights) for weights in weightRows]
+    if executor is None:
+        for glyphName, masters in glyphRows:
+            yield glyphName, _instances(masters, weightRows)
+        return
+    pending = deque()
+    for glyphName, masters in glyphRows:
+        if len(pending) >= max(1, lookAhead):
+            name, future = pending.popleft()
+            yield name, future.result()
+        pending.append((glyphName, executor.submit(_instances, masters, weightRows)))
+    while pending:
+        name, future = pending.popleft()
+        yield name, future.result()
+
+
+def instanceKerning(masters, weightRows):
+    """
+    Yield the instance of masters, a list of MathKerning objects,
+    at each row of weightRows.
+    """
+    return _instanceStage(masters, weightRows)
+
+
+def instanceInfo(masters, weightRows):
+    """
+    Yield the instance of masters, a list of MathInfo objects,
+    at each row of weightRows.
+    """
+    return _instanceStage(masters, weightRows)
+
+
+def _instanceStage(masters, weightRows):
+    masters = list(masters)
+    deltas = _deltasForMasters(masters[0], masters[1:])
+    for weights in weightRows:
+        yield deltas.weightedInstances([weights])[0]
+
+
+def _instances(masters, weightRows):
+    masters = list(masters)
+    return _deltasForMasters(masters[0], masters[1:]).weightedInstances(weightRows)
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
@@ -0,0 +1,266 @@
+from __future__ import division, absolute_import
+import os
+from collections import deque
+from fontTools.ufoLib import UFOWriter, DEFAULT_GLYPHS_DIRNAME
+from fontTools.ufoLib.glifLib import writeGlyphToString
+from fontMath.mathGlyph import FilterRedundantPointPen, _compressImage
+from fontMath.mathGuideline import _compressGuideline
+
+"""
+Bulk output of MathGlyph objects to UFO data.
+
+MathGlyph.extractGlyph is made for editing one glyph in an
+open font. The functions here handle many glyphs at once:
+extractGlyphs fills a defcon or ufoLib2 font with notifications
+held for the whole batch, and writeGlyph and writeGlyphs write
+.glif files through a fontTools.ufoLib GlyphSet without creating
+glyph objects of an editing library first.
+
+UFOInstanceWriter writes a whole instance UFO while the instance
+is still being computed: glyphs are written as they arrive,
+optionally in parallel through an executor, and only a bounded
+window of them is held in memory.
+"""
+
+__all__ = [
+    "extractGlyphs",
+    "writeGlyph",
+    "writeGlyphs",
+    "UFOInstanceWriter"
+]
+
+
+def extractGlyphs(glyphs, font, glyphNames=None, onlyGeometry=False):
+    """
+    Extract the MathGlyph objects in glyphs, a dict of glyph names
+    to MathGlyph objects, into font, a defcon or ufoLib2 font or
+    layer. Glyphs that are not in font are created with newGlyph.
+
+    If font supports holding notifications (like defcon fonts),
+    they are held until all glyphs have been extracted.
+    """
+    if glyphNames is None:
+        glyphNames = glyphs.keys()
+    holdNotifications = hasattr(font, "holdNotifications")
+    if holdNotifications:
+        font.holdNotifications()
+    try:
+        for glyphName in glyphNames:
+            if glyphName in font:
+                target = font[glyphName]
+            else:
+                font.newGlyph(glyphName)
+                target = font[glyphName]
+            glyphs[glyphName].extractGlyph(target, onlyGeometry=onlyGeometry)
+    finally:
+        if holdNotifications:
+            font.releaseHeldNotifications()
+    return font
+
+
+def writeGlyph(glyphSet, glyph, glyphName=None, formatVersion=None):
+    """
+    Write glyph, a MathGlyph, to glyphSet, a fontTools.ufoLib
+    GlyphSet. glyphName defaults to the name of the glyph.
+    Redundant points are filtered like in MathGlyph.extractGlyph.
+    The contents.plist of the glyph set is not written, call
+    glyphSet.writeContents() after writing the glyphs.
+    """
+    if glyphName is None:
+        glyphName = glyph.name
+    glifGlyph = _GlifGlyph(glyph)
+    glyphSet.writeGlyph(
+        glyphName,
+        glyphObject=glifGlyph,
+        drawPointsFunc=glifGlyph.drawPoints,
+        formatVersion=formatVersion
+    )
+
+
+def writeGlyphs(glyphSet, glyphs, glyphNames=None, formatVersion=None):
+    """
+    Write the MathGlyph objects in glyphs, a dict of glyph names to
+    MathGlyph objects, to glyphSet and then write its contents.plist.
+    """
+    if glyphNames is None:
+        glyphNames = sorted(glyphs.keys())
+    for glyphName in glyphNames:
+        writeGlyph(glyphSet, glyphs[glyphName], glyphName=glyphName, formatVersion=formatVersion)
+    glyphSet.writeContents()
+
+
+class UFOInstanceWriter(object):
+
+    """
+    Writes an instance UFO at path from MathGlyph, MathKerning and
+    MathInfo objects.
+
+    Glyphs are serialized and written to their .glif files as soon
+    as they are passed to writeGlyph. If executor (ie a
+    concurrent.futures ThreadPoolExecutor or ProcessPoolExecutor)
+    is given, the glyphs are written through its submit method and
+    at most maxPending glyphs are waiting to be written at any time:
+    writeGlyph blocks until the oldest one is done when the window
+    is full. Errors raised while writing a glyph are raised again
+    by writeGlyph or close.
+
+    close must be called to finish the UFO. The writer can be used
+    as a context manager, which calls close on exit.
+
+    Only UFOs stored as directories are supported.
+    """
+
+    def __init__(self, path, formatVersion=3, executor=None, maxPending=256):
+        self._writer = UFOWriter(path, formatVersion=formatVersion)
+        self._glyphSet = self._writer.getGlyphSet()
+        self._glyphsPath = os.path.join(path, DEFAULT_GLYPHS_DIRNAME)
+        self._glifFormatVersion = 1 if formatVersion < 3 else 2
+        self._existingFileNames = set(fileName.lower() for fileName in self._glyphSet.contents.values())
+        self._executor = executor
+        self._maxPending = max(1, maxPending)
+        self._pending = deque()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.close()
+
+    def writeGlyph(self, glyph, glyphName=None):
+        """
+        Write glyph, a MathGlyph. glyphName defaults to the name
+        of the glyph.
+        """
+        if glyphName is None:
+            glyphName = glyph.name
+        glyphSet = self._glyphSet
+        fileName = glyphSet.contents.get(glyphName)
+        if fileName is None:
+            fileName = glyphSet.glyphNameToFileName(glyphName, self._existingFileNames)
+            self._existingFileNames.add(fileName.lower())
+            glyphSet.contents[glyphName] = fileName
+        path = os.path.join(self._glyphsPath, fileName)
+        if self._executor is None:
+            _writeGlifFile(path, glyphName, glyph, self._glifFormatVersion)
+            return
+        while len(self._pending) >= self._maxPending:
+            self._pending.popleft().result()
+        self._pending.append(
+            self._executor.submit(_writeGlifFile, path, glyphName, glyph, self._glifFormatVersion)
+        )
+
+    def writeGlyphs(self, glyphs):
+        """
+        Write the glyphs in glyphs, an iterable of (glyphName, MathGlyph)
+        pairs like dict.items() or a generator yielding instances.
+        """
+        for glyphName, glyph in glyphs:
+            self.writeGlyph(glyph, glyphName=glyphName)
+
+    def glyphNames(self):
+        """
+        Return the names of the glyphs in the UFO, including the
+        glyphs written so far.
+        """
+        return list(self._glyphSet.contents.keys())
+
+    def deleteGlyph(self, glyphName):
+        """
+        Remove glyphName from an existing UFO.
+        """
+        fileName = self._glyphSet.contents.get(glyphName)
+        if fileName is not None:
+            self._glyphSet.deleteGlyph(glyphName)
+            self._existingFileNames.discard(fileName.lower())
+
+    def writeKerning(self, kerning):
+        """
+        Write the kerning and groups of kerning, a MathKerning.
+        """
+        self._writer.writeGroups(kerning.groups())
+        self._writer.writeKerning(dict(kerning.items()))
+
+    def writeInfo(self, info, infoObject=None):
+        """
+        Write info, a MathInfo. The values of info are extracted
+        into infoObject, which can hold the non-math font info
+        attributes (like the family name) to write with them.
+        """
+        if infoObject is None:
+            infoObject = _InfoObject()
+        info.extractInfo(infoObject)
+        self._writer.writeInfo(infoObject)
+
+    def close(self):
+        """
+        Wait for the pending glyphs and write the glyph set and
+        layer contents.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            for future in self._pending:
+                future.cancel()
+        self._glyphSet.writeContents()
+        self._writer.writeLayerContents()
+        self._writer.close()
+
+
+def _writeGlifFile(path, glyphName, glyph, formatVersion):
+    glifGlyph = _GlifGlyph(glyph)
+    text = writeGlyphToString(
+        glyphName,
+        glyphObject=glifGlyph,
+        drawPointsFunc=glifGlyph.drawPoints,
+        formatVersion=formatVersion
+    )
+    with open(path, "wb") as f:
+        f.write(text.encode("utf-8"))
+
+
+class _InfoObject(object):
+
+    """
+    A plain font info object for reading and writing fontinfo.plist.
+    """
+
+    guidelines = None
+
+
+class _GlifGlyph(object):
+
+    """
+    Presents the data of a MathGlyph in the structure
+    expected by the glif writer.
+    """
+
+    def __init__(self, glyph):
+        self.width = glyph.width
+        self.height = glyph.height
+        self.unicodes = list(glyph.unicodes or [])
+        self.anchors = [dict(anchor) for anchor in glyph.anchors]
+        if glyph.onlyGeometry:
+            self.note = None
+            self.lib = {}
+            self.guidelines = []
+            self.image = None
+        else:
+            self.note = glyph.note
+            self.lib = glyph.lib
+            self.guidelines = [_compressGuideline(guideline) for guideline in glyph.guidelines]
+            self.image = _compressImage(glyph.image)
+        self._glyph = glyph
+
+    def drawPoints(self, pointPen):
+        self._glyph.drawPoints(FilterRedundantPointPen(pointPen))
+
+
+if __name__ == "__main__":
+    import sys
+    import doctest
+    sys.exit(doctest.testmod().failed)
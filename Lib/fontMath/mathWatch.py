@@ -0,0 +1,296 @@
+from __future__ import print_function, division, absolute_import
+import os
+import sys
+import time
+import argparse
+from fontTools.ufoLib import UFOReader, DEFAULT_GLYPHS_DIRNAME
+from fontTools.ufoLib.glifLib import GlyphSet
+from fontMath.mathDesignspace import readDesignspace
+from fontMath.mathFont import _ReaderGlyph
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathIncremental import IncrementalInstancer
+from fontMath.mathInfo import MathInfo
+from fontMath.mathKerning import MathKerning
+from fontMath.mathModel import MathVariationModel
+from fontMath.mathUFO import UFOInstanceWriter, _InfoObject
+
+"""
+Continuous instance generation.
+
+The watch command polls the master UFOs of a designspace and
+regenerates the instance UFOs whenever a master changes on disk.
+UFOMaster keeps the math objects of a master and on refresh only
+reads the .glif and .plist files whose modification time or size
+changed. The instances are kept up to date by an
+IncrementalInstancer and only the changed glyphs, kerning and info
+are written to the instance UFOs. On startup the instance UFOs are
+brought in line with the masters, glyphs that the masters don't
+have are removed from them.
+
+Saving a UFO touches many files, so changes are debounced: the
+instances are only regenerated after the masters have not changed
+for a moment.
+
+    fontmath-watch MyFamily.designspace
+"""
+
+__all__ = [
+    "UFOMaster",
+    "InstanceWatcher",
+    "main"
+]
+
+
+class UFOMaster(object):
+
+    """
+    The glyphs, kerning and info of the UFO at path as math
+    objects, read from disk on refresh.
+
+    Only the default layer is read. The glyphs are accessed like
+    a dict. The kerning and info attributes hold the MathKerning
+    and MathInfo of the UFO.
+    """
+
+    def __init__(self, path, onlyGeometry=False):
+        self.path = path
+        self.onlyGeometry = onlyGeometry
+        self.glyphs = {}
+        self.info = None
+        self.kerning = None
+        self._stats = {}
+        self.refresh()
+
+    def keys(self):
+        return self.glyphs.keys()
+
+    def __iter__(self):
+        return iter(self.glyphs)
+
+    def __len__(self):
+        return len(self.glyphs)
+
+    def __contains__(self, glyphName):
+        return glyphName in self.glyphs
+
+    def __getitem__(self, glyphName):
+        return self.glyphs[glyphName]
+
+    def get(self, glyphName, default=None):
+        return self.glyphs.get(glyphName, default)
+
+    def snapshot(self):
+        """
+        Return a dict of the relative paths of the files of the UFO
+        that are read to their modification time and size.
+        """
+        stats = {}
+        for fileName in ("fontinfo.plist", "kerning.plist", "groups.plist"):
+            _addStat(stats, self.path, fileName)
+        glyphsDir = os.path.join(self.path, DEFAULT_GLYPHS_DIRNAME)
+        if os.path.isdir(glyphsDir):
+            for fileName in os.listdir(glyphsDir):
+                _addStat(stats, self.path, os.path.join(DEFAULT_GLYPHS_DIRNAME, fileName))
+        return stats
+
+    def refresh(self):
+        """
+        Read the files that changed since the last refresh and
+        return the set of names of the glyphs that were changed,
+        added or removed. Glyphs that are unchanged keep their
+        MathGlyph objects.
+        """
+        stats = self.snapshot()
+        changedFiles = set(
+            fileName for fileName in set(stats) | set(self._stats)
+            if stats.get(fileName) != self._stats.get(fileName)
+        )
+        self._stats = stats
+        if not changedFiles:
+            return set()
+        reader = UFOReader(self.path, validate=False)
+        if "fontinfo.plist" in changedFiles or self.info is None:
+            infoObject = _InfoObject()
+            reader.readInfo(infoObject)
+            self.info = MathInfo(infoObject)
+        if changedFiles & set(["kerning.plist", "groups.plist"]) or self.kerning is None:
+            self.kerning = MathKerning(reader.readKerning(), reader.readGroups())
+        glyphsDir = os.path.join(self.path, DEFAULT_GLYPHS_DIRNAME)
+        changedGlyphFiles = set(
+            os.path.basename(fileName) for fileName in changedFiles
+            if os.path.dirname(fileName) == DEFAULT_GLYPHS_DIRNAME
+        )
+        if not changedGlyphFiles:
+            return set()
+        glyphSet = GlyphSet(glyphsDir, validateRead=False)
+        changed = set(glyphName for glyphName in self.glyphs if glyphName not in glyphSet.contents)
+        for glyphName in changed:
+            del self.glyphs[glyphName]
+        for glyphName, fileName in glyphSet.contents.items():
+            if glyphName in self.glyphs and fileName not in changedGlyphFiles:
+                continue
+            glyph = _ReaderGlyph(glyphName)
+            glyphSet.readGlyph(glyphName, glyph, glyph.recording)
+            self.glyphs[glyphName] = MathGlyph(glyph, onlyGeometry=self.onlyGeometry)
+            changed.add(glyphName)
+        return changed
+
+
+def _addStat(stats, root, fileName):
+    try:
+        stat = os.stat(os.path.join(root, fileName))
+    except OSError:
+        return
+    stats[fileName] = (stat.st_mtime, stat.st_size)
+
+
+class InstanceWatcher(object):
+
+    """
+    Regenerates the instances of the designspace at path when its
+    masters change.
+
+    Each call of poll checks the masters for changes. Changes are
+    applied once the masters have not changed for debounce seconds.
+    If roundGeometry is True, the data written to the instances is
+    rounded to integers, like fontmath-instance does.
+    """
+
+    def __init__(self, path, debounce=0.5, onlyGeometry=False, decompose=False, roundGeometry=True,
+                 log=None):
+        sources, instances = readDesignspace(path)
+        for instance in instances:
+            if instance["path"] is None:
+                raise ValueError("The instance %s has no file name." % instance["name"])
+        self.masters = [UFOMaster(source["path"], onlyGeometry=onlyGeometry) for source in sources]
+        self.instances = instances
+        self.debounce = debounce
+        self.roundGeometry = roundGeometry
+        self.log = log
+        self.instancer = IncrementalInstancer(
+            MathVariationModel([source["location"] for source in sources]),
+            dict((instance["name"], instance["location"]) for instance in instances),
+            onlyGeometry=onlyGeometry,
+            decompose=decompose
+        )
+        self._snapshots = [master.snapshot() for master in self.masters]
+        self._changedTime = None
+        self._write(self.instancer.update(self.masters), removeStale=True)
+
+    def poll(self, now=None):
+        """
+        Check the masters for changes and regenerate the instances
+        if the last change is older than debounce seconds. Return
+        the changes reported by IncrementalInstancer.update, or None
+        if nothing was regenerated.
+        """
+        if now is None:
+            now = time.time()
+        snapshots = [master.snapshot() for master in self.masters]
+        if snapshots != self._snapshots:
+            self._snapshots = snapshots
+            self._changedTime = now
+            return None
+        if self._changedTime is None or now - self._changedTime < self.debounce:
+            return None
+        self._changedTime = None
+        glyphNames = set()
+        for master in self.masters:
+            glyphNames.update(master.refresh())
+        changes = self.instancer.update(self.masters, glyphNames=glyphNames)
+        self._write(changes)
+        return changes
+
+    def run(self, interval=0.5):
+        """
+        Poll every interval seconds until interrupted.
+        """
+        try:
+            while True:
+                time.sleep(interval)
+                self.poll()
+        except KeyboardInterrupt:
+            pass
+
+    def _write(self, changes, removeStale=False):
+        """
+        Write changes to the instance UFOs. If removeStale is True,
+        the glyphs of the UFOs that are not instanced are removed.
+        """
+        glyphNames = changes["glyphs"]
+        if self.instancer.decompose:
+            glyphNames = glyphNames + changes["dependentGlyphs"]
+        if not (glyphNames or changes["removedGlyphs"] or changes["kerning"] or changes["info"] or removeStale):
+            return
+        start = time.time()
+        removedCount = 0
+        for instance in self.instances:
+            name = instance["name"]
+            directory = os.path.dirname(instance["path"])
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            with UFOInstanceWriter(instance["path"]) as writer:
+                glyphs = self.instancer.glyphs[name]
+                removedGlyphs = list(changes["removedGlyphs"])
+                if removeStale:
+                    removedGlyphs.extend(
+                        glyphName for glyphName in writer.glyphNames() if glyphName not in glyphs)
+                removedCount = max(removedCount, len(removedGlyphs))
+                for glyphName in glyphNames:
+                    glyph = glyphs[glyphName]
+                    if self.roundGeometry:
+                        glyph = glyph.round()
+                    writer.writeGlyph(glyph, glyphName=glyphName)
+                for glyphName in removedGlyphs:
+                    writer.deleteGlyph(glyphName)
+                if changes["kerning"]:
+                    kerning = self.instancer.kerning[name]
+                    if self.roundGeometry:
+                        # MathKerning rounds in place
+                        kerning = kerning.copy()
+                        kerning.round()
+                    writer.writeKerning(kerning)
+                if changes["info"]:
+                    info = self.instancer.info[name]
+                    if self.roundGeometry:
+                        info = info.round()
+                    infoObject = _InfoObject()
+                    infoObject.familyName = instance["familyName"]
+                    infoObject.styleName = instance["styleName"]
+                    writer.writeInfo(info, infoObject)
+        if self.log is not None:
+            self.log(
+                "%d glyphs, %d removed, %d kerning pairs, %d info attributes in %.3fs" % (
+                    len(glyphNames), removedCount, len(changes["kerning"]),
+                    len(changes["info"]), time.time() - start
+                )
+            )
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="fontmath-watch",
+        description="Regenerate the instances of a designspace when its masters change."
+    )
+    parser.add_argument("designspace", help="the .designspace file")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between polls")
+    parser.add_argument("--debounce", type=float, default=0.5,
+                        help="seconds to wait for more changes before regenerating")
+    parser.add_argument("--decompose", action="store_true", help="decompose the components")
+    parser.add_argument("--no-round", dest="roundGeometry", action="store_false",
+                        help="don't round the instance data to integers")
+    options = parser.parse_args(args)
+
+    def log(message):
+        print(message)
+        sys.stdout.flush()
+
+    watcher = InstanceWatcher(options.designspace, debounce=options.debounce,
+                              decompose=options.decompose, roundGeometry=options.roundGeometry, log=log)
+    log("watching %d masters" % len(watcher.masters))
+    watcher.run(interval=options.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathUFO import UFOInstanceWriter
+
+"""
+Test fixtures shared by the instancing tests.
+"""
+
+
+def _makeGlyph(width, components=()):
+    """
+    A triangle glyph of width with a component of each glyph
+    in components.
+    """
+    glyph = MathGlyph(None)
+    glyph.unicodes = []
+    glyph.width = width
+    glyph.height = 0
+    pen = glyph.getPointPen()
+    pen.beginPath()
+    for point in ((0, 0), (width, 0), (width, 100)):
+        pen.addPoint(point, "line")
+    pen.endPath()
+    glyph.components = [
+        dict(baseGlyph=baseGlyph, transformation=(1, 0, 0, 1, 0, 0), identifier=None)
+        for baseGlyph in components
+    ]
+    return glyph
+
+
+class _TestMaster(dict):
+
+    """Mockup master: a dict of glyphs with info and kerning attributes"""
+
+    def __init__(self, glyphs, info=None, kerning=None):
+        super(_TestMaster, self).__init__(glyphs)
+        self.info = info
+        self.kerning = kerning
+
+
+def _writeMaster(path, glyphs, kerning=None, info=None):
+    with UFOInstanceWriter(path) as writer:
+        for glyphName, glyph in sorted(glyphs.items()):
+            writer.writeGlyph(glyph, glyphName=glyphName)
+        if kerning is not None:
+            writer.writeKerning(kerning)
+        if info is not None:
+            writer.writeInfo(info)
+
+
+class _TestFuture(object):
+
+    def __init__(self, function, args):
+        self._function = function
+        self._args = args
+        self._result = None
+        self.done = False
+
+    def result(self):
+        if not self.done:
+            self.done = True
+            self._result = self._function(*self._args)
+        return self._result
+
+    def cancel(self):
+        pass
+
+
+class _TestExecutor(object):
+
+    """Mockup executor that runs the work when the result is asked for"""
+
+    def __init__(self):
+        self.futures = []
+        self.maxPending = 0
+
+    def submit(self, function, *args):
+        future = _TestFuture(function, args)
+        self.futures.append(future)
+        pending = len([f for f in self.futures if not f.done])
+        self.maxPending = max(self.maxPending, pending)
+        return future
@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from fontMath.mathKerning import MathKerning
+from fontMath.mathModel import MathVariationModel
+from fontMath.mathAsync import AsyncInstancer
+from fontMath.test.fixtures import _makeGlyph
+
+
+_locations = [{}, {"wght": 1}]
+
+
+def _makeMasters():
+    return [
+        dict(a=_makeGlyph(100), b=_makeGlyph(200)),
+        dict(a=_makeGlyph(300), b=_makeGlyph(600))
+    ]
+
+
+class _BlockingInstancer(AsyncInstancer):
+
+    """
+    Counts the glyph computations and blocks them until
+    release is set.
+    """
+
+    def __init__(self, *args, **kwargs):
+        AsyncInstancer.__init__(self, *args, **kwargs)
+        self.computed = []
+        self.release = threading.Event()
+
+    def _instanceGlyph(self, glyphName, location):
+        self.release.wait(5)
+        self.computed.append(glyphName)
+        return AsyncInstancer._instanceGlyph(self, glyphName, location)
+
+
+class AsyncInstancerTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_glyph(self):
+        instancer = AsyncInstancer(MathVariationModel(_locations), _makeMasters(), executor=self.executor)
+        glyph = asyncio.run(instancer.glyph("b", {"wght": 0.5}))
+        self.assertEqual(glyph.width, 400)
+        glyphs = asyncio.run(instancer.glyphs(["a", "b"], {"wght": 0.25}))
+        self.assertEqual(sorted(glyphs), ["a", "b"])
+        self.assertEqual(glyphs["a"].width, 150)
+        self.assertEqual(glyphs["b"].width, 300)
+
+    def test_glyph_cached(self):
+        instancer = AsyncInstancer(MathVariationModel(_locations), _makeMasters(), executor=self.executor)
+        glyph1 = asyncio.run(instancer.glyph("a", {"wght": 0.5}))
+        glyph2 = asyncio.run(instancer.glyph("a", {"wght": 0.5, "wdth": 0}))
+        self.assertIs(glyph1, glyph2)
+
+    def test_glyph_coalesced(self):
+        instancer = _BlockingInstancer(MathVariationModel(_locations), _makeMasters(), executor=self.executor)
+
+        async def run():
+            tasks = [
+                asyncio.ensure_future(instancer.glyph("a", {"wght": 0.5}))
+                for i in range(5)
+            ]
+            await asyncio.sleep(0)
+            instancer.release.set()
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(run())
+        self.assertEqual(instancer.computed, ["a"])
+        self.assertEqual(len(set(id(result) for result in results)), 1)
+        self.assertEqual(instancer._pending, {})
+
+    def test_glyph_cancelled(self):
+        instancer = _BlockingInstancer(MathVariationModel(_locations), _makeMasters(), executor=self.executor)
+
+        async def run():
+            task1 = asyncio.ensure_future(instancer.glyph("a", {"wght": 0.5}))
+            task2 = asyncio.ensure_future(instancer.glyph("a", {"wght": 0.5}))
+            await asyncio.sleep(0)
+            task1.cancel()
+            await asyncio.sleep(0)
+            instancer.release.set()
+            with self.assertRaises(asyncio.CancelledError):
+                await task1
+            return await task2
+
+        glyph = asyncio.run(run())
+        self.assertEqual(glyph.width, 200)
+        self.assertEqual(instancer.computed, ["a"])
+
+    def test_glyph_cancelled_before_start(self):
+        instancer = _BlockingInstancer(MathVariationModel(_locations), _makeMasters(), executor=self.executor)
+
+        async def run():
+            # occupy both workers so that the next request has to wait
+            busy = [
+                asyncio.ensure_future(instancer.glyph(glyphName, {"wght": 0.5}))
+                for glyphName in ("a", "b")
+            ]
+            await asyncio.sleep(0)
+            task = asyncio.ensure_future(instancer.glyph("a", {"wght": 1}))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            instancer.release.set()
+            await asyncio.gather(*busy)
+
+        asyncio.run(run())
+        self.assertEqual(sorted(instancer.computed), ["a", "b"])
+        self.assertEqual(instancer._pending, {})
+
+    def test_glyphInstances(self):
+        instancer = AsyncInstancer(MathVariationModel(_locations), _makeMasters(), executor=self.executor)
+        cached = asyncio.run(instancer.glyph("a", {"wght": 1}))
+        glyphs = asyncio.run(instancer.glyphInstances("a", [{}, {"wght": 1}, {"wght": 0.5}]))
+        self.assertEqual([glyph.width for glyph in glyphs], [100, 300, 200])
+        self.assertIs(glyphs[1], cached)
+        self.assertIs(asyncio.run(instancer.glyph("a", {"wght": 0.5})), glyphs[2])
+
+    def test_kerning(self):
+        kerning = [
+            MathKerning({("a", "a"): -10}),
+            MathKerning({("a", "a"): -30})
+        ]
+        instancer = AsyncInstancer(MathVariationModel(_locations), _makeMasters(), kerning=kerning,
+                                   executor=self.executor)
+        result = asyncio.run(instancer.kerning({"wght": 0.5}))
+        self.assertEqual(result[("a", "a")], -20)
+
+    def test_kerning_missing(self):
+        instancer = AsyncInstancer(MathVariationModel(_locations), _makeMasters())
+        with self.assertRaises(ValueError):
+            asyncio.run(instancer.kerning({}))
+        with self.assertRaises(ValueError):
+            asyncio.run(instancer.info({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
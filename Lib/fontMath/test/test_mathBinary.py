@@ -0,0 +1,242 @@
+import unittest
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.cu2quPen import Cu2QuPen
+from fontTools.pens.t2CharStringPen import T2CharStringPen
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontMath.mathBinary import (
+    glyphFromGlyf, glyphsFromTTFont, glyphToGlyf, glyphsToGlyf, glyphToCharString)
+from fontMath.mathGlyph import MathGlyph
+
+
+def _makeTTFont():
+    glyphOrder = [".notdef", "a", "o", "dot", "adot", "scaled"]
+    glyphs = {}
+    pen = TTGlyphPen(None)
+    glyphs[".notdef"] = pen.glyph()
+    # lines and a quadratic curve with an implied on curve
+    pen = TTGlyphPen(None)
+    pen.moveTo((0, 0))
+    pen.lineTo((100, 0))
+    pen.qCurveTo((150, 50), (150, 150), (100, 200))
+    pen.lineTo((0, 200))
+    pen.closePath()
+    glyphs["a"] = pen.glyph()
+    # all off curve contour
+    pen = TTGlyphPen(None)
+    pen.qCurveTo((0, 100), (100, 100), (100, 0), (0, 0), None)
+    pen.closePath()
+    glyphs["o"] = pen.glyph()
+    # single point contour
+    pen = TTGlyphPen(None)
+    pen.moveTo((50, 50))
+    pen.closePath()
+    glyphs["dot"] = pen.glyph()
+    pen = TTGlyphPen(glyphs)
+    pen.addComponent("a", (1, 0, 0, 1, 0, 0))
+    pen.addComponent("dot", (1, 0, 0, 1, 25, 300))
+    glyphs["adot"] = pen.glyph()
+    pen = TTGlyphPen(glyphs)
+    pen.addComponent("o", (0.5, 0, 0, 0.5, 10, 0))
+    glyphs["scaled"] = pen.glyph()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(glyphOrder)
+    builder.setupCharacterMap({ord("a"): "a", ord("A"): "a", ord("o"): "o"})
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics(dict(
+        (glyphName, (100 + index, 0)) for index, glyphName in enumerate(glyphOrder)
+    ))
+    builder.setupHorizontalHeader()
+    return builder.font
+
+
+class _DrawPointsGlyph(object):
+
+    """
+    Wraps a glyf glyph in the glyph interface MathGlyph reads.
+    """
+
+    def __init__(self, font, glyphName):
+        self._glyfGlyph = font["glyf"][glyphName]
+        self._glyfTable = font["glyf"]
+        self.name = glyphName
+        self.unicodes = []
+        self.width = 0
+        self.height = 0
+        self.anchors = []
+        self.guidelines = []
+        self.image = None
+        self.lib = {}
+        self.note = None
+
+    def drawPoints(self, pointPen):
+        self._glyfGlyph.drawPoints(pointPen, self._glyfTable)
+
+
+class MathBinaryTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_glyphFromGlyf_matches_drawPoints(self):
+        font = _makeTTFont()
+        glyfTable = font["glyf"]
+        for glyphName in font.getGlyphOrder():
+            expected = MathGlyph(_DrawPointsGlyph(font, glyphName))
+            glyph = glyphFromGlyf(glyfTable[glyphName], glyfTable, name=glyphName)
+            self.assertEqual(glyph.contours, expected.contours, glyphName)
+            self.assertEqual(glyph.components, expected.components, glyphName)
+            self.assertEqual(glyph.name, glyphName)
+
+    def test_glyphFromGlyf_coordinate_types(self):
+        font = _makeTTFont()
+        glyph = glyphFromGlyf(font["glyf"]["a"], font["glyf"])
+        for point in glyph.contours[0]["points"]:
+            for value in point[1]:
+                self.assertIsInstance(value, int)
+
+    def test_glyphsFromTTFont(self):
+        font = _makeTTFont()
+        glyphs = glyphsFromTTFont(font)
+        self.assertEqual(sorted(glyphs), sorted(font.getGlyphOrder()))
+        self.assertEqual(glyphs["a"].width, 101)
+        self.assertEqual(glyphs["a"].height, 0)
+        self.assertEqual(glyphs["a"].unicodes, [ord("A"), ord("a")])
+        self.assertEqual(glyphs["dot"].unicodes, [])
+        glyphs = glyphsFromTTFont(font, ["o"])
+        self.assertEqual(list(glyphs), ["o"])
+        self.assertEqual(glyphs["o"].unicodes, [ord("o")])
+
+
+def _makeMathGlyph(offset=0):
+    glyph = MathGlyph(None)
+    glyph.name = "test"
+    glyph.width = 500
+    glyph.unicodes = []
+    pen = glyph.getPointPen()
+    # lines and a cubic curve
+    pen.beginPath()
+    pen.addPoint((0, 0), "line")
+    pen.addPoint((100, 0), "line")
+    pen.addPoint((150 + offset, 50))
+    pen.addPoint((150 - offset, 150))
+    pen.addPoint((100, 200), "curve")
+    pen.addPoint((0, 200), "line")
+    pen.endPath()
+    # quadratic curves and a closing cubic curve
+    pen.beginPath()
+    pen.addPoint((300, 0), "qcurve")
+    pen.addPoint((350, -60))
+    pen.addPoint((400, -60))
+    pen.addPoint((450, 0), "qcurve")
+    pen.addPoint((400, 100))
+    pen.addPoint((310, 90), "curve")
+    pen.addPoint((320, 50 + offset))
+    pen.addPoint((300, 10))
+    pen.endPath()
+    return glyph
+
+
+class _Private(object):
+
+    defaultWidthX = 500
+    nominalWidthX = 400
+
+
+class MathBinaryExtractionTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def _penGlyf(self, glyph, reverseDirection=False):
+        pen = TTGlyphPen(None)
+        glyph.draw(Cu2QuPen(pen, 1.0, reverse_direction=reverseDirection), filterRedundantPoints=True)
+        return pen.glyph()
+
+    def assertGlyfEqual(self, ttGlyph, expected):
+        self.assertEqual(list(ttGlyph.coordinates), list(expected.coordinates))
+        self.assertEqual(list(ttGlyph.flags), list(expected.flags))
+        self.assertEqual(ttGlyph.endPtsOfContours, expected.endPtsOfContours)
+        self.assertEqual(ttGlyph.numberOfContours, expected.numberOfContours)
+
+    def test_glyphToGlyf_matches_pens(self):
+        glyph = _makeMathGlyph()
+        self.assertGlyfEqual(glyphToGlyf(glyph), self._penGlyf(glyph))
+        self.assertGlyfEqual(
+            glyphToGlyf(glyph, reverseDirection=True),
+            self._penGlyf(glyph, reverseDirection=True)
+        )
+
+    def test_glyphsToGlyf_compatible(self):
+        glyphs = [_makeMathGlyph(), _makeMathGlyph(300)]
+        ttGlyphs = glyphsToGlyf(glyphs)
+        self.assertEqual(len(ttGlyphs), 2)
+        self.assertEqual(list(ttGlyphs[0].flags), list(ttGlyphs[1].flags))
+        self.assertEqual(ttGlyphs[0].endPtsOfContours, ttGlyphs[1].endPtsOfContours)
+        # converted on their own, the curves need a different number of points
+        self.assertNotEqual(
+            len(glyphToGlyf(glyphs[0]).coordinates),
+            len(glyphToGlyf(glyphs[1]).coordinates)
+        )
+        incompatible = _makeMathGlyph()
+        incompatible.contours.pop()
+        self.assertRaises(ValueError, glyphsToGlyf, [glyphs[0], incompatible])
+
+    def test_glyphToGlyf_components(self):
+        glyph = MathGlyph(None)
+        glyph.components = [
+            dict(baseGlyph="a", transformation=(1, 0, 0, 1, 10.4, 20), identifier=None),
+            dict(baseGlyph="b", transformation=(0.5, 0, 0, 0.5, 0, 0), identifier=None)
+        ]
+        ttGlyph = glyphToGlyf(glyph)
+        self.assertEqual(ttGlyph.numberOfContours, -1)
+        self.assertEqual(
+            [component.getComponentInfo() for component in ttGlyph.components],
+            [("a", (1, 0, 0, 1, 10, 20)), ("b", (0.5, 0, 0, 0.5, 0, 0))]
+        )
+
+    def test_glyphToGlyf_decompose(self):
+        base = _makeMathGlyph()
+        glyph = _makeMathGlyph()
+        glyph.components = [
+            dict(baseGlyph="base", transformation=(1, 0, 0, 1, 0, 500), identifier=None)
+        ]
+        self.assertRaises(ValueError, glyphToGlyf, glyph)
+        ttGlyph = glyphToGlyf(glyph, glyphSet=dict(base=base))
+        self.assertEqual(ttGlyph.numberOfContours, 4)
+        # component scales that don't fit in the glyf table
+        glyph = MathGlyph(None)
+        glyph.components = [
+            dict(baseGlyph="base", transformation=(2, 0, 0, 2, 0, 0), identifier=None)
+        ]
+        self.assertRaises(ValueError, glyphToGlyf, glyph)
+        self.assertEqual(glyphToGlyf(glyph, glyphSet=dict(base=base)).numberOfContours, 2)
+
+    def test_glyphToCharString_matches_pen(self):
+        glyph = _makeMathGlyph()
+        for private, width in ((None, 500), (_Private(), None)):
+            pen = T2CharStringPen(width, None)
+            glyph.draw(pen, filterRedundantPoints=True)
+            expected = pen.getCharString()
+            expected.compile()
+            charString = glyphToCharString(glyph, private=private)
+            charString.compile()
+            self.assertEqual(charString.bytecode, expected.bytecode)
+        glyph.width = 600
+        charString = glyphToCharString(glyph, private=_Private())
+        self.assertEqual(charString.program[0], 200)
+
+    def test_glyphToCharString_components(self):
+        glyph = MathGlyph(None)
+        glyph.width = 500
+        glyph.components = [
+            dict(baseGlyph="base", transformation=(1, 0, 0, 1, 0, 0), identifier=None)
+        ]
+        self.assertRaises(ValueError, glyphToCharString, glyph)
+        base = _makeMathGlyph()
+        charString = glyphToCharString(glyph, glyphSet=dict(base=base))
+        charString.compile()
+        expected = glyphToCharString(base)
+        expected.compile()
+        self.assertEqual(charString.bytecode, expected.bytecode)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from fontMath.mathCache import (
+    MathCache, MathInstanceCache, _objectSize, _weightedSum, _normalizeWeight)
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathKerning import MathKerning
+
+
+def _makeGlyph(offset):
+    glyph = MathGlyph(None)
+    glyph.unicodes = []
+    glyph.width = 100 + offset
+    glyph.height = 0
+    glyph.contours = [
+        dict(identifier=None, points=[
+            ("curve", (offset, offset), False, None, None),
+            (None, (offset, offset), False, None, None),
+            (None, (100 + offset, 100), False, None, None),
+            ("curve", (100 + offset, 100), False, None, None)
+        ])
+    ]
+    return glyph
+
+
+class MathCacheTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_get_set(self):
+        cache = MathCache(maxSize=10, sizeFunction=len)
+        cache.set("a", "xxx")
+        self.assertEqual(cache.get("a"), "xxx")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.size, 3)
+
+    def test_eviction_by_size(self):
+        cache = MathCache(maxSize=10, sizeFunction=len)
+        cache.set("a", "xxxx")
+        cache.set("b", "xxxx")
+        # touch "a" so that "b" is the least recently used
+        cache.get("a")
+        cache.set("c", "xxxx")
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.size, 8)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_too_large(self):
+        cache = MathCache(maxSize=2, sizeFunction=len)
+        cache.set("a", "xxx")
+        self.assertEqual(len(cache), 0)
+
+    def test_replace(self):
+        cache = MathCache(maxSize=10, sizeFunction=len)
+        cache.set("a", "xxx")
+        cache.set("a", "x")
+        self.assertEqual(cache.size, 1)
+        cache.remove("a")
+        self.assertEqual(cache.size, 0)
+
+
+class MathInstanceCacheTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_instance_glyph(self):
+        cache = MathInstanceCache()
+        masters = [_makeGlyph(0), _makeGlyph(10)]
+        result = cache.instance(masters, [0.5, 0.5])
+        self.assertEqual(result.width, 105)
+        self.assertEqual(result.contours[0]["points"][0][1], (5, 5))
+        self.assertIs(cache.instance(masters, [0.5, 0.5]), result)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_instance_key_follows_content(self):
+        cache = MathInstanceCache()
+        masters = [_makeGlyph(0), _makeGlyph(10)]
+        cache.instance(masters, [0.5, 0.5])
+        # same content, new objects
+        cache.instance([_makeGlyph(0), _makeGlyph(10)], [0.5, 0.5])
+        self.assertEqual(cache.hits, 1)
+        # edited master
+        masters[1].width = 300
+        result = cache.instance(masters, [0.5, 0.5])
+        self.assertEqual(result.width, 200)
+        self.assertEqual(cache.misses, 2)
+
+    def test_instance_key_weights(self):
+        cache = MathInstanceCache()
+        masters = [MathKerning({("A", "V"): -10})]
+        self.assertEqual(
+            cache.instanceKey(masters, [0.1 + 0.2]),
+            cache.instanceKey(masters, [0.3])
+        )
+        self.assertRaises(ValueError, cache.instanceKey, masters, [1, 2])
+
+    def test_normalizeWeight(self):
+        self.assertEqual(str(_normalizeWeight(-0.0)), "0.0")
+        self.assertEqual(_normalizeWeight((1, 0.5)), (1.0, 0.5))
+
+    def test_weightedSum(self):
+        kerning = _weightedSum(
+            [MathKerning({("A", "V"): -10}), MathKerning({("A", "V"): -30})],
+            [0.75, 0.25]
+        )
+        self.assertEqual(kerning[("A", "V")], -15)
+
+    def test_objectSize(self):
+        self.assertEqual(_objectSize(_makeGlyph(0)), 5)
+        self.assertEqual(_objectSize(object()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+from multiprocessing.pool import ThreadPool
+from fontTools.pens.recordingPen import RecordingPen, DecomposingRecordingPen
+from fontMath.mathComponents import (
+    componentGraph, dependencyLevels, MathGlyphDecomposer)
+from fontMath.mathGlyph import MathGlyph
+
+
+def _makeGlyph(drawBar=False, components=()):
+    glyph = MathGlyph(None)
+    glyph.width = 100
+    glyph.unicodes = []
+    if drawBar:
+        pen = glyph.getPointPen()
+        pen.beginPath()
+        pen.addPoint((0, 0), "line")
+        pen.addPoint((20, 0), "line")
+        pen.addPoint((20, 10), "line")
+        pen.addPoint((0, 10), "line")
+        pen.endPath()
+    glyph.components = [
+        dict(baseGlyph=baseGlyph, transformation=transformation, identifier=None)
+        for baseGlyph, transformation in components
+    ]
+    return glyph
+
+
+def _makeGlyphSet():
+    return dict(
+        bar=_makeGlyph(True),
+        twoBars=_makeGlyph(components=[
+            ("bar", (1, 0, 0, 1, 0, 0)),
+            ("bar", (1, 0, 0, 1, 0, 100))
+        ]),
+        rotated=_makeGlyph(True, components=[("twoBars", (0, 1, -1, 0, 0, 0))]),
+        nested=_makeGlyph(components=[
+            ("rotated", (2, 0, 0, 2, 10, 10)),
+            ("missing", (1, 0, 0, 1, 0, 0))
+        ]),
+    )
+
+
+class _SkippingRecordingPen(DecomposingRecordingPen):
+    skipMissingComponents = True
+
+
+def _decomposedRecording(glyphSet, glyphName):
+    pen = _SkippingRecordingPen(glyphSet)
+    glyphSet[glyphName].draw(pen)
+    return pen.value
+
+
+class ComponentGraphTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_componentGraph(self):
+        graph = componentGraph(_makeGlyphSet())
+        self.assertEqual(graph, dict(
+            bar=[], twoBars=["bar"], rotated=["twoBars"], nested=["rotated"]
+        ))
+
+    def test_dependencyLevels(self):
+        glyphSet = _makeGlyphSet()
+        self.assertEqual(
+            dependencyLevels(glyphSet),
+            [["bar"], ["twoBars"], ["rotated"], ["nested"]]
+        )
+        self.assertEqual(dependencyLevels(glyphSet, ["twoBars"]), [["bar"], ["twoBars"]])
+
+    def test_dependencyLevels_circular(self):
+        glyphSet = dict(
+            a=_makeGlyph(components=[("b", (1, 0, 0, 1, 0, 0))]),
+            b=_makeGlyph(components=[("a", (1, 0, 0, 1, 0, 0))]),
+        )
+        self.assertRaises(ValueError, dependencyLevels, glyphSet)
+        self.assertRaises(ValueError, MathGlyphDecomposer(glyphSet).decomposedContours, "a")
+
+
+class MathGlyphDecomposerTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_decompose_matches_fontTools(self):
+        glyphSet = _makeGlyphSet()
+        decomposer = MathGlyphDecomposer(glyphSet)
+        for glyphName in glyphSet:
+            glyph = decomposer.decompose(glyphName)
+            self.assertEqual(glyph.components, [])
+            pen = RecordingPen()
+            glyph.draw(pen)
+            self.assertEqual(pen.value, _decomposedRecording(glyphSet, glyphName), glyphName)
+
+    def test_decompose_returns_new_data(self):
+        glyphSet = _makeGlyphSet()
+        decomposer = MathGlyphDecomposer(glyphSet)
+        glyph = decomposer.decompose("twoBars")
+        pointCount = len(glyph.contours[0]["points"])
+        glyph.contours[0]["points"].append(("line", (0, 0), False, None, None))
+        self.assertEqual(len(decomposer.decompose("twoBars").contours[0]["points"]), pointCount)
+        self.assertEqual(len(glyphSet["bar"].contours[0]["points"]), pointCount)
+
+    def test_transformed_contours_are_shared(self):
+        glyphSet = _makeGlyphSet()
+        glyphSet["other"] = _makeGlyph(components=[("bar", (1, 0, 0, 1, 0, 100))])
+        decomposer = MathGlyphDecomposer(glyphSet)
+        contours1 = decomposer.decomposedContours("twoBars")
+        contours2 = decomposer.decomposedContours("other")
+        self.assertIs(contours1[1], contours2[0])
+
+    def test_decomposeAll(self):
+        glyphSet = _makeGlyphSet()
+        expected = MathGlyphDecomposer(glyphSet).decomposeAll()
+        self.assertEqual(sorted(expected), sorted(glyphSet))
+        pool = ThreadPool(2)
+        try:
+            result = MathGlyphDecomposer(glyphSet).decomposeAll(["nested"], executor=pool)
+        finally:
+            pool.close()
+        self.assertEqual(list(result), ["nested"])
+        self.assertEqual(result["nested"].contours, expected["nested"].contours)
+
+
+if __name__ == "__main__":
+    unittest.main()
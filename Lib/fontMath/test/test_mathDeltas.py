@@ -0,0 +1,212 @@
+import unittest
+from fontMath.mathDeltas import (
+    MathGlyphDeltas, MathKerningDeltas, MathInfoDeltas, batchInstances,
+    _deltasForMasters)
+from fontMath.mathGlyph import _anchorPairs
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathInfo import MathInfo
+from fontMath.mathKerning import MathKerning
+from fontMath.test.test_mathInfo import _TestInfoObject
+
+
+def _makeGlyph(offset, extraAnchor=False):
+    glyph = MathGlyph(None)
+    glyph.unicodes = [65]
+    glyph.name = "A"
+    glyph.width = 100 + offset
+    glyph.height = 0
+    glyph.contours = [
+        dict(identifier="contour 1", points=[
+            ("curve", (offset, 0), False, "name 1", None),
+            (None, (offset, 0), False, None, None),
+            (None, (100 + offset, 100), False, None, None),
+            ("curve", (100 + offset, 100), True, None, None)
+        ])
+    ]
+    glyph.components = [
+        dict(baseGlyph="acute", transformation=(1, 0, 0, 1, offset, 500), identifier=None)
+    ]
+    glyph.anchors = [dict(name="top", x=50 + offset, y=700, identifier=None, color=None)]
+    if extraAnchor:
+        glyph.anchors.append(dict(name="bottom", x=50, y=0, identifier=None, color=None))
+    return glyph
+
+
+class _UnreadableDeltas(object):
+
+    def __iter__(self):
+        raise AssertionError("A delta with a zero scalar was read.")
+
+
+class MathGlyphDeltasTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_instance_matches_operators(self):
+        light = _makeGlyph(0)
+        bold = _makeGlyph(40)
+        deltas = MathGlyphDeltas(light, [bold])
+        for t in (0, 0.25, 0.5, 1, 1.5):
+            expected = light + (bold - light) * t
+            self.assertEqual(deltas.instance([t]), expected)
+
+    def test_instance_multiple_masters(self):
+        default = _makeGlyph(0)
+        masters = [_makeGlyph(40), _makeGlyph(-20)]
+        deltas = MathGlyphDeltas(default, masters)
+        result = deltas.instance([0.5, 0.5])
+        self.assertEqual(result.width, 110)
+        self.assertEqual(result.contours[0]["points"][0], ("curve", (10, 0), False, "name 1", None))
+        self.assertEqual(result.contours[0]["points"][3][2], True)
+        self.assertEqual(result.components[0]["transformation"], (1, 0, 0, 1, 10, 500))
+        self.assertEqual(result.anchors[0]["x"], 60)
+        self.assertEqual(result.name, "A")
+        self.assertEqual(result.unicodes, [65])
+
+    def test_unpaired_data_is_dropped(self):
+        default = _makeGlyph(0, extraAnchor=True)
+        deltas = MathGlyphDeltas(default, [_makeGlyph(10, extraAnchor=True), _makeGlyph(10)])
+        self.assertEqual([anchor["name"] for anchor in deltas.instance([1, 0]).anchors], ["top"])
+
+    def test_scalar_count(self):
+        deltas = MathGlyphDeltas(_makeGlyph(0), [_makeGlyph(10)])
+        self.assertEqual(len(deltas), 1)
+        self.assertEqual(deltas.instance(0.5).width, 105)
+        self.assertRaises(ValueError, deltas.instance, [0.5, 0.5])
+
+    def test_instances(self):
+        default = _makeGlyph(0)
+        masters = [_makeGlyph(40), _makeGlyph(-20)]
+        deltas = MathGlyphDeltas(default, masters)
+        rows = [[0, 0], [0.5, 0.5], [1, 0.25]]
+        self.assertEqual(deltas.instances(rows), [deltas.instance(row) for row in rows])
+        self.assertRaises(ValueError, deltas.instances, [[1]])
+
+    def test_instances_skip_zero_scalars(self):
+        masters = [_makeGlyph(40), _makeGlyph(-20)]
+        expected = MathGlyphDeltas(_makeGlyph(0), masters).instances([[0.5, 0]])
+        deltas = MathGlyphDeltas(_makeGlyph(0), masters)
+        deltas._deltas[1] = _UnreadableDeltas()
+        self.assertEqual(deltas.instances([[0.5, 0]]), expected)
+        self.assertEqual(deltas.weightedInstances([[0.5, 0.5, 0]]), expected)
+
+    def test_weightedInstances(self):
+        light = _makeGlyph(0)
+        bold = _makeGlyph(40)
+        deltas = MathGlyphDeltas(light, [bold])
+        glyphs = deltas.weightedInstances([[0.25, 0.75], [0.5, 0.5], [0.5, 0]])
+        self.assertEqual(glyphs[0], light * 0.25 + bold * 0.75)
+        self.assertEqual(glyphs[1].width, 120)
+        self.assertEqual(glyphs[2].width, 50)
+        self.assertRaises(ValueError, deltas.weightedInstances, [[1]])
+
+    def test_scaleComponentTransform(self):
+        light = _makeGlyph(0)
+        light.scaleComponentTransform = False
+        bold = _makeGlyph(40)
+        bold.components[0]["transformation"] = (2, 0, 0, 2, 40, 500)
+        deltas = MathGlyphDeltas(light, [bold])
+        expected = light + (bold - light) * 0.5
+        self.assertEqual(deltas.instance([0.5]), expected)
+        self.assertEqual(deltas.instances([[0.5]]), [expected])
+
+    def test_bounds(self):
+        default = _makeGlyph(0)
+        masters = [_makeGlyph(40), _makeGlyph(-20)]
+        deltas = MathGlyphDeltas(default, masters)
+        for scalars in ([0, 0], [0.5, 0.25], [1, 1]):
+            self.assertEqual(deltas.bounds(scalars), deltas.instance(scalars).bounds)
+
+    def test_incompatible(self):
+        other = _makeGlyph(10)
+        other.contours[0]["points"].pop()
+        self.assertRaises(ValueError, MathGlyphDeltas, _makeGlyph(0), [other])
+
+    def test_anchorPairs(self):
+        anchors1 = [
+            dict(name="top", x=1, y=2, identifier="a"),
+            dict(name="top", x=3, y=4, identifier=None),
+        ]
+        anchors2 = [
+            dict(name="top", x=5, y=6, identifier=None),
+            dict(name="top", x=7, y=8, identifier="a"),
+        ]
+        pairs = _anchorPairs(anchors1, anchors2)
+        self.assertIs(pairs[id(anchors1[0])], anchors2[1])
+        self.assertIs(pairs[id(anchors1[1])], anchors2[0])
+
+
+class BatchInstancesTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_batchInstances(self):
+        masters = [_makeGlyph(0), _makeGlyph(40), _makeGlyph(-20)]
+        glyphs = batchInstances(masters, [[1, 0, 0], [0.2, 0.3, 0.5]])
+        self.assertEqual(glyphs[0], masters[0] * 1 + masters[1] * 0 + masters[2] * 0)
+        self.assertAlmostEqual(glyphs[1].width, 102)
+
+    def test_deltasForMasters(self):
+        self.assertIsInstance(_deltasForMasters(MathKerning(), []), MathKerningDeltas)
+        self.assertRaises(TypeError, _deltasForMasters, object(), [])
+
+
+class MathKerningDeltasTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_instance_matches_operators(self):
+        groups = {"public.kern1.O": ["O", "D"]}
+        light = MathKerning({("A", "V"): -10, ("public.kern1.O", "V"): -5}, groups)
+        bold = MathKerning({("A", "V"): -30, ("T", "o"): -20, ("D", "V"): 0}, groups)
+        deltas = MathKerningDeltas(light, [bold])
+        for t in (0, 0.5, 1):
+            expected = light + (bold - light) * t
+            self.assertEqual(sorted(deltas.instance([t]).items()), sorted(expected.items()))
+            self.assertEqual(deltas.instance([t]).groups(), expected.groups())
+
+
+class MathInfoDeltasTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_instance(self):
+        light = MathInfo(_TestInfoObject())
+        bold = light * 2
+        deltas = MathInfoDeltas(light, [bold])
+        result = deltas.instance([0.5])
+        self.assertEqual(result.ascender, light.ascender * 1.5)
+        self.assertEqual(result.postscriptBlueValues, [v * 1.5 for v in light.postscriptBlueValues])
+        self.assertEqual(result.openTypeOS2WeightClass, light.openTypeOS2WeightClass * 1.5)
+        self.assertEqual(result.postscriptWeightName, (light * 1.5).postscriptWeightName)
+
+    def test_undefined_in_master(self):
+        light = MathInfo(_TestInfoObject())
+        bold = light * 2
+        bold.xHeight = None
+        bold.postscriptBlueValues = [0, 10]
+        result = MathInfoDeltas(light, [bold]).instance([1])
+        self.assertEqual(result.xHeight, light.xHeight)
+        self.assertEqual(result.postscriptBlueValues, light.postscriptBlueValues)
+
+    def test_angles_match_operators(self):
+        light = MathInfo(_TestInfoObject())
+        light.italicAngle = 0
+        light.postscriptSlantAngle = 5
+        bold = MathInfo(_TestInfoObject())
+        bold.italicAngle = -10
+        bold.postscriptSlantAngle = -5
+        deltas = MathInfoDeltas(light, [bold])
+        for t in (0, 0.3, 1):
+            expected = light + (bold - light) * t
+            for result in (deltas.instance([t]), deltas.instances([[t]])[0]):
+                self.assertAlmostEqual(result.italicAngle, expected.italicAngle)
+                self.assertAlmostEqual(result.postscriptSlantAngle, expected.postscriptSlantAngle)
+            expected = light * (1 - t) + bold * t
+            result = deltas.weightedInstances([[1 - t, t]])[0]
+            self.assertAlmostEqual(result.italicAngle, expected.italicAngle)
+            self.assertAlmostEqual(result.postscriptSlantAngle, expected.postscriptSlantAngle)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+from fontTools.designspaceLib import DesignSpaceDocument, AxisDescriptor, SourceDescriptor, InstanceDescriptor
+from fontMath.mathDesignspace import readDesignspace
+
+
+class ReadDesignspaceTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempDir, "Test.designspace")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def _writeDocument(self, layerName=None):
+        document = DesignSpaceDocument()
+        axis = AxisDescriptor()
+        axis.name = axis.tag = "wght"
+        axis.minimum, axis.default, axis.maximum = 100, 400, 900
+        axis.map = [(100, 20), (400, 80), (900, 200)]
+        document.addAxis(axis)
+        for fileName, value in (("Light.ufo", 20), ("Regular.ufo", 80), ("Bold.ufo", 200)):
+            source = SourceDescriptor()
+            source.filename = fileName
+            source.location = dict(wght=value)
+            source.layerName = layerName
+            document.addSource(source)
+        instance = InstanceDescriptor()
+        instance.filename = "instances/SemiBold.ufo"
+        instance.familyName = "Test"
+        instance.styleName = "SemiBold"
+        instance.location = dict(wght=140)
+        document.addInstance(instance)
+        document.write(self.path)
+
+    def test_readDesignspace(self):
+        self._writeDocument()
+        sources, instances = readDesignspace(self.path)
+        self.assertEqual(
+            [(os.path.basename(source["path"]), source["location"]) for source in sources],
+            [("Light.ufo", {"wght": -1.0}), ("Regular.ufo", {}), ("Bold.ufo", {"wght": 1.0})]
+        )
+        self.assertEqual(len(instances), 1)
+        instance = instances[0]
+        self.assertEqual(instance["name"], "SemiBold")
+        self.assertEqual(instance["path"], os.path.join(self.tempDir, "instances", "SemiBold.ufo"))
+        self.assertEqual(instance["location"], {"wght": 0.5})
+        self.assertEqual((instance["familyName"], instance["styleName"]), ("Test", "SemiBold"))
+
+    def test_layers(self):
+        self._writeDocument(layerName="support")
+        self.assertRaises(ValueError, readDesignspace, self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
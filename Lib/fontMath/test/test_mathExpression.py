@@ -0,0 +1,124 @@
+import unittest
+from fontMath.mathExpression import MathExpression, lazy
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathKerning import MathKerning
+from fontMath.mathInfo import MathInfo
+from fontMath.test.test_mathInfo import _TestInfoObject
+
+
+def _makeGlyph(offset):
+    glyph = MathGlyph(None)
+    glyph.unicodes = []
+    glyph.name = "a%d" % offset
+    glyph.width = 100 + offset
+    glyph.height = 0
+    glyph.contours = [
+        dict(identifier=None, points=[
+            ("curve", (offset, 0), False, None, None),
+            (None, (offset, 0), False, None, None),
+            (None, (100 + offset, 100.4), False, None, None),
+            ("curve", (100 + offset, 100.4), False, None, None)
+        ])
+    ]
+    glyph.anchors = [dict(name="top", x=50 + offset, y=700, identifier=None, color=None)]
+    return glyph
+
+
+class MathExpressionTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_lazy(self):
+        glyph = _makeGlyph(0)
+        expression = lazy(glyph)
+        self.assertIsInstance(expression, MathExpression)
+        self.assertIs(lazy(expression), expression)
+        self.assertIs(expression.evaluate(), glyph)
+
+    def test_weighted_sum_matches_operators(self):
+        a, b, c = _makeGlyph(0), _makeGlyph(30), _makeGlyph(-10)
+        expected = (a * 0.3 + b * 0.5 + c * 0.2).round()
+        result = (lazy(a) * 0.3 + lazy(b) * 0.5 + lazy(c) * 0.2).round()
+        self.assertEqual(result.evaluate(), expected)
+        self.assertEqual(result.width, expected.width)
+        self.assertEqual(result.name, "a0")
+
+    def test_interpolation_matches_operators(self):
+        a, b = _makeGlyph(0), _makeGlyph(30)
+        expected = a + (b - a) * 0.25
+        result = lazy(a) + (lazy(b) - a) * 0.25
+        self.assertEqual(result, expected)
+        self.assertEqual(list(result._linearTerms().keys()), [id(a), id(b)])
+
+    def test_mixed_operators(self):
+        a, b = _makeGlyph(0), _makeGlyph(30)
+        self.assertEqual((lazy(a) / 2).width, 50)
+        self.assertEqual((-lazy(a)).width, -100)
+        self.assertEqual((2 * lazy(a) - b).width, 70)
+        self.assertEqual((b - lazy(a)).width, 30)
+        self.assertEqual(sum([lazy(a), lazy(b)]).width, 230)
+        self.assertEqual((lazy(a) * (2, 1)).width, 200)
+        self.assertEqual((lazy(a) / (2, 1)).width, 50)
+
+    def test_shared_subexpressions(self):
+        a, b = _makeGlyph(0), _makeGlyph(30)
+        shared = (lazy(a) * 0.5 + lazy(b) * 0.5).round()
+        first = shared + lazy(a)
+        second = shared - lazy(b)
+        first.evaluate()
+        self.assertIsNotNone(shared._result)
+        result = shared._result
+        second.evaluate()
+        self.assertIs(shared._result, result)
+
+    def test_read_only(self):
+        expression = lazy(_makeGlyph(0))
+        with self.assertRaises(AttributeError):
+            expression.width = 3
+        with self.assertRaises(AttributeError):
+            expression._missing
+
+    def test_kerning(self):
+        a = MathKerning({("A", "V"): -10})
+        b = MathKerning({("A", "V"): -30, ("T", "o"): -20})
+        expected = a * 0.5 + b * 0.5
+        result = lazy(a) * 0.5 + lazy(b) * 0.5
+        self.assertEqual(sorted(result.items()), sorted(expected.items()))
+        self.assertEqual(result[("T", "o")], -10)
+
+    def test_kerning_round(self):
+        a = MathKerning({("A", "V"): -10.4})
+        result = lazy(a).round().evaluate()
+        self.assertIsInstance(result, MathKerning)
+        self.assertIsNot(result, a)
+        self.assertEqual(result[("A", "V")], -10)
+        self.assertEqual(a[("A", "V")], -10.4)
+
+    def test_modified_operands(self):
+        a, b = _makeGlyph(0), _makeGlyph(200)
+        for i in range(2):
+            self.assertEqual((lazy(a) * 0.5 + lazy(b) * 0.5).width, 200)
+        a.width = 500
+        self.assertEqual((lazy(a) * 0.5 + lazy(b) * 0.5).width, 400)
+        a += b
+        self.assertEqual((lazy(a) * 0.5 + lazy(b) * 0.5).width, 550)
+
+    def test_repeated_evaluation(self):
+        a = MathInfo(_TestInfoObject())
+        b = a * 3
+        b.postscriptBlueValues = [0, 10]
+        results = [(lazy(a) * 0.5 + lazy(b) * 0.5).evaluate() for i in range(3)]
+        expected = a * 0.5 + b * 0.5
+        for result in results:
+            self.assertEqual(result.postscriptBlueValues, expected.postscriptBlueValues)
+            self.assertEqual(result.xHeight, expected.xHeight)
+
+    def test_info(self):
+        a = MathInfo(_TestInfoObject())
+        b = a * 3
+        result = lazy(a) * 0.5 + lazy(b) * 0.5
+        self.assertEqual(result.ascender, a.ascender * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import unittest
+from fontTools.fontBuilder import FontBuilder
+from fontTools.ufoLib import UFOReader
+from fontMath.mathFont import MathFont
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathInfo import MathInfo
+from fontMath.mathKerning import MathKerning
+from fontMath.mathUFO import UFOInstanceWriter
+from fontMath.test.test_mathBinary import _makeTTFont
+from fontMath.test.test_mathGlyph import _TestGlyph
+from fontMath.test.test_mathInfo import _TestInfoObject
+
+
+def _makeMathGlyph(glyphName, pointCount):
+    glyph = MathGlyph(None)
+    glyph.name = glyphName
+    glyph.unicodes = []
+    glyph.width = 100
+    glyph.height = 0
+    pen = glyph.getPointPen()
+    pen.beginPath()
+    for index in range(pointCount):
+        pen.addPoint((index, index), "line")
+    pen.endPath()
+    return glyph
+
+
+class _TestFont(dict):
+
+    """Mockup defcon-like Font class"""
+
+    def __init__(self):
+        super(_TestFont, self).__init__()
+        for glyphName, pointCount in (("A", 3), ("B", 4), ("C", 5)):
+            self[glyphName] = _makeMathGlyph(glyphName, pointCount).extractGlyph(_TestGlyph())
+        self.info = _TestInfoObject()
+        self.kerning = {("A", "B"): -10}
+        self.groups = {"public.kern1.A": ["A"]}
+
+
+class MathFontTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_font_source(self):
+        source = _TestFont()
+        font = MathFont(source)
+        self.assertEqual(sorted(font), ["A", "B", "C"])
+        self.assertIn("A", font)
+        self.assertNotIn("D", font)
+        self.assertIsNone(font.get("D"))
+        self.assertRaises(KeyError, font.__getitem__, "D")
+        self.assertEqual(font["B"], MathGlyph(source["B"]))
+        self.assertEqual(font.info, MathInfo(source.info))
+        self.assertEqual(font.kerning, MathKerning(source.kerning, source.groups))
+        self.assertIs(font.info, font.info)
+
+    def test_lazy(self):
+        font = MathFont(_TestFont())
+        self.assertEqual(len(font.cache), 0)
+        font["A"]
+        self.assertEqual(len(font.cache), 1)
+
+    def test_onlyGeometry(self):
+        font = MathFont(_TestFont(), onlyGeometry=True)
+        self.assertTrue(font["A"].onlyGeometry)
+
+    def test_cache_size(self):
+        # each glyph is the number of points times 3 plus 1
+        font = MathFont(_TestFont(), cacheSize=30)
+        glyphA = font["A"]
+        font["B"]
+        font["C"]
+        self.assertNotIn("A", font.cache)
+        self.assertIsNot(font["A"], glyphA)
+        self.assertEqual(font["A"], glyphA)
+        self.assertTrue(font.cache.size <= 30)
+
+    def test_ufoReader_source(self):
+        path = os.path.join(self.tempDir, "test.ufo")
+        source = _TestFont()
+        glyphs = dict((glyphName, MathGlyph(glyph)) for glyphName, glyph in source.items())
+        with UFOInstanceWriter(path) as writer:
+            writer.writeGlyphs(glyphs.items())
+            writer.writeKerning(MathKerning(source.kerning, source.groups))
+            writer.writeInfo(MathInfo(source.info))
+        font = MathFont(UFOReader(path))
+        self.assertEqual(sorted(font), ["A", "B", "C"])
+        self.assertIn("C", font)
+        self.assertEqual(font["C"].contours, glyphs["C"].contours)
+        self.assertEqual(font["C"].width, 100)
+        self.assertEqual(font.kerning, MathKerning(source.kerning, source.groups))
+        self.assertEqual(font.info.unitsPerEm, source.info.unitsPerEm)
+
+    def test_ttFont_source(self):
+        ttFont = _makeTTFont()
+        font = MathFont(ttFont)
+        self.assertEqual(font.keys(), ttFont.getGlyphOrder())
+        self.assertEqual(font["a"].width, 101)
+        self.assertEqual(font["a"].unicodes, [ord("A"), ord("a")])
+        self.assertEqual(font.info.unitsPerEm, 1000)
+        self.assertIsNone(font.kerning)
+
+    def test_ttFont_source_info(self):
+        ttFont = _makeTTFont()
+        builder = FontBuilder(font=ttFont)
+        builder.setupHorizontalHeader(ascent=900, descent=-300)
+        builder.setupOS2(sTypoAscender=750, sTypoDescender=-250)
+        info = MathFont(ttFont).info
+        self.assertEqual((info.openTypeHheaAscender, info.openTypeHheaDescender), (900, -300))
+        self.assertEqual((info.ascender, info.descender), (750, -250))
+
+    def test_ttFont_source_onlyGeometry(self):
+        ttFont = _makeTTFont()
+        self.assertFalse(MathFont(ttFont)["a"].onlyGeometry)
+        glyph = MathFont(ttFont, onlyGeometry=True)["a"]
+        self.assertTrue(glyph.onlyGeometry)
+        self.assertTrue((glyph * 2).onlyGeometry)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -509,6 +509,261 @@ class MathGlyphTest(unittest.TestCase):
         glyph2 = glyph1.round()
         self.assertEqual(glyph2.image, expected)
 
+    def _setupInPlaceGlyph(self, offset):
+        glyph = self._setupTestGlyph()
+        glyph.width = 100 + offset
+        glyph.contours = [
+            dict(identifier=None, points=[
+                ("curve", (offset, 0.4), False, "name 1", None),
+                (None, (offset, 0), False, None, None),
+                (None, (100, 100 + offset), False, None, None),
+                ("curve", (100, 100 + offset), True, None, None)
+            ])
+        ]
+        glyph.components = [
+            dict(baseGlyph="acute", transformation=(1, 0, 0, 1, offset, 500.6), identifier=None),
+            dict(baseGlyph="grave", transformation=(1, 0, 0, 1, offset, 500), identifier="x%d" % offset)
+        ]
+        glyph.anchors = [dict(name="top", x=50 + offset, y=700, identifier=None, color=None)]
+        glyph.guidelines = [dict(name="a", x=offset, y=0, angle=90, identifier=None)]
+        glyph.image = dict(fileName="a.png", transformation=(1, 0, 0, 1, offset, 0), color=None)
+        return glyph
+
+    def test_iadd_isub(self):
+        glyph1 = self._setupInPlaceGlyph(0)
+        glyph2 = self._setupInPlaceGlyph(10)
+        contours = glyph1.contours
+        points = contours[0]["points"]
+        anchors = glyph1.anchors
+        expected = glyph1 + glyph2
+        glyph1 += glyph2
+        self.assertIs(glyph1.contours, contours)
+        self.assertIs(glyph1.contours[0]["points"], points)
+        self.assertIs(glyph1.anchors, anchors)
+        self.assertEqual(glyph1.width, expected.width)
+        self.assertEqual(glyph1.contours, expected.contours)
+        self.assertEqual(glyph1.anchors, expected.anchors)
+        self.assertEqual(glyph1.guidelines, expected.guidelines)
+        self.assertEqual(glyph1.image, expected.image)
+        # the grave components have different identifiers but are still paired by index
+        self.assertEqual(glyph1.components, expected.components)
+        glyph1 -= glyph2
+        self.assertEqual(glyph1.width, 100)
+        self.assertEqual(glyph1.contours[0]["points"][2][1], (100, 100))
+
+    def test_iadd_drops_unpaired(self):
+        glyph1 = self._setupInPlaceGlyph(0)
+        glyph2 = self._setupInPlaceGlyph(10)
+        glyph2.components = glyph2.components[:1]
+        glyph2.anchors = []
+        glyph2.image = dict(fileName=None, transformation=(1, 0, 0, 1, 0, 0), color=None)
+        glyph1 += glyph2
+        self.assertEqual([c["baseGlyph"] for c in glyph1.components], ["acute"])
+        self.assertEqual(glyph1.anchors, [])
+        self.assertIsNone(glyph1.image["fileName"])
+
+    def test_imul_idiv(self):
+        glyph1 = self._setupInPlaceGlyph(10)
+        expected = glyph1 * (2, 3)
+        glyph1 *= (2, 3)
+        self.assertEqual(glyph1.width, expected.width)
+        self.assertEqual(glyph1.contours, expected.contours)
+        self.assertEqual(glyph1.components, expected.components)
+        self.assertEqual(glyph1.anchors, expected.anchors)
+        self.assertEqual(glyph1.guidelines, expected.guidelines)
+        self.assertEqual(glyph1.image, expected.image)
+        glyph1 /= 2
+        self.assertEqual(glyph1.width, 110)
+        glyph2 = self._setupInPlaceGlyph(10)
+        glyph2.scaleComponentTransform = False
+        glyph2 *= 2
+        self.assertEqual(glyph2.components[0]["transformation"], (1, 0, 0, 1, 20, 1001.2))
+
+    def test_round_(self):
+        glyph1 = self._setupInPlaceGlyph(0)
+        expected = glyph1.round()
+        points = glyph1.contours[0]["points"]
+        self.assertIs(glyph1.round_(), glyph1)
+        self.assertIs(glyph1.contours[0]["points"], points)
+        self.assertEqual(glyph1.contours, expected.contours)
+        self.assertEqual(glyph1.components, expected.components)
+        self.assertEqual(glyph1.image, expected.image)
+
+    def test_inplace_invalidates_contentHash(self):
+        glyph = self._setupInPlaceGlyph(0)
+        before = glyph.contentHash(onlyGeometry=True)
+        glyph *= 2
+        self.assertNotEqual(before, glyph.contentHash(onlyGeometry=True))
+
+    def _setupFullGlyph(self):
+        glyph = self._setupInPlaceGlyph(0)
+        glyph.name = "a"
+        glyph.unicodes = [97]
+        glyph.note = "note"
+        glyph.lib = {"foo": [1, 2]}
+        return glyph
+
+    def test_onlyGeometry_init(self):
+        source = self._setupFullGlyph()
+        glyph = MathGlyph(source, onlyGeometry=True)
+        self.assertTrue(glyph.onlyGeometry)
+        self.assertEqual(glyph.contours, source.contours)
+        self.assertEqual(glyph.components, source.components)
+        self.assertEqual(glyph.anchors, source.anchors)
+        self.assertEqual(glyph.name, "a")
+        self.assertEqual(glyph.unicodes, [97])
+        self.assertEqual(glyph.lib, {})
+        self.assertIsNone(glyph.note)
+        self.assertEqual(glyph.guidelines, [])
+        self.assertIsNone(glyph.image["fileName"])
+        self.assertTrue(glyph.copy().onlyGeometry)
+
+    def test_onlyGeometry_math(self):
+        glyph1 = self._setupFullGlyph()
+        glyph1.onlyGeometry = True
+        glyph2 = self._setupFullGlyph()
+        for result in (glyph1 + glyph2, glyph1 - glyph2, glyph1 * 2, glyph1 / 2, glyph1.round()):
+            self.assertTrue(result.onlyGeometry)
+            self.assertEqual(result.lib, {})
+            self.assertIsNone(result.note)
+            self.assertEqual(result.guidelines, [])
+            self.assertIsNone(result.image["fileName"])
+            self.assertEqual(len(result.contours), 1)
+            self.assertEqual(len(result.anchors), 1)
+        self.assertEqual((glyph1 * 2).contours, (glyph2 * 2).contours)
+        glyph1 *= 2
+        self.assertEqual(glyph1.guidelines, [dict(name="a", x=0, y=0, angle=90, identifier=None)])
+        self.assertFalse((glyph2 + glyph1).onlyGeometry)
+
+    def test_onlyGeometry_extractGlyph(self):
+        glyph = self._setupFullGlyph()
+        glyph.onlyGeometry = True
+        target = _TestGlyph()
+        target.lib = {"keep": True}
+        target.note = "keep"
+        glyph.extractGlyph(target)
+        self.assertEqual(target.lib, {"keep": True})
+        self.assertEqual(target.note, "keep")
+        self.assertEqual(target.width, 100)
+        self.assertEqual(target.name, "a")
+        self.assertEqual(len(target.contours), 1)
+        glyph.onlyGeometry = False
+        glyph.extractGlyph(target)
+        self.assertEqual(target.lib, {"foo": [1, 2]})
+        self.assertEqual(target.note, "note")
+
+    def test_extractGlyph_holdNotifications(self):
+        glyph = self._setupFullGlyph()
+        target = _TestNotifyingGlyph()
+        glyph.extractGlyph(target)
+        self.assertEqual(target.notificationLog, ["hold", "release"])
+        self.assertEqual(len(target.contours), 1)
+        # notifications are released when the extraction fails
+        target = _TestNotifyingGlyph()
+        glyph.unicodes = None
+        self.assertRaises(TypeError, glyph.extractGlyph, target)
+        self.assertEqual(target.notificationLog, ["hold", "release"])
+
+    def _drawBoundsGlyph(self):
+        glyph = self._setupTestGlyph()
+        pen = glyph.getPointPen()
+        # lines and cubic curves overshooting the on curves
+        pen.beginPath()
+        pen.addPoint((0, 0), "line")
+        pen.addPoint((100, 0), "line")
+        pen.addPoint((150, 50))
+        pen.addPoint((150, 150))
+        pen.addPoint((100, 200), "curve")
+        pen.addPoint((0, 200), "line")
+        pen.endPath()
+        # quadratic curve with an implied on curve
+        pen.beginPath()
+        pen.addPoint((300, 0), "qcurve")
+        pen.addPoint((350, -60))
+        pen.addPoint((400, -60))
+        pen.addPoint((450, 0), "qcurve")
+        pen.endPath()
+        # open contour
+        pen.beginPath()
+        pen.addPoint((-50, 10), "move")
+        pen.addPoint((-70, 300))
+        pen.addPoint((-30, 300))
+        pen.addPoint((-50, 10), "curve")
+        pen.endPath()
+        return glyph
+
+    def test_bounds(self):
+        from fontTools.pens.boundsPen import BoundsPen
+        glyph = self._drawBoundsGlyph()
+        pen = BoundsPen(None)
+        glyph.draw(pen)
+        for value, expected in zip(glyph.bounds, pen.bounds):
+            self.assertAlmostEqual(value, expected)
+        self.assertIsNone(self._setupTestGlyph().bounds)
+
+    def test_controlBounds(self):
+        from fontTools.pens.boundsPen import ControlBoundsPen
+        glyph = self._drawBoundsGlyph()
+        pen = ControlBoundsPen(None)
+        glyph.draw(pen)
+        self.assertEqual(glyph.controlBounds, pen.bounds)
+        self.assertIsNone(self._setupTestGlyph().controlBounds)
+
+    def test_bounds_quadratic_without_on_curves(self):
+        from fontTools.pens.boundsPen import BoundsPen
+        glyph = self._setupTestGlyph()
+        pen = glyph.getPointPen()
+        pen.beginPath()
+        for pt in ((0, 0), (100, 0), (100, 100), (0, 100)):
+            pen.addPoint(pt)
+        pen.endPath()
+        boundsPen = BoundsPen(None)
+        glyph.draw(boundsPen)
+        self.assertEqual(glyph.bounds, boundsPen.bounds)
+
+    def test_bounds_cached(self):
+        glyph = self._drawBoundsGlyph()
+        bounds = glyph.bounds
+        self.assertIs(glyph.bounds, bounds)
+        glyph *= 2
+        self.assertEqual(glyph.bounds[0], bounds[0] * 2)
+        glyph.contours = []
+        self.assertIsNone(glyph.bounds)
+
+    def test_contentHash(self):
+        glyph1 = self._setupTestGlyph()
+        glyph1.unicodes = []
+        glyph1.width = 100
+        glyph1.contours = [
+            dict(identifier="contour 1", points=[
+                ("curve", (0, 0), False, "name 1", "point 1"),
+                (None, (0, 0), False, None, None),
+                (None, (100, 100), False, None, None),
+                ("curve", (100, 100), False, None, None)
+            ])
+        ]
+        glyph2 = glyph1.copy()
+        self.assertEqual(glyph1.contentHash(), glyph2.contentHash())
+        glyph2.width = 100.0
+        self.assertEqual(glyph1.contentHash(), glyph2.contentHash())
+        glyph2.lib = {"foo": "bar"}
+        self.assertNotEqual(glyph1.contentHash(), glyph2.contentHash())
+        self.assertEqual(glyph1.contentHash(onlyGeometry=True),
+                         glyph2.contentHash(onlyGeometry=True))
+        glyph2.width = 101
+        self.assertNotEqual(glyph1.contentHash(onlyGeometry=True),
+                            glyph2.contentHash(onlyGeometry=True))
+
+    def test_contentHash_invalidated_by_pen(self):
+        glyph = self._setupTestGlyph()
+        before = glyph.contentHash()
+        pen = glyph.getPointPen()
+        pen.beginPath()
+        pen.addPoint((0, 0), "line")
+        pen.addPoint((10, 0), "line")
+        pen.endPath()
+        self.assertNotEqual(before, glyph.contentHash())
+
 
 class MathGlyphPenTest(unittest.TestCase):
     def __init__(self, methodName):
@@ -579,6 +834,57 @@ class MathGlyphPenTest(unittest.TestCase):
         self.assertEqual(pen.contours[-1]["identifier"], 'contour 1')
 
 
+class _TestGlyph(object):
+
+    """Mockup defcon-like Glyph class"""
+
+    def __init__(self):
+        self.name = None
+        self.unicodes = []
+        self.width = 0
+        self.height = 0
+        self.note = None
+        self.lib = {}
+        self.anchors = []
+        self.guidelines = []
+        self.image = None
+        self.contours = []
+        self.components = []
+
+    def getPointPen(self):
+        return MathGlyphPen(self)
+
+    def drawPoints(self, pointPen):
+        MathGlyph.drawPoints(self, pointPen)
+
+    def clearContours(self):
+        del self.contours[:]
+
+    def clearComponents(self):
+        del self.components[:]
+
+    def clearAnchors(self):
+        self.anchors = []
+
+    def clearGuidelines(self):
+        self.guidelines = []
+
+
+class _TestNotifyingGlyph(_TestGlyph):
+
+    """Mockup defcon-like Glyph class that holds notifications"""
+
+    def __init__(self):
+        super(_TestNotifyingGlyph, self).__init__()
+        self.notificationLog = []
+
+    def holdNotifications(self):
+        self.notificationLog.append("hold")
+
+    def releaseHeldNotifications(self):
+        self.notificationLog.append("release")
+
+
 class _TestPointPen(AbstractPointPen):
 
     def __init__(self):
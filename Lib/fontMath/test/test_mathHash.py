@@ -0,0 +1,41 @@
+import unittest
+from fontMath.mathHash import _contentHash, _serialize
+
+
+class MathHashTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_contentHash_dict_order(self):
+        self.assertEqual(
+            _contentHash({"a": 1, "b": [2, 3]}),
+            _contentHash({"b": [2, 3], "a": 1})
+        )
+
+    def test_contentHash_numbers(self):
+        self.assertEqual(_contentHash(1), _contentHash(1.0))
+        self.assertEqual(_contentHash(0.0), _contentHash(-0.0))
+        self.assertNotEqual(_contentHash(1), _contentHash(1.5))
+        self.assertNotEqual(_contentHash(1), _contentHash(True))
+
+    def test_contentHash_types(self):
+        self.assertNotEqual(_contentHash("1"), _contentHash(1))
+        self.assertNotEqual(_contentHash(None), _contentHash(0))
+        self.assertNotEqual(_contentHash([[1], 2]), _contentHash([1, [2]]))
+        self.assertEqual(_contentHash((1, 2)), _contentHash([1, 2]))
+
+    def test_contentHash_known_value(self):
+        # the digest must not depend on the process
+        self.assertEqual(
+            _contentHash({"x": 1}),
+            "0c05328da43c041c76977122e1e9419178acff2c068db84c975c139a163abbcf"
+        )
+
+    def test_serialize(self):
+        parts = []
+        _serialize({"x": (1, 0.5)}, parts)
+        self.assertEqual(b"".join(parts), b"d1:s1:xl2:i1;f0.5;")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from fontMath.mathInfo import MathInfo
+from fontMath.mathKerning import MathKerning
+from fontMath.mathModel import MathVariationModel
+from fontMath.mathIncremental import IncrementalInstancer
+from fontMath.test.fixtures import _makeGlyph, _TestMaster
+from fontMath.test.test_mathInfo import _TestInfoObject
+
+
+_locations = [{}, {"wght": 1}]
+_instanceLocations = dict(light={}, regular={"wght": 0.5}, bold={"wght": 1})
+
+
+def _makeMasters():
+    info = MathInfo(_TestInfoObject())
+    return [
+        _TestMaster(
+            dict(a=_makeGlyph(100), acute=_makeGlyph(10), aacute=_makeGlyph(100, ["a", "acute"]),
+                 aacutedot=_makeGlyph(100, ["aacute"]), b=_makeGlyph(100)),
+            info,
+            MathKerning({("a", "b"): -10, ("b", "a"): 10})
+        ),
+        _TestMaster(
+            dict(a=_makeGlyph(300), acute=_makeGlyph(30), aacute=_makeGlyph(300, ["a", "acute"]),
+                 aacutedot=_makeGlyph(300, ["aacute"]), b=_makeGlyph(300)),
+            info * 2,
+            MathKerning({("a", "b"): -30, ("b", "a"): 10})
+        )
+    ]
+
+
+class _CountingInstancer(IncrementalInstancer):
+
+    def __init__(self, *args, **kwargs):
+        IncrementalInstancer.__init__(self, *args, **kwargs)
+        self.computed = []
+
+    def _instanceGlyph(self, glyphName, glyphs):
+        self.computed.append(glyphName)
+        IncrementalInstancer._instanceGlyph(self, glyphName, glyphs)
+
+
+class IncrementalInstancerTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_initial(self):
+        instancer = IncrementalInstancer(MathVariationModel(_locations), _instanceLocations)
+        changes = instancer.update(_makeMasters())
+        self.assertEqual(changes["glyphs"], ["a", "aacute", "aacutedot", "acute", "b"])
+        self.assertEqual(changes["dependentGlyphs"], [])
+        self.assertEqual(changes["kerning"], [("a", "b"), ("b", "a")])
+        self.assertIn("unitsPerEm", changes["info"])
+        self.assertEqual(instancer.glyphs["regular"]["a"].width, 200)
+        self.assertEqual(instancer.kerning["regular"][("a", "b")], -20)
+        self.assertEqual(instancer.info["bold"].unitsPerEm, 2000)
+
+    def test_unchanged(self):
+        instancer = _CountingInstancer(MathVariationModel(_locations), _instanceLocations)
+        masters = _makeMasters()
+        instancer.update(masters)
+        del instancer.computed[:]
+        changes = instancer.update(_makeMasters())
+        self.assertEqual(instancer.computed, [])
+        self.assertEqual(changes, dict(glyphs=[], dependentGlyphs=[], removedGlyphs=[], kerning=[], info=[]))
+
+    def test_glyphChanged(self):
+        instancer = _CountingInstancer(MathVariationModel(_locations), _instanceLocations)
+        masters = _makeMasters()
+        instancer.update(masters)
+        del instancer.computed[:]
+        previous = instancer.glyphs["bold"]["b"]
+        masters[1]["a"] = _makeGlyph(500)
+        changes = instancer.update(masters)
+        self.assertEqual(instancer.computed, ["a"])
+        self.assertEqual(changes["glyphs"], ["a"])
+        self.assertEqual(changes["dependentGlyphs"], ["aacute", "aacutedot"])
+        self.assertEqual(instancer.glyphs["regular"]["a"].width, 300)
+        self.assertIs(instancer.glyphs["bold"]["b"], previous)
+
+    def test_glyphNames(self):
+        instancer = _CountingInstancer(MathVariationModel(_locations), _instanceLocations)
+        masters = _makeMasters()
+        instancer.update(masters)
+        del instancer.computed[:]
+        masters[1]["a"] = _makeGlyph(500)
+        masters[1]["b"] = _makeGlyph(500)
+        changes = instancer.update(masters, glyphNames=["b"])
+        self.assertEqual(instancer.computed, ["b"])
+        self.assertEqual(changes["dependentGlyphs"], [])
+
+    def test_glyphRemoved(self):
+        instancer = IncrementalInstancer(MathVariationModel(_locations), _instanceLocations)
+        masters = _makeMasters()
+        instancer.update(masters)
+        del masters[0]["acute"]
+        del masters[1]["acute"]
+        changes = instancer.update(masters)
+        self.assertEqual(changes["removedGlyphs"], ["acute"])
+        self.assertEqual(changes["dependentGlyphs"], ["aacute", "aacutedot"])
+        self.assertNotIn("acute", instancer.glyphs["light"])
+
+    def test_decompose(self):
+        instancer = IncrementalInstancer(MathVariationModel(_locations), _instanceLocations, decompose=True)
+        masters = _makeMasters()
+        instancer.update(masters)
+        glyph = instancer.glyphs["bold"]["aacutedot"]
+        self.assertEqual(glyph.components, [])
+        self.assertEqual(len(glyph.contours), 4)
+        masters[1]["a"] = _makeGlyph(500)
+        changes = instancer.update(masters)
+        self.assertEqual(changes["dependentGlyphs"], ["aacute", "aacutedot"])
+        glyph = instancer.glyphs["bold"]["aacutedot"]
+        self.assertEqual(glyph.width, 300)
+        self.assertEqual(glyph.bounds[2], 500)
+
+    def test_kerningAndInfoChanged(self):
+        instancer = IncrementalInstancer(MathVariationModel(_locations), _instanceLocations)
+        masters = _makeMasters()
+        instancer.update(masters)
+        masters[1].kerning = MathKerning({("a", "b"): -30, ("b", "a"): 30})
+        info = masters[1].info.copy()
+        info.ascender = 1000
+        masters[1].info = info
+        changes = instancer.update(masters)
+        self.assertEqual(changes["kerning"], [("b", "a")])
+        self.assertEqual(changes["info"], ["ascender"])
+        self.assertEqual(instancer.kerning["regular"][("b", "a")], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -142,6 +142,19 @@ class MathInfoTest(unittest.TestCase):
         self.assertTrue(info1 > info2)
         self.assertNotEqual(info1, info2)
 
+    def test_contentHash(self):
+        info1 = MathInfo(_TestInfoObject())
+        info2 = MathInfo(_TestInfoObject())
+        self.assertEqual(info1.contentHash(), info2.contentHash())
+        self.assertEqual(info1, info2)
+        info2.guidelines = [dict(x=0, y=100, angle=0, name="bar", identifier=None)]
+        self.assertNotEqual(info1.contentHash(), info2.contentHash())
+        self.assertEqual(info1.contentHash(onlyGeometry=True),
+                         info2.contentHash(onlyGeometry=True))
+        info2.ascender = info2.ascender + 1
+        self.assertNotEqual(info1.contentHash(onlyGeometry=True),
+                            info2.contentHash(onlyGeometry=True))
+
     def test_weight_name(self):
         info1 = MathInfo(_TestInfoObject())
         info2 = MathInfo(_TestInfoObject())
@@ -0,0 +1,159 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    # Python 2 without the futures package
+    ThreadPoolExecutor = None
+from fontTools.designspaceLib import DesignSpaceDocument, AxisDescriptor, SourceDescriptor, InstanceDescriptor
+from fontTools.ufoLib import UFOReader
+from fontMath.mathFont import MathFont
+from fontMath.mathInfo import MathInfo
+from fontMath.mathKerning import MathKerning
+from fontMath.mathInstancer import readInstanceSpec, instantiate, main
+from fontMath.test.fixtures import _makeGlyph, _writeMaster
+from fontMath.test.test_mathInfo import _TestInfoObject
+
+
+class MathInstancerTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        info = MathInfo(_TestInfoObject())
+        _writeMaster(
+            os.path.join(self.tempDir, "Light.ufo"),
+            dict(a=_makeGlyph(100), b=_makeGlyph(101), sparse=_makeGlyph(50)),
+            kerning=MathKerning({("a", "b"): -10}),
+            info=info
+        )
+        _writeMaster(
+            os.path.join(self.tempDir, "Bold.ufo"),
+            dict(a=_makeGlyph(300), b=_makeGlyph(300)),
+            kerning=MathKerning({("a", "b"): -30}),
+            info=info * 2
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def _writeSpec(self, instances, locations=True):
+        masters = [dict(path="Light.ufo"), dict(path="Bold.ufo")]
+        if locations:
+            masters[0]["location"] = {}
+            masters[1]["location"] = {"wght": 1}
+        path = os.path.join(self.tempDir, "spec.json")
+        with open(path, "w") as f:
+            json.dump(dict(masters=masters, instances=instances), f)
+        return path
+
+    def _readInstance(self, fileName):
+        return MathFont(UFOReader(os.path.join(self.tempDir, fileName)))
+
+    def test_readInstanceSpec(self):
+        path = self._writeSpec([
+            dict(path="Regular.ufo", location={"wght": 0.5}, styleName="Regular"),
+            dict(path="Mix.ufo", weights=[0.25, 0.75])
+        ])
+        sources, instances = readInstanceSpec(path)
+        self.assertEqual(sources[1], dict(path=os.path.join(self.tempDir, "Bold.ufo"), location={"wght": 1}))
+        self.assertEqual(instances[0]["name"], "Regular")
+        self.assertEqual(instances[1]["name"], "instance1")
+        self.assertEqual(instances[1]["weights"], [0.25, 0.75])
+        path = self._writeSpec([dict(path="Mix.ufo", weights=[1])])
+        self.assertRaises(ValueError, readInstanceSpec, path)
+        path = self._writeSpec([dict(path="Mix.ufo")])
+        self.assertRaises(ValueError, readInstanceSpec, path)
+
+    def test_instantiate(self):
+        sources, instances = readInstanceSpec(self._writeSpec([
+            dict(path="instances/Regular.ufo", location={"wght": 0.5}, familyName="Test", styleName="Regular"),
+            dict(path="instances/Mix.ufo", location={"wght": 0.25})
+        ]))
+        executor = None if ThreadPoolExecutor is None else ThreadPoolExecutor(2)
+        try:
+            timings = instantiate(sources, instances, executor=executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.assertEqual(
+            [stage for stage, seconds in timings],
+            ["setup", "info", "kerning", "glyphs: instance", "glyphs: read", "glyphs: write",
+             "glyphs: sparse", "close"]
+        )
+        font = self._readInstance("instances/Regular.ufo")
+        self.assertEqual(font.keys(), ["a", "b", "sparse"])
+        # rounded
+        self.assertEqual(font["b"].width, 200)
+        self.assertEqual(font["sparse"].width, 50)
+        self.assertEqual(font.kerning[("a", "b")], -20)
+        self.assertEqual(font.info.unitsPerEm, 1500)
+        font = self._readInstance("instances/Mix.ufo")
+        self.assertEqual(font["a"].width, 150)
+        self.assertRaises(ValueError, instantiate, sources, instances)
+        instantiate(sources, instances, roundGeometry=False, overwrite=True)
+        font = self._readInstance("instances/Regular.ufo")
+        self.assertEqual(font["b"].width, 200.5)
+
+    def test_instantiate_default_master_first(self):
+        glyph = _makeGlyph(100)
+        glyph.unicodes = [97]
+        _writeMaster(os.path.join(self.tempDir, "Light.ufo"), dict(a=glyph))
+        sources, instances = readInstanceSpec(self._writeSpec([
+            dict(path="Regular.ufo", location={"wght": 0.5}),
+            dict(path="Mix.ufo", weights=[0.75, 0.25])
+        ]))
+        sources.reverse()
+        instances[1]["weights"].reverse()
+        instantiate(sources, instances)
+        font = self._readInstance("Regular.ufo")
+        self.assertEqual(font["a"].unicodes, [97])
+        self.assertEqual(font["a"].width, 200)
+        self.assertEqual(font.kerning[("a", "b")], -20)
+        font = self._readInstance("Mix.ufo")
+        self.assertEqual(font["a"].unicodes, [97])
+        self.assertEqual(font["a"].width, 150)
+
+    def test_instantiate_weights(self):
+        sources, instances = readInstanceSpec(self._writeSpec([
+            dict(path="Mix.ufo", weights=[0.25, 0.75])
+        ], locations=False))
+        messages = []
+        instantiate(sources, instances, log=messages.append)
+        font = self._readInstance("Mix.ufo")
+        self.assertEqual(font.keys(), ["a", "b"])
+        self.assertEqual(font["a"].width, 250)
+        self.assertEqual(messages[0], "skipped 1 glyphs that are missing in some masters")
+
+    def test_main(self):
+        document = DesignSpaceDocument()
+        axis = AxisDescriptor()
+        axis.name = axis.tag = "wght"
+        axis.minimum, axis.default, axis.maximum = 100, 100, 900
+        document.addAxis(axis)
+        for fileName, value in (("Light.ufo", 100), ("Bold.ufo", 900)):
+            source = SourceDescriptor()
+            source.filename = fileName
+            source.location = dict(wght=value)
+            document.addSource(source)
+        instance = InstanceDescriptor()
+        instance.filename = "Regular.ufo"
+        instance.styleName = "Regular"
+        instance.location = dict(wght=500)
+        document.addInstance(instance)
+        path = os.path.join(self.tempDir, "Test.designspace")
+        document.write(path)
+        jobs = "1" if ThreadPoolExecutor is None else "2"
+        self.assertEqual(main([path, "--jobs", jobs, "--quiet"]), 0)
+        font = self._readInstance("Regular.ufo")
+        self.assertEqual(font["a"].width, 200)
+        self.assertEqual(main([path, "--quiet"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
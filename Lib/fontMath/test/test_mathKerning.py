@@ -115,6 +115,58 @@ class MathKerningTest(unittest.TestCase):
         obj2 = obj1.copy()
         self.assertEqual(sorted(obj1.items()), sorted(obj2.items()))
 
+    def test_contentHash(self):
+        kerning = {
+            ("A", "A"): 1,
+            ("public.kern1.D", "public.kern2.D"): 1,
+        }
+        groups = {
+            "public.kern1.D": ["D", "H"],
+            "public.kern2.D": ["D", "H"],
+        }
+        obj1 = MathKerning(kerning, groups)
+        obj2 = MathKerning(dict(reversed(list(kerning.items()))), groups)
+        self.assertEqual(obj1.contentHash(), obj2.contentHash())
+        obj3 = MathKerning(kerning)
+        self.assertNotEqual(obj1.contentHash(), obj3.contentHash())
+        self.assertEqual(obj1.contentHash(onlyGeometry=True),
+                         obj3.contentHash(onlyGeometry=True))
+        before = obj1.contentHash()
+        obj1.addTo(1)
+        self.assertNotEqual(before, obj1.contentHash())
+
+    def test_iadd_isub(self):
+        groups = {"public.kern1.O": ["O", "D"]}
+        kerning1 = {("A", "V"): -10, ("public.kern1.O", "V"): -5}
+        kerning2 = {("A", "V"): -30, ("T", "o"): -20, ("D", "V"): 0}
+        obj1 = MathKerning(kerning1, groups)
+        obj2 = MathKerning(kerning2, groups)
+        expected = obj1 + obj2
+        data = obj1._kerning
+        obj1 += obj2
+        self.assertIs(obj1._kerning, data)
+        self.assertEqual(sorted(obj1.items()), sorted(expected.items()))
+        obj1 -= obj2
+        self.assertEqual(obj1[("A", "V")], -10)
+
+    def test_iadd_groups(self):
+        obj1 = MathKerning({("A", "V"): -10})
+        obj2 = MathKerning({("A", "V"): -10}, {"public.kern1.O": ["O"]})
+        obj1 += obj2
+        self.assertEqual(obj1.groups(), {"public.kern1.O": ["O"]})
+        obj3 = MathKerning({}, {"public.kern1.O": ["D"]})
+        obj1 += obj3
+        self.assertEqual(obj1.groups(), {"public.kern1.O": ["D", "O"]})
+
+    def test_imul_idiv(self):
+        obj = MathKerning({("A", "V"): -10, ("T", "o"): 5})
+        obj *= 2
+        self.assertEqual(sorted(obj.items()), [(("A", "V"), -20), (("T", "o"), 10)])
+        obj /= (4, 1)
+        self.assertEqual(sorted(obj.items()), [(("A", "V"), -5), (("T", "o"), 2.5)])
+        self.assertIs(obj.round_(), obj)
+        self.assertEqual(obj[("T", "o")], 3)
+
     def test_add(self):
         kerning1 = {
             ("A", "A"): 1,
@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+import unittest
+from fontMath.mathMatrix import MathGlyphMatrix
+from fontMath.test.test_mathDeltas import _makeGlyph
+
+
+def _makeMaster(offset, extraAnchor=False):
+    master = {}
+    for index, glyphName in enumerate(("A", "B", "C")):
+        glyph = _makeGlyph(offset + index, extraAnchor=extraAnchor)
+        glyph.name = glyphName
+        master[glyphName] = glyph
+    return master
+
+
+class MathGlyphMatrixTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_fromGlyphs(self):
+        master = _makeMaster(0)
+        matrix = MathGlyphMatrix.fromGlyphs(master)
+        self.assertEqual(matrix.keys(), ["A", "B", "C"])
+        self.assertEqual(len(matrix), 3)
+        self.assertIn("B", matrix)
+        self.assertNotIn("D", matrix)
+        for glyphName, glyph in master.items():
+            self.assertEqual(matrix[glyphName], glyph)
+        self.assertEqual(len(matrix.values), 3 * len(matrix.glyphValues("A")))
+
+    def test_glyphNames(self):
+        matrix = MathGlyphMatrix.fromGlyphs(_makeMaster(0), glyphNames=["C", "A"])
+        self.assertEqual(list(matrix), ["C", "A"])
+        self.assertEqual(matrix["C"].width, 102)
+
+    def test_math_matches_operators(self):
+        light = _makeMaster(0)
+        bold = _makeMaster(100, extraAnchor=True)
+        lightMatrix, boldMatrix = MathGlyphMatrix.fromMasters([light, bold])
+        result = lightMatrix + (boldMatrix - lightMatrix) * 0.3
+        for glyphName in light:
+            expected = light[glyphName] + (bold[glyphName] - light[glyphName]) * 0.3
+            glyph = result[glyphName]
+            self.assertEqual(glyph.width, expected.width)
+            self.assertEqual(glyph.contours, expected.contours)
+            self.assertEqual(glyph.components, expected.components)
+            self.assertEqual(glyph.anchors, expected.anchors)
+        half = (lightMatrix + boldMatrix) / 2
+        self.assertEqual(half["A"].width, 150)
+        self.assertEqual((2 * lightMatrix)["A"].width, 200)
+
+    def test_incompatible(self):
+        light = _makeMaster(0)
+        bold = _makeMaster(100)
+        bold["B"].contours[0]["points"].pop()
+        self.assertRaises(ValueError, MathGlyphMatrix.fromMasters, [light, bold])
+        lightMatrix = MathGlyphMatrix.fromGlyphs(light)
+        otherMatrix = MathGlyphMatrix.fromGlyphs(light)
+        self.assertRaises(ValueError, lightMatrix.__add__, otherMatrix)
+        self.assertRaises(TypeError, lightMatrix.__mul__, (1, 2))
+
+
+class MathGlyphMatrixFileTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    @unittest.skipUnless(hasattr(memoryview, "cast"), "memory maps need Python 3")
+    def test_save_mapFile(self):
+        matrix = MathGlyphMatrix.fromGlyphs(_makeMaster(0))
+        path = os.path.join(self.tempDir, "light.values")
+        matrix.save(path)
+        self.assertEqual(os.path.getsize(path), len(matrix.values) * 8)
+        mapped = matrix.mapFile(path)
+        try:
+            self.assertEqual(list(mapped.values), list(matrix.values))
+            self.assertEqual(mapped["B"], matrix["B"])
+            self.assertEqual(list(mapped.glyphValues("C")), list(matrix.glyphValues("C")))
+            # mapped matrices work with regular ones
+            self.assertEqual(list((mapped - matrix).values), [0] * len(matrix.values))
+        finally:
+            mapped.close()
+        other = MathGlyphMatrix.fromGlyphs(_makeMaster(0), glyphNames=["A"])
+        self.assertRaises(ValueError, other.mapFile, path)
+
+    def test_weightedSum(self):
+        light = _makeMaster(0)
+        bold = _makeMaster(100)
+        lightMatrix, boldMatrix = MathGlyphMatrix.fromMasters([light, bold])
+        expected = lightMatrix + (boldMatrix - lightMatrix) * 0.25
+        terms = [(lightMatrix, 0.75), (boldMatrix, 0.25)]
+        result = MathGlyphMatrix.weightedSum(terms)
+        self.assertEqual(list(result.values), list(expected.values))
+        other = MathGlyphMatrix.fromGlyphs(light)
+        self.assertRaises(ValueError, MathGlyphMatrix.weightedSum, [(lightMatrix, 1), (other, 1)])
+
+    @unittest.skipUnless(hasattr(memoryview, "cast"), "memory maps need Python 3")
+    def test_weightedSum_file(self):
+        lightMatrix, boldMatrix = MathGlyphMatrix.fromMasters([_makeMaster(0), _makeMaster(100)])
+        expected = lightMatrix + (boldMatrix - lightMatrix) * 0.25
+        terms = [(lightMatrix, 0.75), (boldMatrix, 0.25)]
+        path = os.path.join(self.tempDir, "instance.values")
+        mapped = MathGlyphMatrix.weightedSum(terms, path=path, chunkSize=7)
+        try:
+            self.assertEqual(list(mapped.values), list(expected.values))
+            self.assertEqual(mapped["A"], expected["A"])
+        finally:
+            mapped.close()
+        reopened = lightMatrix.mapFile(path)
+        self.assertEqual(list(reopened.values), list(expected.values))
+        reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from fontTools.pens.boundsPen import BoundsPen
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathMetrics import glyphSetBounds, glyphSetMetrics
+
+
+def _makeGlyph(width, drawFunction=None, components=()):
+    glyph = MathGlyph(None)
+    glyph.width = width
+    if drawFunction is not None:
+        pen = glyph.getPointPen()
+        drawFunction(pen)
+    glyph.components = [
+        dict(baseGlyph=baseGlyph, transformation=transformation, identifier=None)
+        for baseGlyph, transformation in components
+    ]
+    return glyph
+
+
+def _drawCurve(pen):
+    pen.beginPath()
+    pen.addPoint((0, 0), "line")
+    pen.addPoint((100, 0), "line")
+    pen.addPoint((150, 50))
+    pen.addPoint((150, 150))
+    pen.addPoint((100, 200), "curve")
+    pen.addPoint((0, 200), "line")
+    pen.endPath()
+
+
+def _drawBar(pen):
+    pen.beginPath()
+    pen.addPoint((0, -10), "line")
+    pen.addPoint((20, -10), "line")
+    pen.addPoint((20, 10), "line")
+    pen.addPoint((0, 10), "line")
+    pen.endPath()
+
+
+def _decomposedBounds(glyphSet, glyphName):
+    # BoundsPen decomposes the components through glyphSet
+    pen = BoundsPen(glyphSet)
+    glyphSet[glyphName].draw(pen)
+    return pen.bounds
+
+
+class GlyphSetMetricsTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def _makeGlyphSet(self):
+        return dict(
+            curve=_makeGlyph(200, _drawCurve),
+            bar=_makeGlyph(20, _drawBar),
+            shifted=_makeGlyph(300, components=[("curve", (1, 0, 0, 1, 50, -20))]),
+            flipped=_makeGlyph(300, components=[("curve", (-1, 0, 0, 0.5, 250, 0))]),
+            rotated=_makeGlyph(300, components=[("bar", (0, 1, -1, 0, 100, 0))]),
+            skewed=_makeGlyph(300, _drawBar, components=[("curve", (1, 0, 0.2, 1, 0, 0))]),
+            nested=_makeGlyph(400, components=[("rotated", (0.5, 0.5, -0.5, 0.5, 10, 10))]),
+            space=_makeGlyph(250),
+        )
+
+    def test_glyphSetBounds_matches_decomposition(self):
+        glyphSet = self._makeGlyphSet()
+        result = glyphSetBounds(glyphSet)
+        self.assertEqual(sorted(result.keys()), sorted(glyphSet.keys()))
+        for glyphName, bounds in result.items():
+            expected = _decomposedBounds(glyphSet, glyphName)
+            if expected is None:
+                self.assertIsNone(bounds)
+            else:
+                for value, expectedValue in zip(bounds, expected):
+                    self.assertAlmostEqual(value, expectedValue, msg=glyphName)
+
+    def test_glyphSetMetrics(self):
+        glyphSet = self._makeGlyphSet()
+        metrics = glyphSetMetrics(glyphSet, glyphNames=["shifted", "space"])
+        self.assertEqual(sorted(metrics.keys()), ["shifted", "space"])
+        self.assertEqual(
+            metrics["shifted"],
+            dict(width=300, leftMargin=50, rightMargin=112.5, yMin=-20, yMax=180)
+        )
+        self.assertEqual(
+            metrics["space"],
+            dict(width=250, leftMargin=None, rightMargin=None, yMin=None, yMax=None)
+        )
+
+    def test_glyphSetMetrics_separate_glyphSet(self):
+        glyphSet = self._makeGlyphSet()
+        glyphs = dict(shifted=glyphSet["shifted"])
+        self.assertEqual(glyphSetMetrics(glyphs)["shifted"]["leftMargin"], None)
+        self.assertEqual(glyphSetMetrics(glyphs, glyphSet=glyphSet)["shifted"]["leftMargin"], 50)
+
+    def test_glyphSetBounds_circular_components(self):
+        glyphSet = dict(
+            a=_makeGlyph(100, _drawBar, components=[("b", (1, 0, 0, 1, 100, 0))]),
+            b=_makeGlyph(100, components=[("a", (1, 0, 0, 1, 100, 0))]),
+        )
+        result = glyphSetBounds(glyphSet)
+        self.assertEqual(result["a"], (0, -10, 220, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from fontTools.varLib.models import VariationModel
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathKerning import MathKerning
+from fontMath.mathModel import MathVariationModel, _locationKey
+
+
+_locations = [
+    {"wght": 1},
+    {},
+    {"wdth": 1},
+    {"wght": 1, "wdth": 1},
+    {"wght": 0.5},
+]
+_widths = [300, 100, 200, 500, 180]
+
+
+def _makeGlyph(width):
+    glyph = MathGlyph(None)
+    glyph.unicodes = []
+    glyph.width = width
+    glyph.height = 0
+    glyph.contours = [
+        dict(identifier=None, points=[
+            ("curve", (0, 0), False, None, None),
+            (None, (0, 0), False, None, None),
+            (None, (width, 100), False, None, None),
+            ("curve", (width, 100), False, None, None)
+        ])
+    ]
+    return glyph
+
+
+class MathVariationModelTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_defaultIndex(self):
+        model = MathVariationModel(_locations)
+        self.assertEqual(model.defaultIndex, 1)
+        self.assertEqual(len(model), 5)
+
+    def test_getMasterWeights_matches_fontTools(self):
+        model = MathVariationModel(_locations)
+        reference = VariationModel(_locations)
+        for location in ({}, {"wght": 0.25}, {"wght": 0.75, "wdth": 0.4}, {"wdth": 1}):
+            weights = model.getMasterWeights(location)
+            self.assertAlmostEqual(sum(weights), 1)
+            self.assertAlmostEqual(
+                sum(w * v for w, v in zip(weights, _widths)),
+                reference.interpolateFromMasters(location, _widths)
+            )
+
+    def test_getMasterWeights_cached(self):
+        model = MathVariationModel(_locations)
+        model.getMasterWeights({"wght": 0.3})
+        model.getMasterWeights({"wght": 0.3, "wdth": 0})
+        self.assertEqual(model._weightCache.hits, 1)
+
+    def test_glyph_instances(self):
+        model = MathVariationModel(_locations)
+        reference = VariationModel(_locations)
+        deltas = model.getDeltas([_makeGlyph(width) for width in _widths])
+        for location in ({"wght": 0.75, "wdth": 0.4}, {"wght": 0.5}):
+            glyph = deltas.instance(location)
+            expected = reference.interpolateFromMasters(location, _widths)
+            self.assertAlmostEqual(glyph.width, expected)
+            self.assertAlmostEqual(glyph.contours[0]["points"][2][1][0], expected)
+
+    def test_glyph_instances_batch(self):
+        model = MathVariationModel(_locations)
+        deltas = model.getDeltas([_makeGlyph(width) for width in _widths])
+        locations = [{"wght": t / 10.0} for t in range(11)]
+        glyphs = deltas.instances(locations)
+        self.assertEqual(len(glyphs), 11)
+        for location, glyph in zip(locations, glyphs):
+            self.assertEqual(glyph, deltas.instance(location))
+
+    def test_sparse_masters(self):
+        model = MathVariationModel(_locations)
+        masters = [_makeGlyph(width) for width in _widths]
+        masters[4] = None
+        glyph = model.interpolateFromMasters({"wght": 0.5}, masters)
+        self.assertAlmostEqual(glyph.width, 200)
+        masters[1] = None
+        self.assertRaises(ValueError, model.getDeltas, masters)
+        self.assertRaises(ValueError, model.getDeltas, masters[:2])
+
+    def test_kerning_instances(self):
+        model = MathVariationModel([{}, {"wght": 1}])
+        masters = [MathKerning({("A", "V"): -10}), MathKerning({("A", "V"): -30})]
+        kerning = model.interpolateFromMasters({"wght": 0.5}, masters)
+        self.assertEqual(kerning[("A", "V")], -20)
+
+    def test_locationKey(self):
+        self.assertEqual(_locationKey({"b": 0, "a": 1}), (("a", 1.0),))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathInfo import MathInfo
+from fontMath.mathKerning import MathKerning
+from fontMath.mathProfile import (
+    enableProfiling, disableProfiling, isProfiling, resetProfiling,
+    profilingSnapshot, MathProfiler
+)
+from fontMath.test.test_mathGlyph import _TestGlyph
+from fontMath.test.test_mathInfo import _TestInfoObject
+
+
+class MathProfileTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        resetProfiling()
+
+    def tearDown(self):
+        disableProfiling()
+        resetProfiling()
+
+    def test_disabled(self):
+        original = MathGlyph.__dict__["_processMathOne"]
+        enableProfiling()
+        self.assertTrue(isProfiling())
+        self.assertIsNot(MathGlyph.__dict__["_processMathOne"], original)
+        disableProfiling()
+        self.assertFalse(isProfiling())
+        self.assertIs(MathGlyph.__dict__["_processMathOne"], original)
+        MathGlyph(_TestGlyph()) + MathGlyph(_TestGlyph())
+        self.assertEqual(profilingSnapshot(), {})
+
+    def test_glyph(self):
+        glyph1 = MathGlyph(_TestGlyph())
+        glyph1.components = [dict(baseGlyph="a", transformation=(1, 0, 0, 1, 0, 0), identifier=None)]
+        glyph1.anchors = [dict(name="top", x=0, y=0, color=None, identifier=None)]
+        glyph1.guidelines = [dict(name=None, x=0, y=0, angle=0, color=None, identifier=None)]
+        glyph2 = glyph1.copy()
+        with MathProfiler() as profiler:
+            glyph = (glyph1 + glyph2) * 0.5
+            glyph.round()
+            glyph.extractGlyph(_TestGlyph())
+        stats = profiler.snapshot()
+        for name in ("MathGlyph._processMathOne", "MathGlyph._processMathTwo", "_pairComponents",
+                     "_pairAnchors", "_pairGuidelines", "MathGlyph.round", "MathGlyph.extractGlyph"):
+            self.assertEqual(stats[name]["calls"], 1, name)
+            self.assertGreaterEqual(stats[name]["time"], 0)
+            self.assertNotIn("allocations", stats[name])
+        # the pairing time is part of the math time
+        self.assertGreaterEqual(stats["MathGlyph._processMathOne"]["time"], stats["_pairComponents"]["time"])
+        self.assertFalse(isProfiling())
+
+    def test_kerningAndInfo(self):
+        kerning = MathKerning({("a", "b"): -10})
+        info = MathInfo(_TestInfoObject())
+        with MathProfiler(trackAllocations=True) as profiler:
+            kerning + kerning
+            kerning * 2
+            info + info
+            (info * 2).round()
+        stats = profiler.snapshot()
+        self.assertEqual(stats["MathKerning._processMathOne"]["calls"], 1)
+        self.assertEqual(stats["MathKerning._processMathTwo"]["calls"], 1)
+        # called by __add__ and __mul__
+        self.assertEqual(stats["MathKerning.cleanup"]["calls"], 2)
+        self.assertEqual(stats["MathInfo._processMathOne"]["calls"], 1)
+        self.assertEqual(stats["MathInfo._processMathTwo"]["calls"], 1)
+        self.assertEqual(stats["MathInfo.round"]["calls"], 1)
+        self.assertIn("allocations", stats["MathInfo.round"])
+
+    def test_nested(self):
+        glyph = MathGlyph(_TestGlyph())
+        enableProfiling()
+        glyph * 2
+        with MathProfiler(reset=False):
+            glyph * 2
+        self.assertTrue(isProfiling())
+        self.assertEqual(profilingSnapshot()["MathGlyph._processMathTwo"]["calls"], 2)
+        resetProfiling()
+        self.assertEqual(profilingSnapshot(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
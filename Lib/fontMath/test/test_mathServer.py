@@ -0,0 +1,305 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from multiprocessing.pool import ThreadPool
+try:
+    from urllib.request import urlopen, Request
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import urlopen, Request, HTTPError
+from fontTools.designspaceLib import DesignSpaceDocument, AxisDescriptor, SourceDescriptor
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.t2CharStringPen import T2CharStringPen
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathInfo import MathInfo
+from fontMath.mathKerning import MathKerning
+from fontMath.mathModel import MathVariationModel
+from fontMath import mathServer
+from fontMath.mathServer import MathInstanceService, MathInstanceServer, main
+from fontMath.test.fixtures import _makeGlyph, _TestMaster, _writeMaster
+from fontMath.test.test_mathInfo import _TestInfoObject
+
+
+_locations = [{}, {"wght": 1}]
+
+
+def _makeComposite(width, offset):
+    glyph = MathGlyph(None)
+    glyph.unicodes = []
+    glyph.width = width
+    glyph.height = 0
+    glyph.components = [
+        dict(baseGlyph="a", transformation=(1, 0, 0, 1, offset, 0), identifier=None)
+    ]
+    return glyph
+
+
+def _makeMasters():
+    info = MathInfo(_TestInfoObject())
+    return [
+        _TestMaster(
+            dict(a=_makeGlyph(100), b=_makeComposite(200, 10)),
+            info,
+            MathKerning({("a", "b"): -10})
+        ),
+        _TestMaster(
+            dict(a=_makeGlyph(300), b=_makeComposite(400, 30)),
+            info * 2,
+            MathKerning({("a", "b"): -30, ("b", "a"): 20})
+        )
+    ]
+
+
+class _CountingService(MathInstanceService):
+
+    def __init__(self, *args, **kwargs):
+        MathInstanceService.__init__(self, *args, **kwargs)
+        self.computed = []
+        self.release = threading.Event()
+
+    def _instanceGlyph(self, glyphName, location):
+        self.release.wait(5)
+        self.computed.append(glyphName)
+        return MathInstanceService._instanceGlyph(self, glyphName, location)
+
+
+class _BrokenService(MathInstanceService):
+
+    def info(self, location):
+        raise KeyError("openTypeOS2Panose")
+
+
+def _writeCFFFont(path):
+    pen = T2CharStringPen(100, None)
+    builder = FontBuilder(1000, isTTF=False)
+    builder.setupGlyphOrder([".notdef"])
+    builder.setupCharacterMap({})
+    builder.setupCFF("Test", {}, {".notdef": pen.getCharString()}, {})
+    builder.setupHorizontalMetrics({".notdef": (100, 0)})
+    builder.setupHorizontalHeader()
+    builder.save(path)
+
+
+class MathInstanceServiceTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        self.service = MathInstanceService(MathVariationModel(_locations), _makeMasters())
+
+    def test_glyph(self):
+        glyph = self.service.glyph("a", {"wght": 0.5})
+        self.assertEqual(glyph.width, 200)
+        self.assertIs(self.service.glyph("a", {"wght": 0.5}), glyph)
+        self.assertRaises(KeyError, self.service.glyph, "missing", {})
+
+    def test_glyph_coalesced(self):
+        service = _CountingService(MathVariationModel(_locations), _makeMasters())
+        pool = ThreadPool(4)
+        try:
+            results = pool.map_async(lambda i: service.glyph("a", {"wght": 0.5}), range(4))
+            # let the requests pile up on the first computation
+            threading.Event().wait(0.05)
+            service.release.set()
+            glyphs = results.get(5)
+        finally:
+            pool.terminate()
+        self.assertEqual(service.computed, ["a"])
+        self.assertEqual(len(set(id(glyph) for glyph in glyphs)), 1)
+
+    def test_glyphRequest(self):
+        response = self.service.handleRequest(dict(type="glyph", name="a", location={"wght": 0.5}))
+        self.assertEqual(response["width"], 200)
+        self.assertEqual(response["contours"], [[
+            [0, 0, "line", False],
+            [200, 0, "line", False],
+            [200, 100, "line", False]
+        ]])
+        response = self.service.handleRequest(dict(type="glyph", name="b", location={"wght": 0.5}))
+        self.assertEqual(response["contours"], [])
+        self.assertEqual(response["components"], [dict(baseGlyph="a", transformation=[1, 0, 0, 1, 20, 0])])
+        response = self.service.handleRequest(dict(type="glyph", name="b", location={"wght": 0.5}, decompose=True))
+        self.assertEqual(response["contours"], [[
+            [20, 0, "line", False],
+            [220, 0, "line", False],
+            [220, 100, "line", False]
+        ]])
+        self.assertEqual(response["components"], [])
+
+    def test_metricsRequest(self):
+        response = self.service.handleRequest(dict(type="metrics", names=["a", "b"], location={"wght": 1}))
+        self.assertEqual(response["metrics"]["b"], dict(width=400, leftMargin=30, rightMargin=70, yMin=0, yMax=100))
+
+    def test_kerningRequest(self):
+        response = self.service.handleRequest(dict(type="kerning", location={"wght": 0.5}))
+        self.assertEqual(response["kerning"], [["a", "b", -20], ["b", "a", 10]])
+        response = self.service.handleRequest(dict(type="kerning", pairs=[["b", "a"], ["b", "b"]], location={}))
+        self.assertEqual(response["kerning"], [["b", "a", 0], ["b", "b", 0]])
+        for pairs in ([[1, 2]], [["a"]], ["ab"], "ab", dict(a="b")):
+            self.assertRaises(ValueError, self.service.handleRequest, dict(type="kerning", pairs=pairs))
+
+    def test_infoRequest(self):
+        response = self.service.handleRequest(dict(type="info", location={"wght": 1}))
+        self.assertEqual(response["info"]["unitsPerEm"], 2000)
+        self.assertNotIn("guidelines", response["info"])
+        json.dumps(response)
+
+    def test_invalidRequest(self):
+        self.assertRaises(ValueError, self.service.handleRequest, dict(type="foo"))
+        self.assertRaises(ValueError, self.service.handleRequest, dict(type="info", location=[]))
+        self.assertRaises(ValueError, self.service.handleRequest, dict(type="metrics"))
+
+    def test_handleBatch(self):
+        responses = self.service.handleBatch([
+            dict(type="glyph", name="a", location={"wght": 0.25}),
+            dict(type="metrics", names=["a"], location={"wght": 0.75}),
+            dict(type="glyph", name="missing", location={}),
+            dict(type="foo"),
+            dict(type="kerning", pairs=[[1, 2]], location={})
+        ])
+        self.assertEqual(responses[0]["width"], 150)
+        self.assertEqual(responses[1]["metrics"]["a"]["width"], 250)
+        self.assertEqual(responses[2], dict(error="Unknown glyph: missing."))
+        self.assertIn("error", responses[3])
+        self.assertIn("error", responses[4])
+        self.assertEqual(len(self.service.cache), 2)
+
+    def test_other_key_errors(self):
+        service = _BrokenService(MathVariationModel(_locations), _makeMasters())
+        self.assertRaises(KeyError, service.handleBatch, [dict(type="info")])
+        server = MathInstanceServer(service)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            url = "http://%s:%d/info" % server.server_address[:2]
+            with self.assertRaises(HTTPError) as context:
+                urlopen(url, timeout=5)
+            self.assertEqual(context.exception.code, 500)
+            context.exception.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+    def test_fromSources_cff(self):
+        tempDir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tempDir, "Test.otf")
+            _writeCFFFont(path)
+            self.assertRaises(ValueError, MathInstanceService.fromSources, [{}], [path])
+        finally:
+            shutil.rmtree(tempDir)
+
+
+class MathInstanceServerTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        service = MathInstanceService(MathVariationModel(_locations), _makeMasters())
+        self.server = MathInstanceServer(service)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = "http://%s:%d" % self.server.server_address[:2]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def _request(self, path, data=None):
+        if data is not None:
+            data = json.dumps(data).encode("utf-8")
+        response = urlopen(Request(self.url + path, data=data), timeout=5)
+        try:
+            return json.loads(response.read().decode("utf-8"))
+        finally:
+            response.close()
+
+    def test_get(self):
+        response = self._request("/glyph?name=a&wght=0.5")
+        self.assertEqual(response["width"], 200)
+        response = self._request("/metrics?names=a,b&wght=1")
+        self.assertEqual(sorted(response["metrics"]), ["a", "b"])
+
+    def test_post(self):
+        response = self._request("/", dict(type="kerning", location={"wght": 1}))
+        self.assertEqual(response["kerning"], [["a", "b", -30], ["b", "a", 20]])
+        responses = self._request("/", [
+            dict(type="glyph", name="a", location={}),
+            dict(type="info", location={})
+        ])
+        self.assertEqual(responses[0]["width"], 100)
+        self.assertEqual(responses[1]["info"]["unitsPerEm"], 1000)
+
+    def test_errors(self):
+        for path, data, status in (
+                ("/glyph?name=missing", None, 404),
+                ("/glyph?name=a&wght=bold", None, 400),
+                ("/", dict(type="foo"), 400)):
+            with self.assertRaises(HTTPError) as context:
+                self._request(path, data)
+            self.assertEqual(context.exception.code, status)
+            context.exception.close()
+
+
+class MainTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.paths = []
+        for fileName, width in (("Light.ufo", 100), ("Bold.ufo", 300)):
+            path = os.path.join(self.tempDir, fileName)
+            _writeMaster(path, dict(a=_makeGlyph(width)))
+            self.paths.append(path)
+        self.served = []
+        self._serve = mathServer.serve
+        mathServer.serve = lambda service, host, port: self.served.append((service, host, port))
+
+    def tearDown(self):
+        mathServer.serve = self._serve
+        shutil.rmtree(self.tempDir)
+
+    def test_sources(self):
+        self.assertEqual(main(self.paths + ["-l", "", "-l", "wght=1", "--port", "8123"]), 0)
+        service, host, port = self.served[0]
+        self.assertEqual((host, port), ("127.0.0.1", 8123))
+        self.assertEqual(service.glyph("a", {"wght": 0.5}).width, 200)
+
+    def test_designspace(self):
+        document = DesignSpaceDocument()
+        axis = AxisDescriptor()
+        axis.name = axis.tag = "wght"
+        axis.minimum, axis.default, axis.maximum = 100, 100, 900
+        document.addAxis(axis)
+        for path, value in zip(self.paths, (100, 900)):
+            source = SourceDescriptor()
+            source.path = path
+            source.location = dict(wght=value)
+            document.addSource(source)
+        path = os.path.join(self.tempDir, "Test.designspace")
+        document.write(path)
+        self.assertEqual(main([path]), 0)
+        service, host, port = self.served[0]
+        self.assertEqual(port, 8000)
+        self.assertEqual(service.glyph("a", {"wght": 0.25}).width, 150)
+
+    def test_invalid_arguments(self):
+        for args in (self.paths, self.paths + ["-l", "wght"]):
+            with self.assertRaises(SystemExit):
+                main(args)
+        self.assertEqual(self.served, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
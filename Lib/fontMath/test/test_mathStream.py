@@ -0,0 +1,83 @@
+import unittest
+from fontMath.mathDeltas import batchInstances
+from fontMath.mathInfo import MathInfo
+from fontMath.mathKerning import MathKerning
+from fontMath.mathStream import (
+    readMasterGlyphs, zipMasterGlyphs, instanceGlyphs, instanceKerning, instanceInfo)
+from fontMath.test.fixtures import _TestExecutor
+from fontMath.test.test_mathDeltas import _makeGlyph
+from fontMath.test.test_mathInfo import _TestInfoObject
+
+
+def _makeMaster(offset):
+    master = {}
+    for index, glyphName in enumerate(("A", "B", "C", "D")):
+        glyph = _makeGlyph(offset + index)
+        glyph.name = glyphName
+        master[glyphName] = glyph
+    return master
+
+
+class MathStreamTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_readMasterGlyphs(self):
+        light = _makeMaster(0)
+        bold = _makeMaster(100)
+        rows = list(readMasterGlyphs([light, bold], glyphNames=["B", "A"]))
+        self.assertEqual([glyphName for glyphName, masters in rows], ["B", "A"])
+        self.assertIs(rows[0][1][1], bold["B"])
+
+    def test_zipMasterGlyphs(self):
+        light = _makeMaster(0)
+        bold = _makeMaster(100)
+        rows = list(zipMasterGlyphs([sorted(light.items()), sorted(bold.items())]))
+        self.assertEqual([glyphName for glyphName, masters in rows], ["A", "B", "C", "D"])
+        self.assertIs(rows[2][1][0], light["C"])
+        with self.assertRaises(ValueError):
+            list(zipMasterGlyphs([sorted(light.items()), sorted(bold.items())[:2]]))
+        with self.assertRaises(ValueError):
+            list(zipMasterGlyphs([sorted(light.items()), sorted(bold.items(), reverse=True)]))
+
+    def test_instanceGlyphs(self):
+        light = _makeMaster(0)
+        bold = _makeMaster(100)
+        weightRows = [[0.75, 0.25], [0.5, 0.5]]
+        results = list(instanceGlyphs(readMasterGlyphs([light, bold]), weightRows))
+        self.assertEqual(len(results), 4)
+        for glyphName, instances in results:
+            expected = batchInstances([light[glyphName], bold[glyphName]], weightRows)
+            self.assertEqual(instances, expected)
+
+    def test_instanceGlyphs_executor(self):
+        light = _makeMaster(0)
+        bold = _makeMaster(100)
+        weightRows = [[0.5, 0.5]]
+        executor = _TestExecutor()
+        results = list(instanceGlyphs(
+            readMasterGlyphs([light, bold]), weightRows, executor=executor, lookAhead=2))
+        self.assertEqual([glyphName for glyphName, instances in results], ["A", "B", "C", "D"])
+        self.assertEqual(executor.maxPending, 2)
+        expected = list(instanceGlyphs(readMasterGlyphs([light, bold]), weightRows))
+        self.assertEqual(results, expected)
+
+    def test_instanceKerning(self):
+        masters = [MathKerning({("A", "V"): -10}), MathKerning({("A", "V"): -30})]
+        weightRows = [[1, 0], [0.5, 0.5], [0, 1]]
+        stream = instanceKerning(masters, weightRows)
+        self.assertEqual(next(stream)[("A", "V")], -10)
+        self.assertEqual([kerning[("A", "V")] for kerning in stream], [-20, -30])
+
+    def test_instanceInfo(self):
+        light = MathInfo(_TestInfoObject())
+        bold = light * 2
+        weightRows = [[0.5, 0.5]]
+        self.assertEqual(
+            list(instanceInfo([light, bold], weightRows)),
+            batchInstances([light, bold], weightRows)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
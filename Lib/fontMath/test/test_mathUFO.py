@@ -0,0 +1,184 @@
+import os
+import shutil
+import tempfile
+import unittest
+from fontTools.ufoLib import UFOReader
+from fontTools.ufoLib.glifLib import GlyphSet
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathInfo import MathInfo
+from fontMath.mathKerning import MathKerning
+from fontMath.mathUFO import extractGlyphs, writeGlyph, writeGlyphs, UFOInstanceWriter
+from fontMath.test.fixtures import _TestExecutor
+from fontMath.test.test_mathInfo import _TestInfoObject
+from fontMath.test.test_mathGlyph import _TestGlyph
+
+
+def _makeGlyph(name, offset=0):
+    glyph = MathGlyph(None)
+    glyph.name = name
+    glyph.unicodes = [65]
+    glyph.width = 500 + offset
+    glyph.height = 0
+    glyph.note = "note"
+    glyph.lib = {"foo": [1, 2]}
+    pen = glyph.getPointPen()
+    pen.beginPath(identifier="contour1")
+    pen.addPoint((offset, 0), "line", name="start")
+    pen.addPoint((100, 0), "line")
+    pen.addPoint((150, 50))
+    pen.addPoint((150, 150))
+    pen.addPoint((100, 200), "curve", smooth=True)
+    pen.endPath()
+    pen.addComponent("base", (1, 0, 0, 1, 10, 20))
+    glyph.anchors = [dict(name="top", x=100, y=200, identifier=None, color=None)]
+    glyph.guidelines = [dict(name="g", x=0, y=100, angle=0, identifier=None, color=None)]
+    return glyph
+
+
+class _TestFont(dict):
+
+    """Mockup defcon-like Font class"""
+
+    def __init__(self):
+        super(_TestFont, self).__init__()
+        self.notificationLog = []
+
+    def newGlyph(self, glyphName):
+        glyph = self[glyphName] = _TestGlyph()
+        glyph.name = glyphName
+        return glyph
+
+    def holdNotifications(self):
+        self.notificationLog.append("hold")
+
+    def releaseHeldNotifications(self):
+        self.notificationLog.append("release")
+
+
+class ExtractGlyphsTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_extractGlyphs(self):
+        font = _TestFont()
+        existing = font.newGlyph("A")
+        glyphs = dict(A=_makeGlyph("A"), B=_makeGlyph("B", 10))
+        self.assertIs(extractGlyphs(glyphs, font), font)
+        self.assertEqual(sorted(font), ["A", "B"])
+        self.assertIs(font["A"], existing)
+        self.assertEqual(font["B"].width, 510)
+        self.assertEqual(MathGlyph(font["B"]), glyphs["B"])
+        self.assertEqual(font.notificationLog, ["hold", "release"])
+
+    def test_extractGlyphs_glyphNames(self):
+        font = _TestFont()
+        extractGlyphs(dict(A=_makeGlyph("A"), B=_makeGlyph("B")), font, glyphNames=["B"])
+        self.assertEqual(list(font), ["B"])
+
+
+class WriteGlyphsTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.tempDir, "glyphs"))
+        self.glyphSet = GlyphSet(os.path.join(self.tempDir, "glyphs"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def _readGlyph(self, glyphName):
+        glyph = _TestGlyph()
+        self.glyphSet.readGlyph(glyphName, glyph, glyph.getPointPen())
+        return glyph
+
+    def test_writeGlyph_matches_extractGlyph(self):
+        glyph = _makeGlyph("A")
+        writeGlyph(self.glyphSet, glyph)
+        self.glyphSet.writeContents()
+        expected = glyph.extractGlyph(_TestGlyph())
+        result = self._readGlyph("A")
+        for attr in ("width", "unicodes", "note", "lib", "contours", "components"):
+            self.assertEqual(getattr(result, attr), getattr(expected, attr), attr)
+        self.assertEqual(result.anchors, [dict(name="top", x=100, y=200)])
+        self.assertEqual(result.guidelines, [dict(name="g", y=100)])
+
+    def test_writeGlyph_onlyGeometry(self):
+        glyph = _makeGlyph("A")
+        glyph.onlyGeometry = True
+        writeGlyph(self.glyphSet, glyph, glyphName="B")
+        result = self._readGlyph("B")
+        self.assertIsNone(result.note)
+        self.assertEqual(result.lib, {})
+        self.assertEqual(result.guidelines, [])
+        self.assertEqual(len(result.contours), 1)
+
+    def test_writeGlyphs(self):
+        glyphs = dict(A=_makeGlyph("A"), B=_makeGlyph("B", 10))
+        writeGlyphs(self.glyphSet, glyphs)
+        glyphSet = GlyphSet(os.path.join(self.tempDir, "glyphs"))
+        self.assertEqual(sorted(glyphSet.keys()), ["A", "B"])
+        glyph = _TestGlyph()
+        glyphSet.readGlyph("B", glyph, glyph.getPointPen())
+        self.assertEqual(glyph.width, 510)
+
+
+class UFOInstanceWriterTest(unittest.TestCase):
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempDir, "instance.ufo")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def _glyphs(self):
+        return [("glyph%d" % index, _makeGlyph("glyph%d" % index, index)) for index in range(10)]
+
+    def test_write(self):
+        kerning = MathKerning({("public.kern1.O", "A"): -10}, {"public.kern1.O": ["O", "Q"]})
+        info = MathInfo(_TestInfoObject())
+        with UFOInstanceWriter(self.path) as writer:
+            writer.writeGlyphs(self._glyphs())
+            writer.writeGlyph(_makeGlyph("A"))
+            writer.writeKerning(kerning)
+            writer.writeInfo(info)
+        reader = UFOReader(self.path)
+        glyphSet = reader.getGlyphSet()
+        self.assertEqual(len(glyphSet), 11)
+        glyph = _TestGlyph()
+        glyphSet.readGlyph("glyph3", glyph, glyph.getPointPen())
+        self.assertEqual(glyph.width, 503)
+        self.assertEqual(reader.readKerning(), {("public.kern1.O", "A"): -10})
+        self.assertEqual(reader.readGroups(), {"public.kern1.O": ["O", "Q"]})
+        infoObject = _TestInfoObject()
+        reader.readInfo(infoObject)
+        self.assertEqual(infoObject.unitsPerEm, info.unitsPerEm)
+
+    def test_glif_matches_glyphSet(self):
+        with UFOInstanceWriter(self.path) as writer:
+            writer.writeGlyph(_makeGlyph("A"))
+        with open(os.path.join(self.path, "glyphs", "A_.glif"), "rb") as f:
+            data = f.read()
+        os.mkdir(os.path.join(self.tempDir, "glyphs"))
+        glyphSet = GlyphSet(os.path.join(self.tempDir, "glyphs"))
+        writeGlyph(glyphSet, _makeGlyph("A"))
+        with open(os.path.join(self.tempDir, "glyphs", "A_.glif"), "rb") as f:
+            self.assertEqual(data, f.read())
+
+    def test_executor_window(self):
+        executor = _TestExecutor()
+        writer = UFOInstanceWriter(self.path, executor=executor, maxPending=3)
+        writer.writeGlyphs(self._glyphs())
+        self.assertEqual(executor.maxPending, 3)
+        self.assertEqual(len(executor.futures), 10)
+        writer.close()
+        self.assertTrue(all(future.done for future in executor.futures))
+        self.assertEqual(len(UFOReader(self.path).getGlyphSet()), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import shutil
+import tempfile
+import unittest
+from fontTools.designspaceLib import DesignSpaceDocument, AxisDescriptor, SourceDescriptor, InstanceDescriptor
+from fontTools.ufoLib import UFOReader
+from fontMath.mathFont import MathFont
+from fontMath.mathInfo import MathInfo
+from fontMath.mathKerning import MathKerning
+from fontMath.mathUFO import UFOInstanceWriter
+from fontMath.mathWatch import UFOMaster, InstanceWatcher
+from fontMath.test.fixtures import _makeGlyph, _writeMaster
+from fontMath.test.test_mathInfo import _TestInfoObject
+
+
+class UFOMasterTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempDir, "master.ufo")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_refresh(self):
+        _writeMaster(self.path, dict(a=_makeGlyph(100), b=_makeGlyph(200)), kerning=MathKerning({("a", "b"): -10}))
+        master = UFOMaster(self.path)
+        self.assertEqual(sorted(master), ["a", "b"])
+        self.assertEqual(master["b"].width, 200)
+        self.assertEqual(master.kerning[("a", "b")], -10)
+        glyphB = master["b"]
+        self.assertEqual(master.refresh(), set())
+        with UFOInstanceWriter(self.path) as writer:
+            # a different file size, in case the file system has a coarse mtime
+            writer.writeGlyph(_makeGlyph(1000), glyphName="a")
+            writer.writeGlyph(_makeGlyph(10), glyphName="c")
+        self.assertEqual(master.refresh(), set(["a", "c"]))
+        self.assertEqual(master["a"].width, 1000)
+        self.assertIs(master["b"], glyphB)
+        with UFOInstanceWriter(self.path) as writer:
+            writer.deleteGlyph("c")
+        self.assertEqual(master.refresh(), set(["c"]))
+        self.assertNotIn("c", master)
+
+
+class InstanceWatcherTest(unittest.TestCase):
+
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.lightPath = os.path.join(self.tempDir, "Light.ufo")
+        self.boldPath = os.path.join(self.tempDir, "Bold.ufo")
+        info = MathInfo(_TestInfoObject())
+        _writeMaster(
+            self.lightPath,
+            dict(a=_makeGlyph(100), acute=_makeGlyph(10), aacute=_makeGlyph(100, ["a", "acute"])),
+            kerning=MathKerning({("a", "a"): -10}),
+            info=info
+        )
+        _writeMaster(
+            self.boldPath,
+            dict(a=_makeGlyph(300), acute=_makeGlyph(30), aacute=_makeGlyph(300, ["a", "acute"])),
+            kerning=MathKerning({("a", "a"): -30}),
+            info=info * 2
+        )
+        document = DesignSpaceDocument()
+        axis = AxisDescriptor()
+        axis.name = axis.tag = "wght"
+        axis.minimum, axis.default, axis.maximum = 100, 100, 900
+        axis.map = [(100, 100), (400, 200), (900, 900)]
+        document.addAxis(axis)
+        for fileName, value in (("Light.ufo", 100), ("Bold.ufo", 900)):
+            source = SourceDescriptor()
+            source.filename = fileName
+            source.location = dict(wght=value)
+            document.addSource(source)
+        instance = InstanceDescriptor()
+        instance.filename = "instances/Regular.ufo"
+        instance.familyName = "Test"
+        instance.styleName = "Regular"
+        instance.location = dict(wght=500)
+        document.addInstance(instance)
+        self.designspacePath = os.path.join(self.tempDir, "Test.designspace")
+        document.write(self.designspacePath)
+        self.instancePath = os.path.join(self.tempDir, "instances", "Regular.ufo")
+        self.messages = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_initial(self):
+        InstanceWatcher(self.designspacePath, log=self.messages.append)
+        font = MathFont(UFOReader(self.instancePath))
+        self.assertEqual(sorted(font), ["a", "aacute", "acute"])
+        self.assertEqual(font["a"].width, 200)
+        self.assertEqual(font.kerning[("a", "a")], -20)
+        self.assertEqual(font.info.unitsPerEm, 1500)
+        self.assertEqual(len(self.messages), 1)
+
+    def test_initial_existing_instance(self):
+        os.makedirs(os.path.dirname(self.instancePath))
+        _writeMaster(self.instancePath, dict(a=_makeGlyph(1), stale=_makeGlyph(1)))
+        for path, width in ((self.lightPath, 100), (self.boldPath, 301)):
+            with UFOInstanceWriter(path) as writer:
+                writer.writeGlyph(_makeGlyph(width), glyphName="b")
+        InstanceWatcher(self.designspacePath, log=self.messages.append)
+        font = MathFont(UFOReader(self.instancePath))
+        self.assertEqual(sorted(font), ["a", "aacute", "acute", "b"])
+        self.assertEqual(font["b"].width, 200)
+        self.assertEqual(self.messages[0].split(", ")[1], "1 removed")
+        InstanceWatcher(self.designspacePath, roundGeometry=False)
+        font = MathFont(UFOReader(self.instancePath))
+        self.assertEqual(font["b"].width, 200.5)
+
+    def test_poll(self):
+        watcher = InstanceWatcher(self.designspacePath, debounce=1, log=self.messages.append)
+        self.assertIsNone(watcher.poll(now=0))
+        with UFOInstanceWriter(self.boldPath) as writer:
+            writer.writeGlyph(_makeGlyph(1500), glyphName="a")
+        # the first poll sees the change, the next ones wait for the debounce time
+        self.assertIsNone(watcher.poll(now=10))
+        self.assertIsNone(watcher.poll(now=10.5))
+        changes = watcher.poll(now=11)
+        self.assertEqual(changes["glyphs"], ["a"])
+        self.assertEqual(changes["dependentGlyphs"], ["aacute"])
+        self.assertEqual(changes["kerning"], [])
+        self.assertIsNone(watcher.poll(now=12))
+        font = MathFont(UFOReader(self.instancePath))
+        self.assertEqual(font["a"].width, 800)
+        self.assertEqual(len(self.messages), 2)
+
+    def test_decompose(self):
+        InstanceWatcher(self.designspacePath, decompose=True)
+        font = MathFont(UFOReader(self.instancePath))
+        self.assertEqual(font["aacute"].components, [])
+        self.assertEqual(len(font["aacute"].contours), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -30,6 +30,12 @@ setup(
     install_requires=[
         "fonttools>=3.32.0",
     ],
+    entry_points={
+        "console_scripts": [
+            "fontmath-instance = fontMath.mathInstancer:main",
+            "fontmath-watch = fontMath.mathWatch:main",
+        ],
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',